@@ -1,5 +1,10 @@
+import json
+import os
+import tempfile
 import unittest
 
+import numpy as np
+
 from utilities import configIDs as cfg
 
 
@@ -38,7 +43,161 @@ class Test_ConfigIDs(unittest.TestCase):
         self.assertRaises(
             ValueError, cfg.ConfigID, 13770, ID_str=ID_str, icon=icon, runID=runID
         )
-    
+
+    def test_interned(self):
+        id_from_str = cfg.ConfigID.get(13770, ID_str="-a-001890")
+        id_from_icon = cfg.ConfigID.get(13770, icon=2, runID="a")
+        self.assertIs(id_from_str, id_from_icon)
+        self.assertEqual(id_from_str, cfg.ConfigID(13770, icon=2, runID="a"))
+        self.assertEqual(len({id_from_str, cfg.ConfigID(13770, icon=2, runID="a")}), 1)
+        self.assertRaises(
+            ValueError, cfg.ConfigID.get, 13770, ID_str="-a-001880", icon=2, runID="a"
+        )
+        self.assertRaises(ValueError, cfg.ConfigID.get, 13770, icon=2)
+
+        # Only the canonical (kappa, runID, icon) is cached
+        cfg._interned_configID.cache_clear()
+        cfg.ConfigID.get(13770, ID_str="-a-001890")
+        cfg.ConfigID.get(13770, icon=2, runID="a")
+        self.assertEqual(cfg._interned_configID.cache_info().currsize, 1)
+
+
+class Test_PACSRun(unittest.TestCase):
+    pacs_run = cfg.get_run(13754, "b")
+
+    def test_shared(self):
+        self.assertIs(self.pacs_run, cfg.get_run(13754, "b"))
+
+    def test_config_table(self):
+        table = self.pacs_run.config_table()
+        self.assertEqual(len(table["icon"]), 250)
+        for i in (0, 100, 249):
+            config = cfg.ConfigID(13754, icon=int(table["icon"][i]), runID="b")
+            self.assertEqual(table["ID_str"][i], config.ID_str)
+            self.assertEqual(table["filename"][i], config.filename)
+            self.assertEqual(table["num_ID"][i], int(config.ID_str[-6:]))
+
+    def test_icon_conversion(self):
+        icons = np.array([1, 7, 250])
+        num_IDs = self.pacs_run.icons_to_num_IDs(icons)
+        np.testing.assert_array_equal(num_IDs, [2510, 2570, 5000])
+        np.testing.assert_array_equal(self.pacs_run.num_IDs_to_icons(num_IDs), icons)
+        self.assertRaises(ValueError, self.pacs_run.num_IDs_to_icons, [2515])
+        self.assertRaises(ValueError, self.pacs_run.icons_to_num_IDs, [251])
+
+
+class Test_RunChain(unittest.TestCase):
+    chain_run = cfg.get_run(13781, "M")
+
+    def test_boundaries(self):
+        expected = {1: "gM", 44: "gM", 45: "hM", 66: "hM", 67: "iM", 155: "kM", 198: "kM"}
+        for icon, runID in expected.items():
+            self.assertEqual(cfg.runIDs_13781(icon), runID)
+        self.assertRaises(ValueError, cfg.runIDs_13781, 199)
+
+    def test_round_trip(self):
+        self.assertEqual(self.chain_run.get_ID_str(45), "-hM-001240")
+        self.assertEqual(self.chain_run.get_icon("-hM-001240"), 45)
+        ID_strs = self.chain_run.ID_strs()
+        self.assertEqual(len(ID_strs), 198)
+        np.testing.assert_array_equal(
+            self.chain_run.ID_strs_to_icons(ID_strs), self.chain_run.icons
+        )
+        for icon in (1, 44, 45, 111, 198):
+            self.assertEqual(ID_strs[icon - 1], self.chain_run.get_ID_str(icon))
+
+    def test_config_IDs_are_true_runs(self):
+        config_IDs = self.chain_run.config_IDs()
+        self.assertIs(config_IDs[44], cfg.ConfigID.get(13781, ID_str="-hM-001240"))
+
+
+
+class Test_EnsembleRegistry(unittest.TestCase):
+    def test_lazy(self):
+        registry = cfg.EnsembleRegistry([cfg.ensembles_file])
+        self.assertNotIn("definitions", registry.__dict__)
+        self.assertIn(13754, registry)
+        self.assertEqual(registry._ensembles, {})
+        ensemble = registry[13754]
+        self.assertIs(registry[13754], ensemble)
+        self.assertEqual(list(registry._ensembles), [13754])
+        self.assertEqual((ensemble.NS, ensemble.NT, ensemble.a), (32, 64, 0.0961))
+
+    def test_run_details(self):
+        self.assertEqual(cfg.PACS_run_details[13754], {"a": (2510, 200), "b": (2510, 250)})
+        self.assertEqual(list(cfg.PACS_run_details), list(cfg.PACS_ensembles))
+
+    def test_load(self):
+        definition = {
+            "defaults": {"NS": 20, "NT": 40, "base_filename": "test/{kappa}{ID_str}"},
+            "ensembles": {"12000": {"a": 0.1, "traj_store": 5, "runs": {"t": [100, 10]}}},
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "extra.json")
+            with open(path, "w") as f:
+                json.dump(definition, f)
+            registry = cfg.EnsembleRegistry([cfg.ensembles_file])
+            registry.load(path)
+            self.assertRaises(ValueError, registry.load, path)
+
+        ensemble = registry[12000]
+        self.assertEqual((ensemble.NS, ensemble.NT, ensemble.prefixes), (20, 40, ("t",)))
+        self.assertEqual(registry.runID_pattern.search("-t-000105")[1], "t")
+        self.assertEqual(registry[13781].NS, 32)
+
+    def test_base_filename(self):
+        defaults = cfg.EnsembleRegistry._read(cfg.ensembles_file)[13770]
+        self.assertEqual(cfg.PACS_ensembles[13770].base_filename, defaults["base_filename"])
+        self.assertNotIn("base_filename", vars(cfg.PACSEnsemble))
+        self.assertRaises(ValueError, cfg.PACSEnsemble, 12000, {"runs": {"t": [100, 10]}})
+
+    def test_startIDs_13781(self):
+        self.assertEqual(
+            dict(cfg.startIDs_13781),
+            {1: "gM", 45: "hM", 67: "iM", 111: "jM", 155: "kM", 199: "end"},
+        )
+
+
+
+class Test_AvailabilityIndex(unittest.TestCase):
+    def test_availability(self):
+        run = cfg.get_run(13754, "a")
+        with tempfile.TemporaryDirectory() as root:
+            filenames = run.filenames([1, 2, 5])
+            os.makedirs(os.path.join(root, os.path.dirname(filenames[0])))
+            for filename in filenames:
+                open(os.path.join(root, filename), "w").close()
+
+            index = cfg.AvailabilityIndex(root)
+            np.testing.assert_array_equal(index.available_icons(run), [1, 2, 5])
+            self.assertEqual(index.missing_icons(run).size, 197)
+
+            configIDs = run.config_IDs()[:6] + [cfg.ConfigID.get(13770, icon=1, runID="a")]
+            np.testing.assert_array_equal(
+                index.exists(configIDs), [True, True, False, False, True, False, False]
+            )
+            self.assertEqual(index.missing(configIDs)[0], configIDs[2])
+
+            # New files are only seen once the directory has changed
+            directory = os.path.join(root, os.path.dirname(filenames[0]))
+            open(os.path.join(root, run.filenames([3])[0]), "w").close()
+            mtime = os.stat(directory).st_mtime_ns
+            os.utime(directory, ns=(mtime + 10**9, mtime + 10**9))
+            np.testing.assert_array_equal(index.available_icons(run), [1, 2, 3, 5])
+
+
+    def test_shared_directory(self):
+        class SharedIndex(cfg.AvailabilityIndex):
+            def _location(self, kappa):
+                return self.root, f"k{kappa}"
+
+        with tempfile.TemporaryDirectory() as root:
+            for name in ("k13754-a-002510", "k13770-a-001880", "k13770-a-001890"):
+                open(os.path.join(root, name), "w").close()
+            index = SharedIndex(root)
+            np.testing.assert_array_equal(index.ID_strs(13754), ["-a-002510"])
+            np.testing.assert_array_equal(index.ID_strs(13770), ["-a-001880", "-a-001890"])
+            np.testing.assert_array_equal(index.ID_strs(13754), ["-a-002510"])
 
 
 if __name__ == "__main__":
@@ -1,7 +1,12 @@
+import os
+import tempfile
 import unittest
 
+import numpy as np
+
 from utilities import correlatorOperations as co
 from utilities import configIDs as cfg
+from utilities import dirac, shifts
 
 
 class Test_CfunMetadata(unittest.TestCase):
@@ -44,4 +49,174 @@ class Test_ExceptionalConfig(unittest.TestCase):
         as_str = f"{kappa} {ID_str} {shift}"
         exc = co.ExceptionalConfig(kappa, cfg.ConfigID(kappa, ID_str = ID_str), shift)
         self.assertEqual(exc, co.ExceptionalConfig.init_from_string(as_str))
-        
\ No newline at end of file
+        
+
+
+class Test_RealignCorrelators(unittest.TestCase):
+    rng = np.random.default_rng(0)
+    correlators = rng.normal(size=(6, 8, 3))
+    t_shifts = np.array([0, 1, 7, 3, 3, 12])
+
+    def test_matches_roll(self):
+        aligned = co.RealignCorrelators(self.correlators, self.t_shifts)
+        for i, t_shift in enumerate(self.t_shifts):
+            np.testing.assert_array_equal(
+                aligned[i], np.roll(self.correlators[i], -t_shift, axis=0)
+            )
+
+    def test_antiperiodic(self):
+        aligned = co.RealignCorrelators(self.correlators, self.t_shifts, boundary_sign=-1)
+        NT = self.correlators.shape[1]
+        for i, t_shift in enumerate(self.t_shifts):
+            for t in range(NT):
+                sign = (-1) ** ((t + t_shift) // NT)
+                np.testing.assert_array_equal(
+                    aligned[i, t], sign * self.correlators[i, (t + t_shift) % NT]
+                )
+
+    def test_shift_inputs(self):
+        shift_strs = [f"x01y02z03t{t:02}" for t in self.t_shifts]
+        expected = co.RealignCorrelators(self.correlators, self.t_shifts)
+        np.testing.assert_array_equal(co.RealignCorrelators(self.correlators, shift_strs), expected)
+        np.testing.assert_array_equal(
+            co.RealignCorrelators(self.correlators, shifts.ShiftArray.from_strings(shift_strs)),
+            expected,
+        )
+        shift_paths = [f"output/BFx3y1/shx01y02z03t{t:02}/" for t in self.t_shifts]
+        np.testing.assert_array_equal(co.RealignCorrelators(self.correlators, shift_paths), expected)
+        self.assertRaises(ValueError, co.RealignCorrelators, self.correlators, [1, 2])
+
+    def test_average(self):
+        aligned = co.RealignCorrelators(self.correlators, self.t_shifts)
+        np.testing.assert_allclose(
+            co.AverageShiftedCorrelators(self.correlators, self.t_shifts), aligned.mean(axis=0)
+        )
+        groups = np.array([2, 1, 2, 1, 1, 2])
+        average = co.AverageShiftedCorrelators(self.correlators, self.t_shifts, groups)
+        np.testing.assert_allclose(average[0], aligned[[1, 3, 4]].mean(axis=0))
+        np.testing.assert_allclose(average[1], aligned[[0, 2, 5]].mean(axis=0))
+
+
+class Test_ProjectCorrelators(unittest.TestCase):
+    NT = 64
+    rng = np.random.default_rng(1)
+    correlators = rng.normal(size=(5, NT * 16)) + 1j * rng.normal(size=(5, NT * 16))
+
+    def naive(self, projector):
+        projected = np.zeros((5, self.NT), dtype=complex)
+        for c in range(5):
+            for t in range(self.NT):
+                projected[c, t] = np.trace(
+                    projector @ self.correlators[c, 16 * t : 16 * (t + 1)].reshape(4, 4)
+                )
+        return projected
+
+    def test_single(self):
+        projector = dirac.parity_projectors["+"]
+        expected = self.naive(projector)
+        np.testing.assert_allclose(co.ProjectCorrelators(self.correlators.T, projector), expected)
+        np.testing.assert_allclose(
+            co.ProjectCorrelators(self.correlators, projector, transpose=True), expected
+        )
+        np.testing.assert_allclose(
+            co.ProjectCorrelators(self.correlators, projector, transpose=True, chunk_size=2),
+            expected,
+        )
+
+    def test_load_correlators(self):
+        projector = dirac.parity_projectors["+"]
+        with tempfile.TemporaryDirectory() as directory:
+            files = []
+            for i, correlator in enumerate(self.correlators):
+                files.append(os.path.join(directory, f"{i}.2cf"))
+                correlator.astype(">c16").tofile(files[-1])
+            for transpose in (False, True):
+                loaded = co.LoadCorrelators(files, transpose=transpose)
+                np.testing.assert_allclose(
+                    co.ProjectCorrelators(loaded, projector, transpose=transpose),
+                    self.naive(projector),
+                )
+
+    def test_wrong_axis(self):
+        projector = dirac.parity_projectors["+"]
+        self.assertRaises(ValueError, co.ProjectCorrelators, self.correlators, projector)
+        self.assertRaises(
+            ValueError, co.ProjectCorrelators, self.correlators.T, projector, NT=32
+        )
+
+    def test_dict(self):
+        projected = co.ProjectCorrelators(
+            self.correlators, dirac.parity_projectors, transpose=True
+        )
+        for name, projector in dirac.parity_projectors.items():
+            np.testing.assert_allclose(projected[name], self.naive(projector))
+
+    def test_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            files = []
+            for i, correlator in enumerate(self.correlators):
+                files.append(os.path.join(directory, f"{i}.2cf"))
+                correlator.astype(">c16").tofile(files[-1])
+            stack = np.stack(list(dirac.parity_projectors.values()))
+            np.testing.assert_allclose(
+                co.ProjectCorrelatorFiles(files, stack, chunk_size=2),
+                co.ProjectCorrelators(self.correlators, stack, transpose=True),
+            )
+
+
+class Test_LoadMomentumCorrelators(unittest.TestCase):
+    momenta = [
+        co.CfunMomentum(indices, label="q")
+        for indices in ([0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, -1], [1, 1, 0], [0, -1, 1])
+    ]
+    rng = np.random.default_rng(2)
+
+    def write(self, directory, layout, ncon=3):
+        data = self.rng.normal(size=(ncon,) + layout.shape)
+        files = []
+        for i in range(ncon):
+            files.append(os.path.join(directory, f"{i}.2cf"))
+            data[i].astype(layout.dtype).tofile(files[-1])
+        if not layout.momentum_major:
+            data = data.swapaxes(1, 2)
+        return files, data
+
+    def test_layout(self):
+        layout = co.MomentumLayout([co.CfunMomentum([i, 0, 0], "q") for i in range(16)])
+        self.assertEqual(layout.nbytes, 262144)
+        self.assertRaises(ValueError, co.MomentumLayout, self.momenta[:4] * 4)
+        layout = co.MomentumLayout(self.momenta, NT=8, ncomponents=2)
+        np.testing.assert_array_equal(
+            layout.offsets([self.momenta[2], self.momenta[0]]), [2 * 8 * 2 * 16, 0]
+        )
+        self.assertRaises(ValueError, layout.slots, [co.CfunMomentum([2, 0, 0], "q")])
+
+    def test_label_ignored(self):
+        first, second = co.CfunMomentum([1, 0, 0], "a"), co.CfunMomentum([1, 0, 0], "b")
+        self.assertEqual(first, second)
+        self.assertEqual(len({first: 1, second: 2}), 1)
+        self.assertRaises(ValueError, co.MomentumLayout, [first, second])
+
+    def test_extract(self):
+        selection = [self.momenta[3], self.momenta[1]]
+        for momentum_major in (True, False):
+            layout = co.MomentumLayout(self.momenta, NT=8, ncomponents=2, momentum_major=momentum_major)
+            with tempfile.TemporaryDirectory() as directory:
+                files, data = self.write(directory, layout)
+                extracted = co.LoadMomentumCorrelators(files, selection, layout)
+            np.testing.assert_array_equal(extracted, data[:, [3, 1]])
+
+    def test_average_equivalent(self):
+        keys, inverse = co.GroupEquivalentMomenta(self.momenta)
+        self.assertEqual(keys, [(0, 0, 0), (0, 0, 1), (0, 1, 1)])
+        np.testing.assert_array_equal(inverse, [0, 1, 1, 1, 2, 2])
+
+        layout = co.MomentumLayout(self.momenta, NT=8, ncomponents=2)
+        with tempfile.TemporaryDirectory() as directory:
+            files, data = self.write(directory, layout)
+            averaged = co.LoadMomentumCorrelators(
+                files, self.momenta, layout, average_equivalent=True
+            )
+        np.testing.assert_allclose(averaged[:, 0], data[:, 0])
+        np.testing.assert_allclose(averaged[:, 1], data[:, 1:4].mean(axis=1))
+        np.testing.assert_allclose(averaged[:, 2], data[:, 4:].mean(axis=1))
@@ -0,0 +1,27 @@
+import unittest
+
+import numpy as np
+
+from utilities import dirac
+
+
+class Test_dirac(unittest.TestCase):
+    def test_clifford(self):
+        matrices = list(dirac.gammas) + [dirac.gamma_5]
+        for i, a in enumerate(matrices):
+            np.testing.assert_allclose(a, a.conj().T)
+            for j, b in enumerate(matrices):
+                np.testing.assert_allclose(a @ b + b @ a, 2 * (i == j) * dirac.identity)
+
+    def test_projectors(self):
+        plus, minus = dirac.parity_projectors["+"], dirac.parity_projectors["-"]
+        np.testing.assert_allclose(plus @ plus, plus)
+        np.testing.assert_allclose(plus + minus, dirac.identity)
+        up = dirac.spin_projector("+", "up")
+        down = dirac.spin_projector("+", "down")
+        np.testing.assert_allclose(up + down, plus)
+        np.testing.assert_allclose(up, np.diag([1, 0, 0, 0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+import numpy as np
+
+from utilities import effective_mass, fitting, jackknives as jack
+
+
+class Test_effective_mass(unittest.TestCase):
+    NT = 16
+    t = np.arange(NT)
+    rng = np.random.default_rng(0)
+    masses = 0.5 + rng.normal(0, 0.01, (2, 10, 1))
+
+    def test_log(self):
+        correlators = 3 * np.exp(-self.masses * self.t)
+        masses = effective_mass.log_effective_mass(correlators, tau=2)
+        self.assertEqual(masses.jackknives.shape, (2, self.NT, 10))
+        expected = np.broadcast_to(self.masses, (2, 10, self.NT - 2)).swapaxes(1, 2)
+        np.testing.assert_allclose(masses.jackknives[:, :-2], expected)
+        self.assertTrue(np.isnan(masses.jackknives[:, -2:]).all())
+
+    def test_invalid_tau(self):
+        correlators = 3 * np.exp(-self.masses * self.t)
+        kds = np.array([0, 1])
+        for tau in (0, -1, 1.5):
+            self.assertRaises(ValueError, effective_mass.log_effective_mass, correlators, tau)
+            self.assertRaises(
+                ValueError, effective_mass.energy_shifts, correlators, kds, tau=tau
+            )
+
+    def test_cosh(self):
+        correlators = np.exp(-self.masses * self.t) + np.exp(-self.masses * (self.NT - self.t))
+        masses = effective_mass.cosh_effective_mass(correlators)
+        np.testing.assert_allclose(
+            masses.jackknives[:, 1:-1],
+            np.broadcast_to(self.masses, (2, 10, self.NT - 2)).swapaxes(1, 2),
+        )
+
+    def test_energy_shifts(self):
+        kds = np.array([-1, 0, 1, 2])
+        shifts = np.array([0.02, 0, 0.04, 0.09])[:, None, None]
+        correlators = np.exp(-(self.masses[0] + shifts) * self.t)
+        correlators *= 1 + self.rng.normal(0, 1e-3, correlators.shape)
+
+        ratio_kds, ratios = effective_mass.ratio_correlators(correlators, kds)
+        np.testing.assert_array_equal(ratio_kds, [-1, 1, 2])
+        np.testing.assert_allclose(
+            ratios.jackknives[1], (correlators[2] / correlators[1]).T
+        )
+
+        signed_kds, signed = effective_mass.energy_shifts(correlators, kds, sign_average=False)
+        for i in range(3):
+            for t in range(self.NT - 1):
+                ratio = jack.JackknifeEnsemble(ratios.jackknives[i, t])
+                next_ratio = jack.JackknifeEnsemble(ratios.jackknives[i, t + 1])
+                np.testing.assert_allclose(
+                    signed.jackknives[i, t], np.log((ratio / next_ratio).jackknives)
+                )
+
+        abs_kds, averaged = effective_mass.energy_shifts(correlators, kds)
+        np.testing.assert_array_equal(abs_kds, [1, 2])
+        np.testing.assert_allclose(
+            averaged.jackknives[0], (signed.jackknives[0] + signed.jackknives[1]) / 2
+        )
+        np.testing.assert_allclose(averaged.jackknives[1], signed.jackknives[2])
+        np.testing.assert_allclose(averaged.ensemble_average[:, 3], [0.03, 0.09], atol=5e-3)
+
+        self.assertRaises(ValueError, effective_mass.ratio_correlators, correlators, [1, 2, 3, 4])
+
+    def test_ready_for_fitting(self):
+        kds = np.array([0, 1, 2])
+        correlators = np.exp(-(0.5 + np.array([0, 0.01, 0.04])[:, None, None]) * self.t)
+        correlators = correlators * (1 + self.rng.normal(0, 1e-4, (3, 10, self.NT)))
+        _, shifts = effective_mass.energy_shifts(correlators, kds)
+        target = fitting.PolarisabilityTarget(
+            "proton_1", "uds", None, np.ones(10), shifts[:, 4]
+        )
+        self.assertEqual((target.num_kd, target.ncon), (2, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
 import unittest
 
-from utilities import fitting
+import gvar as gv
+import numpy as np
+
+from utilities import configIDs, fitting, jackknives
 from utilities import structure
 
 
@@ -26,3 +29,153 @@ class Test_calculate_landau(unittest.TestCase):
 # class Test_convert_fit(unittest.TestCase):
 #     def test_convert(self):
 #         self.assertAlmostEqual(fitting.PolarisabilityFit.convert_fit(-0.0098517844, kappa=13700),0.000234630)
+
+
+class Test_BatchedPolarisabilityFit(unittest.TestCase):
+    def test_matches_polarisability_fit(self):
+        rng = np.random.default_rng(1)
+        ensemble = configIDs.PACS_ensembles[13770]
+        mass = jackknives.JackknifeEnsemble(1.05 + rng.normal(0, 0.001, 50))
+        energy_shifts = [
+            jackknives.JackknifeEnsemble(0.02 * kd + rng.normal(0, 3.0e-4, 50))
+            for kd in (1, 2, 3)
+        ]
+        targets = []
+        references = []
+        for particle in ("proton_1", "sigmap_1"):
+            targets.append(
+                fitting.PolarisabilityTarget(particle, "uds", ensemble, mass, energy_shifts)
+            )
+            fit = fitting.PolarisabilityFit(
+                particle,
+                structure.Structure("uds"),
+                ensemble,
+                gv.gvar(mass.ensemble_average, 0.01),
+                gv.gvar([e.ensemble_average for e in energy_shifts], [0.003] * 3),
+                mass_jackknives=mass,
+                energy_shift_jackknives=energy_shifts,
+                fit_jackknives=True,
+            )
+            fit.do_fit()
+            references.append(fit)
+
+        batched = fitting.BatchedPolarisabilityFit(targets)
+        batched.do_fit()
+        for i, fit in enumerate(references):
+            np.testing.assert_allclose(
+                batched.jackknife_fits_values[i].jackknives,
+                fit.jackknife_fits_values.jackknives,
+                rtol=1e-10,
+            )
+            np.testing.assert_allclose(batched.pmean[i], fit.average_fit.pmean[0], rtol=1e-8)
+            np.testing.assert_allclose(batched.psdev[i], gv.sdev(fit.average_fit.p[0]), rtol=1e-8)
+            np.testing.assert_allclose(batched.chi2[i], fit.average_fit.chi2, rtol=1e-6)
+            self.assertEqual(batched.dof[i], fit.average_fit.dof)
+
+    def test_diff_target_from_arrays(self):
+        ensemble = configIDs.PACS_ensembles[13770]
+        target = fitting.PolarisabilityTarget(
+            "proton_1",
+            "uds",
+            ensemble,
+            np.ones(10),
+            np.ones((2, 10)),
+            particle_2="neutron_1",
+            structure_2="uds",
+            mass_2_jackknives=np.ones(10),
+        )
+        self.assertTrue(target.is_diff)
+        np.testing.assert_array_equal(target.mass_2_jackknives, np.ones(10))
+
+    def test_diff_target_requires_all(self):
+        ensemble = configIDs.PACS_ensembles[13770]
+        self.assertRaises(
+            ValueError,
+            fitting.PolarisabilityTarget,
+            "proton_1",
+            "uds",
+            ensemble,
+            np.ones(10),
+            np.ones((2, 10)),
+            particle_2="neutron_1",
+        )
+
+
+class Test_Fit_1d(unittest.TestCase):
+    def test_jackknife_array(self):
+        rng = np.random.default_rng(2)
+        x = np.arange(4.0)
+        data = jackknives.JackknifeArray(
+            (1 + 0.5 * x)[:, None] + rng.normal(0, 0.01, 30) + rng.normal(0, 0.002, (4, 30))
+        )
+        fits = [fitting.Fit_1d(lambda x, p: p[0] + p[1] * x, 2, x, data) for _ in range(2)]
+        # Every fit of the same jackknives shares their cached gvars
+        self.assertIs(fits[0].y, data.gvars)
+        self.assertIs(fits[1].y, data.gvars)
+
+        reference = fitting.Fit_1d(
+            lambda x, p: p[0] + p[1] * x, 2, x, data.ensemble_average,
+            jackknives=data.to_ensembles(),
+        )
+        self.assertIsNot(reference.y, data.gvars)
+        for fit in fits + [reference]:
+            fit.do_fit()
+        np.testing.assert_allclose(fits[0].average_fit.pmean, reference.average_fit.pmean)
+        np.testing.assert_allclose(
+            gv.sdev(fits[0].average_fit.p), gv.sdev(reference.average_fit.p)
+        )
+        self.assertRaises(
+            ValueError, fitting.Fit_1d, lambda x, p: p[0], 1, x, data, jackknives=data[:2]
+        )
+
+
+class Test_GlobalFit(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        rng = np.random.default_rng(3)
+        self.datasets = []
+        self.keys = []
+        for kappa, mpi_squared in zip(configIDs.PACS_ensembles, (0.49, 0.32, 0.17, 0.09, 0.02)):
+            # Two correlated observables per ensemble
+            common = rng.normal(0, 0.01, 40)
+            for _ in range(2):
+                ensembles = [
+                    jackknives.JackknifeEnsemble(
+                        1 + 0.5 * mpi_squared + common + rng.normal(0, 0.002, 40)
+                    )
+                ]
+                self.datasets.append(
+                    fitting.Fit_1d(
+                        lambda x, p: p[0] + p[1] * x,
+                        2,
+                        np.array([mpi_squared]),
+                        np.array([ensembles[0].ensemble_average]),
+                        jackknives=ensembles,
+                    )
+                )
+                self.keys.append(kappa)
+
+    def test_blocks(self):
+        fit = fitting.GlobalFit(self.datasets, keys=self.keys, initial_guess=[1, 0])
+        self.assertEqual(len(fit.blocks), 5)
+        for covariance in fit.block_covariances.values():
+            self.assertEqual(covariance.shape, (2, 2))
+            self.assertGreater(covariance[0, 1], 0)
+
+    def test_backends_agree(self):
+        fits = {}
+        for backend in fitting.Fit_1d.backends:
+            fits[backend] = fitting.GlobalFit(
+                self.datasets, keys=self.keys, initial_guess=[1, 0], backend=backend
+            )
+            fits[backend].do_fit()
+        np.testing.assert_allclose(
+            fits["array"].average_fit.pmean, fits["lsqfit"].average_fit.pmean, rtol=1e-8
+        )
+        np.testing.assert_allclose(
+            fits["array"].average_fit.chi2, fits["lsqfit"].average_fit.chi2, rtol=1e-6
+        )
+        np.testing.assert_allclose(
+            fits["array"].average_fit.cov, fits["lsqfit"].average_fit.cov, rtol=1e-6
+        )
+        self.assertEqual(fits["array"].average_fit.dof, 8)
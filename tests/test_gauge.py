@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from utilities import gauge
+
+NS, NT = 2, 4
+
+
+def random_su3(rng: np.random.Generator, shape: tuple[int]) -> np.ndarray:
+    matrices = rng.normal(size=shape + (3, 3)) + 1j * rng.normal(size=shape + (3, 3))
+    q, r = np.linalg.qr(matrices)
+    phases = np.diagonal(r, axis1=-2, axis2=-1) / np.abs(np.diagonal(r, axis1=-2, axis2=-1))
+    q = q * phases[..., None, :]
+    return q / np.linalg.det(q)[..., None, None] ** (1 / 3)
+
+
+def gauge_transform(links: np.ndarray, transform: np.ndarray) -> np.ndarray:
+    transformed = np.empty_like(links)
+    for mu, axis in enumerate(gauge.direction_axes):
+        shifted = np.roll(transform, -1, axis=axis)
+        transformed[..., mu, :, :] = (
+            transform @ links[..., mu, :, :] @ np.conj(np.swapaxes(shifted, -1, -2))
+        )
+    return transformed
+
+
+def naive_plaquette(links: np.ndarray) -> float:
+    total, count = 0.0, 0
+    for site in np.ndindex(links.shape[:4]):
+        for nu in range(4):
+            for mu in range(nu):
+                site_mu, site_nu = list(site), list(site)
+                axis_mu, axis_nu = gauge.direction_axes[mu], gauge.direction_axes[nu]
+                site_mu[axis_mu] = (site_mu[axis_mu] + 1) % links.shape[axis_mu]
+                site_nu[axis_nu] = (site_nu[axis_nu] + 1) % links.shape[axis_nu]
+                loop = (
+                    links[site][mu]
+                    @ links[tuple(site_mu)][nu]
+                    @ np.conj(links[tuple(site_nu)][mu]).T
+                    @ np.conj(links[site][nu]).T
+                )
+                total += np.trace(loop).real / 3
+                count += 1
+    return total / count
+
+
+class Test_gauge(unittest.TestCase):
+    rng = np.random.default_rng(0)
+    links = random_su3(rng, (NT, NS, NS, NS, 4))
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, links, name="config", **kwargs):
+        filepath = os.path.join(self.directory.name, name)
+        gauge.write_gauge_field(filepath, links, **kwargs)
+        return filepath
+
+    def test_unit_gauge(self):
+        links = np.broadcast_to(np.eye(3), (NT, NS, NS, NS, 4, 3, 3))
+        mapped = gauge.load_gauge_field(self.write(links), NS=NS, NT=NT)
+        np.testing.assert_allclose(gauge.plaquette(mapped), 1)
+        self.assertAlmostEqual(gauge.polyakov_loop(mapped), 1)
+
+    def test_lime_round_trip(self):
+        filepath = self.write(self.links, precision=32)
+        records = gauge.scan_lime_records(filepath)
+        self.assertEqual(
+            [record.type for record in records],
+            [gauge.ildg_format_record, gauge.ildg_binary_record],
+        )
+        mapped = gauge.load_gauge_field(filepath, NS=NS, NT=NT)
+        self.assertIsInstance(mapped, np.memmap)
+        self.assertEqual(mapped.dtype, np.dtype(">c8"))
+        np.testing.assert_allclose(mapped, self.links, atol=1e-6)
+        self.assertRaises(ValueError, gauge.load_gauge_field, filepath, NS=NS, NT=2 * NT)
+
+    def test_raw_little_endian(self):
+        filepath = os.path.join(self.directory.name, "raw")
+        self.links.astype("<c16").tofile(filepath)
+        mapped = gauge.load_gauge_field(filepath, NS=NS, NT=NT, byteorder="<")
+        np.testing.assert_array_equal(mapped, self.links)
+
+    def test_plaquette(self):
+        mapped = gauge.load_gauge_field(self.write(self.links), NS=NS, NT=NT)
+        self.assertAlmostEqual(gauge.plaquette(mapped).mean(), naive_plaquette(self.links))
+
+    def test_gauge_invariance(self):
+        transform = random_su3(self.rng, (NT, NS, NS, NS))
+        transformed = gauge_transform(self.links, transform)
+        np.testing.assert_allclose(
+            gauge.plaquette(transformed), gauge.plaquette(self.links), atol=1e-12
+        )
+        np.testing.assert_allclose(
+            gauge.polyakov_loop(transformed, average=False),
+            gauge.polyakov_loop(self.links, average=False),
+            atol=1e-12,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+import numpy as np
+from scipy import linalg
+
+from utilities import effective_mass, gevp, particles
+
+
+class Test_gevp(unittest.TestCase):
+    NT, ncon, t0 = 12, 20, 2
+    energies = np.array([0.4, 0.7, 1.1])
+    rng = np.random.default_rng(0)
+    overlaps = np.array([[1.0, 0.5, 0.2], [0.6, -1.0, 0.3], [0.1, 0.4, 0.8]])
+
+    @classmethod
+    def setUpClass(cls):
+        t = np.arange(cls.NT)
+        exact = np.einsum(
+            "in,jn,tn->tij", cls.overlaps, cls.overlaps, np.exp(-np.outer(t, cls.energies))
+        )
+        noise = 1e-4 * cls.rng.normal(size=(cls.ncon, cls.NT, 3, 3))
+        cls.matrices = exact * (1 + noise + np.swapaxes(noise, -1, -2))
+        cls.problem = gevp.GEVP(cls.matrices, cls.t0).solve()
+
+    def test_correlation_matrix(self):
+        chis = particles.interpolator_basis("proton")
+        self.assertEqual(chis, ["proton_1", "proton_2"])
+        correlators = {
+            ("proton_1", "proton_1bar"): np.ones((4, 8)),
+            "proton_1proton_2bar": 2 * np.ones((4, 8)),
+            ("proton_2", "proton_1bar"): 4 * np.ones((4, 8)),
+            ("proton_2", "proton_2bar"): 5 * np.ones((4, 8)),
+        }
+        matrices = gevp.correlation_matrix(correlators, chis, symmetrise=False)
+        self.assertEqual(matrices.shape, (4, 8, 2, 2))
+        np.testing.assert_array_equal(matrices[0, 0], [[1, 2], [4, 5]])
+        matrices = gevp.correlation_matrix(correlators, chis)
+        np.testing.assert_array_equal(matrices[0, 0], [[1, 3], [3, 5]])
+        self.assertRaises(KeyError, gevp.correlation_matrix, correlators, ["proton_1", "neutron_1"])
+
+    def test_matches_scipy(self):
+        t = 5
+        values, vectors = gevp.solve_gevp(self.matrices[0, t], self.matrices[0, self.t0])
+        expected = linalg.eigh(self.matrices[0, t], self.matrices[0, self.t0], eigvals_only=True)
+        np.testing.assert_allclose(values, expected[::-1])
+        np.testing.assert_allclose(
+            self.matrices[0, t] @ vectors,
+            self.matrices[0, self.t0] @ vectors * values,
+            atol=1e-12,
+        )
+
+    def test_eigenvalues(self):
+        t = np.arange(self.NT)[:, None]
+        expected = np.exp(-self.energies * (t - self.t0))
+        average = self.problem.average_eigenvalues
+        self.assertTrue(np.isnan(average[self.t0]).all())
+        # Largest eigenvalue is the ground state for t > t0
+        np.testing.assert_allclose(
+            average[self.t0 + 1 :], expected[self.t0 + 1 :], rtol=1e-2
+        )
+
+    def test_tracking(self):
+        # Shuffle and flip the eigenvectors of some samples, matching must undo it
+        values, vectors = gevp.solve_gevp(self.matrices[:, 6], self.matrices[:, self.t0])
+        shuffled = vectors[..., [2, 0, 1]] * np.array([-1, 1, -1])
+        order, signs = gevp.match_eigenvectors(
+            shuffled, self.problem.average_eigenvectors[6], self.matrices[:, self.t0]
+        )
+        matched = np.take_along_axis(shuffled, order[:, None, :], axis=-1) * signs[:, None, :]
+        np.testing.assert_allclose(matched, self.problem.eigenvectors[:, 6])
+
+        reference = self.problem.average_eigenvectors[6]
+        overlaps = np.einsum("in,cij,cjn->cn", reference, self.matrices[:, self.t0], matched)
+        self.assertTrue((overlaps > 0).all())
+
+    def test_projected_correlators(self):
+        projected = self.problem.projected_correlators(self.t0 + 2)
+        self.assertEqual(projected.shape, (3, self.ncon, self.NT))
+        masses = effective_mass.log_effective_mass(projected)
+        np.testing.assert_allclose(masses.ensemble_average[:, 6], self.energies, rtol=1e-2)
+
+
+if __name__ == "__main__":
+    unittest.main()
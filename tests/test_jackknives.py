@@ -1,5 +1,8 @@
 import unittest
 
+import gvar as gv
+import numpy as np
+
 from utilities import jackknives as jack
 
 
@@ -56,4 +59,56 @@ class Test_Jackknives(unittest.TestCase):
         self.assertAlmostEqual((ensemble1 ** 2).ensemble_average, 1.0010, places=4)
         self.assertAlmostEqual((ensemble1 ** 2).jackknife_error, 0.16127, places=4)
         self.assertAlmostEqual((2 ** ensemble1).ensemble_average, 2.0004997, places=4)
-        self.assertAlmostEqual((2 ** ensemble1).jackknife_error, 0.111797, places=4)
\ No newline at end of file
+        self.assertAlmostEqual((2 ** ensemble1).jackknife_error, 0.111797, places=4)
+
+class Test_JackknifeArray(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        rng = np.random.default_rng(0)
+        common = rng.normal(0, 0.1, 20)
+        self.ensembles = [
+            jack.JackknifeEnsemble(i + common + rng.normal(0, 0.05, 20)) for i in range(3)
+        ]
+        self.array = jack.JackknifeArray.from_ensembles(self.ensembles)
+
+    def test_uncertainties(self):
+        self.assertEqual(self.array.uncertainties.shape, (3, 20))
+        for i, ensemble in enumerate(self.ensembles):
+            np.testing.assert_allclose(self.array.uncertainties[i], ensemble.uncertainties)
+
+    def test_covariance(self):
+        jackknives = self.array.jackknives
+        averages = jackknives.mean(axis=1)
+        expected = 19 * (jackknives @ jackknives.T / 20 - np.outer(averages, averages))
+        np.testing.assert_allclose(self.array.covariance_matrix, expected)
+        np.testing.assert_allclose(
+            self.array.jackknife_error, [e.jackknife_error for e in self.ensembles]
+        )
+
+    def test_gvars(self):
+        gvars = self.array.gvars
+        self.assertIs(gvars, self.array.gvars)
+        np.testing.assert_allclose(gv.mean(gvars), [e.ensemble_average for e in self.ensembles])
+        np.testing.assert_allclose(gv.evalcov(gvars), self.array.covariance_matrix)
+
+    def test_arithmetic(self):
+        jackknives = self.array.jackknives
+        np.testing.assert_allclose((self.array + self.array).jackknives, 2 * jackknives)
+        np.testing.assert_allclose((1 - self.array).jackknives, 1 - jackknives)
+        np.testing.assert_allclose(
+            (self.array / [1, 2, 4]).jackknives, jackknives / np.array([1, 2, 4])[:, None]
+        )
+        np.testing.assert_allclose(
+            (self.array * self.ensembles[0]).jackknives, jackknives * jackknives[0]
+        )
+        np.testing.assert_allclose((-self.array).jackknives, -jackknives)
+        np.testing.assert_allclose(self.array.apply(np.exp).jackknives, np.exp(jackknives))
+
+    def test_indexing(self):
+        self.assertEqual(len(self.array), 3)
+        self.assertIsInstance(self.array[1], jack.JackknifeEnsemble)
+        np.testing.assert_allclose(self.array[1].jackknives, self.ensembles[1].jackknives)
+        self.assertEqual(
+            [e.ensemble_average for e in self.array],
+            [e.ensemble_average for e in self.ensembles],
+        )
@@ -0,0 +1,98 @@
+import unittest
+
+import gvar as gv
+import numpy as np
+
+from utilities import fitting, jackknives as jack, least_squares, models
+
+
+class Test_levenberg_marquardt(unittest.TestCase):
+    x = np.arange(1, 9, dtype=float)
+
+    def test_batched_matches_single(self):
+        rng = np.random.default_rng(0)
+        errors = 0.01 * np.exp(-0.5 * self.x)
+        y = 1.5 * np.exp(-0.5 * self.x) + rng.normal(0, 1, (4, self.x.size)) * errors
+        batched = least_squares.fit(
+            models.exponential, self.x, y, p0=[1, 0.4], errors=errors
+        )
+        self.assertTrue(batched.converged.all())
+        for i in range(y.shape[0]):
+            single = least_squares.fit(
+                models.exponential, self.x, y[i], p0=[1, 0.4], errors=errors
+            )
+            np.testing.assert_allclose(batched.pmean[i], single.pmean, rtol=1e-8)
+            np.testing.assert_allclose(batched.chi2[i], single.chi2, rtol=1e-8)
+
+    def test_callable_matches_model(self):
+        rng = np.random.default_rng(1)
+        cov = np.diag((0.02 * np.exp(-0.5 * self.x)) ** 2)
+        y = rng.multivariate_normal(1.5 * np.exp(-0.5 * self.x), cov)
+        model_fit = least_squares.fit(models.exponential, self.x, y, [1, 0.4], cov)
+        callable_fit = least_squares.fit(
+            lambda x, p: p[0] * np.exp(-p[1] * x), self.x, y, [1, 0.4], cov
+        )
+        np.testing.assert_allclose(model_fit.pmean, callable_fit.pmean, rtol=1e-6)
+        np.testing.assert_allclose(model_fit.cov, callable_fit.cov, rtol=1e-4)
+
+
+class Test_Fit_1d_array_backend(unittest.TestCase):
+    def test_matches_lsqfit(self):
+        rng = np.random.default_rng(2)
+        x = np.arange(1, 4)
+        ensembles = [
+            jack.JackknifeEnsemble(-0.01 * xi**2 + rng.normal(0, 2e-4, 40)) for xi in x
+        ]
+        y = np.array([ensemble.ensemble_average for ensemble in ensembles])
+
+        fits = {}
+        for backend in fitting.Fit_1d.backends:
+            fits[backend] = fitting.Fit_1d(
+                models.quadratic,
+                None,
+                x,
+                y,
+                jackknives=ensembles,
+                calculate_naive_chi_sq=True,
+                fit_jackknives=True,
+                backend=backend,
+            )
+            fits[backend].do_fit()
+
+        lsqfit_fit, array_fit = fits["lsqfit"], fits["array"]
+        np.testing.assert_allclose(
+            array_fit.average_fit.pmean, lsqfit_fit.average_fit.pmean, rtol=1e-8
+        )
+        np.testing.assert_allclose(
+            array_fit.average_fit.chi2, lsqfit_fit.average_fit.chi2, rtol=1e-8
+        )
+        self.assertEqual(array_fit.average_fit.dof, lsqfit_fit.average_fit.dof)
+        np.testing.assert_allclose(
+            gv.sdev(array_fit.average_fit.p), gv.sdev(lsqfit_fit.average_fit.p)
+        )
+        np.testing.assert_allclose(
+            array_fit.naive_fit.chi2, lsqfit_fit.naive_fit.chi2, rtol=1e-8
+        )
+        np.testing.assert_allclose(
+            array_fit.jackknife_fits_values.jackknives,
+            lsqfit_fit.jackknife_fits_values.jackknives,
+            rtol=1e-8,
+        )
+
+    def test_prior_rejected(self):
+        x = np.arange(1, 4)
+        y = gv.gvar(x, x)
+        self.assertRaises(
+            ValueError,
+            fitting.Fit_1d,
+            models.quadratic,
+            None,
+            x,
+            y,
+            prior={"a0": gv.gvar(0, 1)},
+            backend="array",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+import gvar as gv
+import numpy as np
+
+from utilities import fitting, models
+
+
+def finite_difference_jacobian(model, x, p, step=1e-6):
+    jacobian = np.zeros((x.size, p.size))
+    for i in range(p.size):
+        dp = np.zeros(p.size)
+        dp[i] = step
+        jacobian[:, i] = (model.evaluate(x, p + dp) - model.evaluate(x, p - dp)) / (
+            2 * step
+        )
+    return jacobian
+
+
+class Test_Models(unittest.TestCase):
+    x = np.arange(1, 10, dtype=float)
+    cases = [
+        (models.constant, np.array([0.5])),
+        (models.quadratic, np.array([-0.01])),
+        (models.exponential, np.array([1.2, 0.6])),
+        (models.MultiExponential(2), np.array([1.2, 0.6, 0.4, 1.1])),
+        (models.Cosh(NT=16), np.array([0.8, 0.3])),
+    ]
+
+    def test_jacobian(self):
+        for model, p in self.cases:
+            np.testing.assert_allclose(
+                model.jacobian(self.x, p),
+                finite_difference_jacobian(model, self.x, p),
+                rtol=1e-6,
+                atol=1e-9,
+            )
+
+    def test_batched(self):
+        for model, p in self.cases:
+            batch = np.stack([p, 1.1 * p, 0.9 * p])
+            values = model.evaluate(self.x, batch)
+            jacobian = model.jacobian(self.x, batch)
+            self.assertEqual(values.shape, (3, self.x.size))
+            self.assertEqual(jacobian.shape, (3, self.x.size, model.nparams))
+            np.testing.assert_allclose(values[1], model.evaluate(self.x, 1.1 * p))
+            np.testing.assert_allclose(jacobian[2], model.jacobian(self.x, 0.9 * p))
+
+    def test_gvar_call(self):
+        model = models.exponential
+        p = gv.gvar(["1.2(1)", "0.60(5)"])
+        p = gv.gvar(gv.mean(p), gv.evalcov(p))
+        expected = p[0] * gv.exp(-p[1] * self.x)
+        result = model(self.x, p)
+        np.testing.assert_allclose(gv.mean(result), gv.mean(expected))
+        np.testing.assert_allclose(gv.evalcov(result), gv.evalcov(expected))
+
+
+class Test_Fit_1d_models(unittest.TestCase):
+    def test_matches_callable(self):
+        x = np.arange(1, 8, dtype=float)
+        y = gv.gvar(1.3 * np.exp(-0.45 * x), 0.01 * np.exp(-0.45 * x))
+
+        model_fit = fitting.Fit_1d(
+            models.exponential, None, x, y, initial_guess=[1, 0.5]
+        )
+        model_fit.do_fit()
+        callable_fit = fitting.Fit_1d(
+            lambda x, p: p[0] * gv.exp(-p[1] * x), 2, x, y, initial_guess=[1, 0.5]
+        )
+        callable_fit.do_fit()
+        np.testing.assert_allclose(
+            model_fit.average_fit.pmean, callable_fit.average_fit.pmean, rtol=1e-6
+        )
+        np.testing.assert_allclose(
+            model_fit.average_fit.chi2, callable_fit.average_fit.chi2, atol=1e-8
+        )
+
+    def test_nparams_mismatch(self):
+        x = np.arange(1, 4, dtype=float)
+        y = gv.gvar(x, x)
+        self.assertRaises(ValueError, fitting.Fit_1d, models.exponential, 3, x, y)
+
+    def test_prior(self):
+        x = np.arange(1, 8, dtype=float)
+        y = gv.gvar(1.3 * np.exp(-0.45 * x), 0.01 * np.exp(-0.45 * x))
+        prior = gv.gvar(["1(1)", "0.5(5)"])
+        self.assertRaises(
+            ValueError, fitting.Fit_1d, models.exponential, None, x, y, prior={"p": prior}
+        )
+        fit = fitting.Fit_1d(models.exponential, None, x, y, prior=prior)
+        fit.do_fit()
+        np.testing.assert_allclose(fit.average_fit.pmean, [1.3, 0.45], rtol=1e-2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 
-from utilities import particles
+import numpy as np
+
+from utilities import misc, particles
 from utilities import structure
 
 
@@ -48,6 +50,11 @@ class Test_get_particle_charge(unittest.TestCase):
         self.assertEqual(particles.get_particle_charge("cascade0_1", self.nlds), -2 / 3)
         self.assertEqual(particles.get_particle_charge("cascade0_1", self.dds), -1)
 
+    def test_unknown(self):
+        with self.assertRaisesRegex(KeyError, "protn"):
+            particles.get_particle_charge("protn", self.uds)
+        self.assertRaises(TypeError, particles.get_particle_charge, 1, self.uds)
+
     def test_baryon_bar(self):
         self.assertEqual(particles.get_particle_charge("proton_1bar", self.uds), -1)
         self.assertEqual(particles.get_particle_charge("proton_1bar", self.nlds), 1 / 3)
@@ -78,3 +85,87 @@ class Test_get_particle_charge(unittest.TestCase):
         self.assertEqual(particles.get_particle_charge("kaonpbar", self.uds), -1)
         self.assertEqual(particles.get_particle_charge("kaonpbar", self.dds), 0)
         self.assertEqual(particles.get_particle_charge("kaonpbar", self.nlds), -1 / 3)
+
+
+class Test_ParticleRegistry(unittest.TestCase):
+    registry = particles.particle_registry
+
+    def test_registered(self):
+        self.assertIn("proton_1", self.registry)
+        self.assertIn(particles.sigma0_2bar, self.registry)
+        self.assertNotIn(particles.Particle(composition=["u", "u"]), self.registry)
+        self.assertEqual(len(self.registry.structures), 7**3)
+
+    def test_matches_composition(self):
+        for name in ("proton_1", "sigma0_1bar", "pip", "kaonpbar"):
+            particle = self.registry.particles[name]
+            for structure_ in self.registry.structures[::17]:
+                charge = 0
+                for quark in particle.composition:
+                    sign = -1 if quark[0] == "A" else 1
+                    charge += sign * particles.quark_charge[getattr(structure_, quark.lstrip("A"))]
+                self.assertAlmostEqual(self.registry.charge(name, structure_), charge)
+
+    def test_charges_of(self):
+        names = ["proton_1", "neutron_1bar", "pip", "proton_1"]
+        structures = ["uds", "nlds", structure.Structure("dds"), ["u", "u", "s"]]
+        np.testing.assert_array_equal(
+            self.registry.charges_of(names, structures), [1, 2 / 3, 0, 2]
+        )
+
+    def test_unregistered(self):
+        particle = particles.Particle(composition=["u", "u"])
+        self.assertEqual(particles.get_particle_charge(particle, structure.Structure("dds")), -2 / 3)
+
+
+class Test_vanishing_fields(unittest.TestCase):
+    def test_check_for_vanishing_fields(self):
+        particle_list = [
+            ["lambda0_1", "sigma0_1bar"],
+            ["lambda0_1", "lambda0_1bar"],
+            ["sigma0_2", "lambda0_1bar"],
+            ["proton_1", "proton_1bar"],
+        ]
+        self.assertEqual(
+            particles.CheckForVanishingFields(True, particle_list),
+            [["lambda0_1", "lambda0_1bar"], ["proton_1", "proton_1bar"]],
+        )
+        self.assertIs(particles.CheckForVanishingFields(False, particle_list), particle_list)
+        self.assertEqual(
+            particles.CheckForVanishingFields(True, chi="sigma0_1", chibar="lambda0_2bar"), []
+        )
+
+    def test_operator_combinations(self):
+        detail_set = {
+            "chi": ["lambda0_1", "sigma0_1"],
+            "chibar": ["lambda0_1bar", "sigma0_1bar"],
+            "structure": ["uds", "nlds"],
+            "kd": [1, 2, 3],
+        }
+        combinations = list(particles.operator_combinations(detail_set))
+        self.assertEqual(len(combinations), 2 * 2 * 3)
+        for combination in combinations:
+            self.assertEqual(list(combination), list(detail_set))
+            self.assertFalse(particles.is_vanishing(combination["chi"], combination["chibar"]))
+        self.assertEqual(
+            len(list(particles.operator_combinations(detail_set, isospin_sym=False))),
+            4 * 2 * 3,
+        )
+
+    def test_operator_combinations_order(self):
+        detail_set = {
+            "structure": ["uds", "nlds"],
+            "chi": ["lambda0_1", "sigma0_1"],
+            "kd": [1, 2, 3],
+            "chibar": ["lambda0_1bar", "sigma0_1bar"],
+        }
+        expected = [
+            combination
+            for combination in misc.GetCombinations(detail_set)
+            if not particles.is_vanishing(combination["chi"], combination["chibar"])
+        ]
+        self.assertEqual(list(particles.operator_combinations(detail_set)), expected)
+        self.assertEqual(
+            list(particles.operator_combinations(detail_set, isospin_sym=False)),
+            misc.GetCombinations(detail_set),
+        )
@@ -0,0 +1,129 @@
+import io
+import pickle
+import unittest
+
+import numpy as np
+
+from utilities import configIDs as cfg, shifts
+
+
+class Test_Shift(unittest.TestCase):
+    def test_init(self):
+        shift = shifts.Shift("x23y08z26t00")
+        self.assertEqual(tuple(shift), (23, 8, 26, 0))
+        self.assertEqual(str(shift), "x23y08z26t00")
+        self.assertIs(shift, shifts.Shift(x=23, y=8, z=26, t=0))
+        self.assertIs(shift, shifts.Shift("x23y08z26t00", x=23, y=8, z=26))
+        self.assertRaises(ValueError, shifts.Shift, "x23y08z26t00", x=1)
+        self.assertRaises(ValueError, shifts.Shift)
+
+    def test_keeps_string(self):
+        for shift_str in ("t05", "shx23y08z26t00", "output/shx01y02z03t04/"):
+            shift = shifts.Shift(shift_str)
+            self.assertEqual(str(shift), shift_str)
+            self.assertEqual(shift.shift_str, shift_str)
+            self.assertIs(shifts.Shift(str(shift)), shift)
+            self.assertIs(pickle.loads(pickle.dumps(shift)), shift)
+        self.assertEqual(str(shifts.Shift(t=5)), "t05")
+        self.assertEqual(str(shifts.Shift(x=1, t=12)), "x01t12")
+
+        # Equal coordinates compare equal whatever the string
+        self.assertEqual(shifts.Shift("t05"), shifts.Shift("x00y00z00t05"))
+        self.assertEqual(hash(shifts.Shift("t05")), hash(shifts.Shift(t=5, x=0)))
+        self.assertEqual(str(shifts.Shift.from_int(int(shifts.Shift("t05")))), "x00y00z00t05")
+
+    def test_zero(self):
+        shift = shifts.Shift(x=0, y=0, z=0, t=0)
+        self.assertEqual(str(shift), "x00y00z00t00")
+        self.assertEqual(shift, (0, 0, 0, 0))
+
+    def test_pack(self):
+        shift = shifts.Shift(x=31, y=2, z=17, t=63)
+        self.assertEqual(int(shift), 31 | 2 << 8 | 17 << 16 | 63 << 24)
+        self.assertIs(shifts.Shift.from_int(int(shift)), shift)
+        self.assertIs(pickle.loads(pickle.dumps(shift)), shift)
+        self.assertRaises(ValueError, shifts.Shift, x=256)
+
+    def test_slots(self):
+        self.assertFalse(hasattr(shifts.Shift(t=4), "__dict__"))
+
+    def test_immutable(self):
+        shift = shifts.Shift("x01y02z03t04")
+        for name in ("x", "t", "shift_str", "_packed"):
+            with self.assertRaises(AttributeError):
+                setattr(shift, name, 0)
+            with self.assertRaises(AttributeError):
+                delattr(shift, name)
+        self.assertEqual(tuple(shift), (1, 2, 3, 4))
+        self.assertEqual(str(shift), "x01y02z03t04")
+
+    def test_format(self):
+        self.assertEqual(shifts.Shift.format_shift(x=1, t=12), "x01t12")
+        self.assertEqual(shifts.Shift.format_shift(), "t00")
+        shift = shifts.Shift("x01y02z03t04")
+        self.assertEqual(shift.format_for_cola("full"), "1 2 3 4")
+        self.assertEqual(shift.format_for_cola("emode"), "1 2 3 0")
+        self.assertEqual(shift.format_for_cola("lpsink"), "0 0 0 4")
+
+
+class Test_ShiftArray(unittest.TestCase):
+    shift_strs = ["x23y08z26t00", "x01y02z03t63", "t05", "x23y08z26t00"]
+
+    def test_from_strings(self):
+        shift_array = shifts.ShiftArray.from_strings(self.shift_strs)
+        for shift_str, shift in zip(self.shift_strs, shift_array):
+            self.assertEqual(shift, shifts.Shift(shift_str))
+            self.assertIs(shift, shifts.Shift.from_int(int(shift)))
+        np.testing.assert_array_equal(
+            shift_array.strings(),
+            [shifts.Shift.format_shift(*shifts.Shift(s)) for s in self.shift_strs],
+        )
+
+    def test_from_strings_matches_shift(self):
+        shift_strs = [
+            "output/shx01y02z03t04",
+            "BFx3y1_shx01y02z03t04",
+            "/data/13770/RC32x64_B1900Kud01377000Ks01364000C1715-a-001110/shx23y08z26t00/",
+            "x2y08",
+            "nothing",
+        ]
+        shift_array = shifts.ShiftArray.from_strings(shift_strs)
+        self.assertEqual(
+            shift_array.values.tolist(), [list(shifts.Shift(s)) for s in shift_strs]
+        )
+        self.assertEqual(tuple(shift_array[0]), (1, 2, 3, 4))
+        self.assertEqual(len(shifts.ShiftArray.from_strings([])), 0)
+
+    def test_packed(self):
+        shift_array = shifts.ShiftArray.from_strings(self.shift_strs)
+        packed = shift_array.packed()
+        self.assertEqual(packed.tolist(), [int(shift) for shift in shift_array])
+        self.assertEqual(shifts.ShiftArray.from_packed(packed), shift_array)
+
+    def test_unique(self):
+        unique = shifts.ShiftArray.from_strings(self.shift_strs).unique()
+        self.assertEqual(unique, shifts.ShiftArray.from_strings(self.shift_strs[:3]))
+
+    def test_random(self):
+        ensemble = cfg.PACS_ensembles[13770]
+        random = shifts.ShiftArray.random_for_ensemble(1000, 13770, seed=4)
+        self.assertEqual(len(random), 1000)
+        self.assertEqual(len(random.unique()), 1000)
+        self.assertTrue(np.all(random.values[:, :3] < ensemble.NS))
+        self.assertTrue(np.all(random.values[:, 3] < ensemble.NT))
+        self.assertEqual(random, shifts.ShiftArray.random(1000, seed=4))
+        self.assertEqual(len(shifts.ShiftArray.random(16, NS=2, NT=2, seed=0).unique()), 16)
+
+    def test_cola(self):
+        shift_array = shifts.ShiftArray.from_strings(self.shift_strs)
+        for shift_type in ("full", "emode", "lpsink"):
+            expected = [shift.format_for_cola(shift_type) for shift in shift_array]
+            self.assertEqual(shift_array.format_for_cola(shift_type).tolist(), expected)
+            f = io.StringIO()
+            shift_array.write_cola(f, shift_type)
+            self.assertEqual(f.getvalue().splitlines(), expected)
+        self.assertRaises(ValueError, shift_array.format_for_cola, "other")
+
+
+if __name__ == "__main__":
+    unittest.main()
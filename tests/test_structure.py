@@ -0,0 +1,42 @@
+import pickle
+import unittest
+
+from utilities import structure
+
+
+class Test_Structure(unittest.TestCase):
+    def test_parse(self):
+        struct = structure.Structure("nlds")
+        self.assertEqual(list(struct), ["nl", "d", "s"])
+        self.assertEqual((struct.u, struct.d, struct.s), ("nl", "d", "s"))
+        self.assertEqual(str(struct), "nlds")
+        self.assertRaises(ValueError, structure.Structure, "udx")
+        self.assertRaises(TypeError, structure.Structure, 1)
+
+    def test_interned(self):
+        struct = structure.Structure("uds")
+        self.assertIs(struct, structure.Structure(["u", "d", "s"]))
+        self.assertIs(struct, structure.Structure(struct))
+        self.assertIs(struct, pickle.loads(pickle.dumps(struct)))
+        self.assertEqual(len({struct, structure.Structure("uds")}), 1)
+        self.assertFalse(hasattr(struct, "__dict__"))
+
+    def test_immutable(self):
+        uds = structure.Structure("uds")
+        with self.assertRaises(AttributeError):
+            uds.u = "d"
+        with self.assertRaises(AttributeError):
+            del uds.s
+        with self.assertRaises(AttributeError):
+            uds.other = 1
+        self.assertEqual(list(uds), ["u", "d", "s"])
+        self.assertEqual(hash(uds), hash(("u", "d", "s")))
+
+    def test_neutral(self):
+        self.assertIs(
+            structure.Structure("uds").as_neutral_structure(), structure.Structure("llh")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
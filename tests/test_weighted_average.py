@@ -79,3 +79,284 @@ class Test_WeightedAverage(unittest.TestCase):
         
         
         
+
+
+class Test_calculate_weights(unittest.TestCase):
+    def test_matches_rowwise(self):
+        data = pd.read_csv(data_file)
+        reference_p_values = data.apply(weighted_average.WeightedAverage.df_p_value, axis=1)
+        np.testing.assert_allclose(
+            np.exp(weighted_average.log_p_value(data["ndof"], data["chi2"])),
+            reference_p_values,
+            rtol=1e-12,
+        )
+
+    def test_custom_labels(self):
+        data = pd.read_csv(data_file).rename(columns={"chi2": "chisq", "ndof": "dof"})
+        data.index = data.index + 10
+        average = weighted_average.WeightedAverage(
+            data, value_label="fmass_1", err_label="ferr_1", chi2_label="chisq", ndof_label="dof"
+        )
+        average.do_average()
+        np.testing.assert_allclose(average.weights, data["weight"])
+
+    def test_large_chi2(self):
+        data = pd.DataFrame(
+            {"chi2": [2000.0, 2002.0], "ndof": [4, 4], "value": [1.0, 2.0], "err": [0.1, 0.1]}
+        )
+        average = weighted_average.WeightedAverage(data, value_label="value", err_label="err")
+        weights = average.calculate_weights()
+        self.assertTrue(np.all(np.isfinite(weights)))
+        self.assertAlmostEqual(weights.sum(), 1)
+        self.assertGreater(weights[0], weights[1])
+
+
+class Test_grouped_weighted_average(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        data = pd.read_csv(data_file)
+        # Two copies of the reference data as separate groups
+        self.data = pd.concat(
+            [data.assign(particle="proton"), data.assign(particle="neutron")],
+            ignore_index=True,
+        )
+        self.reference_value = gv.gvar("0.01386123(85837)")
+
+    def test_result(self):
+        result = weighted_average.grouped_weighted_average(
+            self.data, "particle", value_label="fmass_1", err_label="ferr_1"
+        )
+        self.assertEqual(list(result["particle"]), ["neutron", "proton"])
+        self.assertEqual(list(result["nfits"]), [4, 4])
+        np.testing.assert_allclose(result["value"], gv.mean(self.reference_value), rtol=5.0e-6)
+        np.testing.assert_allclose(result["err"], gv.sdev(self.reference_value), rtol=5.0e-6)
+        np.testing.assert_allclose(
+            result["err"] ** 2, result["stat_err"] ** 2 + result["sys_err"] ** 2
+        )
+
+    def test_parallel(self):
+        serial = weighted_average.grouped_weighted_average(
+            self.data, ["particle"], value_label="fmass_2", err_label="ferr_2"
+        )
+        parallel = weighted_average.grouped_weighted_average(
+            self.data, ["particle"], value_label="fmass_2", err_label="ferr_2", n_jobs=2
+        )
+        pd.testing.assert_frame_equal(serial, parallel)
+
+
+    def test_missing_keys(self):
+        data = pd.concat(
+            [self.data, self.data.iloc[:3].assign(particle=np.nan)], ignore_index=True
+        )
+        expected = weighted_average.grouped_weighted_average(
+            self.data, "particle", value_label="fmass_1", err_label="ferr_1"
+        )
+        for n_jobs in (None, 2):
+            with self.assertLogs(weighted_average.logger, "WARNING"):
+                result = weighted_average.grouped_weighted_average(
+                    data, "particle", value_label="fmass_1", err_label="ferr_1", n_jobs=n_jobs
+                )
+            pd.testing.assert_frame_equal(result, expected)
+
+
+class Test_WeightedAverage_multifit_array(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.read_csv(data_file)
+        self.average = weighted_average.WeightedAverage_multifit(
+            self.data,
+            err_label="ferr_1",
+            value_col_labels=["fmass_1", "fmass_2"],
+            error_col_labels=["ferr_1", "ferr_2"],
+        )
+        self.reference_values = [gv.gvar("0.01386123(85837)"), gv.gvar("0.01143814(216822)")]
+
+    def test_result(self):
+        values = self.average.do_average(array_backed=True)
+        self.assertIsInstance(values, np.ndarray)
+        np.testing.assert_allclose(gv.mean(values), gv.mean(self.reference_values), rtol=5.0e-6)
+        np.testing.assert_allclose(gv.sdev(values), gv.sdev(self.reference_values), rtol=5.0e-6)
+        self.assertEqual(set(self.average.working_df.columns), {"p_value", "err", "weight"})
+
+    def test_store_columns(self):
+        self.average.do_average(array_backed=True, store_columns=True)
+        columns = {
+            "fmass_1*w": "fmass_1*w",
+            "ferr_1^2*w": "var_1*w",
+            "ferr_1^2_sys": "var_1_sys",
+            "fmass_2*w": "fmass_2*w",
+            "ferr_2^2*w": "var_2*w",
+            "ferr_2^2_sys": "var_2_sys",
+        }
+        for column, reference_column in columns.items():
+            np.testing.assert_allclose(
+                self.average.working_df[column], self.data[reference_column], rtol=1e-5, atol=1e-12
+            )
+
+
+class Test_average_jackknives(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.read_csv(data_file)
+        self.average = weighted_average.WeightedAverage(
+            self.data, value_label="fmass_1", err_label="ferr_1"
+        )
+        rng = np.random.default_rng(0)
+        self.jackknives = self.data["fmass_1"].to_numpy()[:, None] + rng.normal(
+            0, 1e-4, (len(self.data), 30)
+        )
+
+    def test_fixed_weights(self):
+        result = self.average.average_jackknives(self.jackknives)
+        self.assertEqual(result.ncon, 30)
+        np.testing.assert_allclose(
+            result.jackknives, self.data["weight"].to_numpy() @ self.jackknives
+        )
+
+    def test_reweighted(self):
+        chi2_jackknives = np.repeat(self.data["chi2"].to_numpy()[:, None], 30, axis=1)
+        reweighted = self.average.average_jackknives(self.jackknives, chi2_jackknives)
+        fixed = self.average.average_jackknives(self.jackknives)
+        np.testing.assert_allclose(reweighted.jackknives, fixed.jackknives)
+
+        chi2_jackknives[0] += 50
+        reweighted = self.average.average_jackknives(self.jackknives, chi2_jackknives)
+        self.assertFalse(np.allclose(reweighted.jackknives, fixed.jackknives))
+
+
+class Test_WeightedAverageAccumulator(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        self.data = pd.read_csv(data_file)
+        self.reference_value = gv.gvar("0.01386123(85837)")
+
+    def add_rows(self, accumulator, rows):
+        for _, row in rows.iterrows():
+            accumulator.add(row["fmass_1"], row["ferr_1"], row["chi2"], row["ndof"])
+
+    def test_single_rows(self):
+        accumulator = weighted_average.WeightedAverageAccumulator()
+        self.add_rows(accumulator, self.data.sample(frac=1, random_state=1))
+        result = accumulator.result()
+        np.testing.assert_allclose(result.mean, self.reference_value.mean, rtol=5.0e-6)
+        np.testing.assert_allclose(result.sdev, self.reference_value.sdev, rtol=5.0e-6)
+
+    def test_merge(self):
+        first = weighted_average.WeightedAverageAccumulator()
+        second = weighted_average.WeightedAverageAccumulator()
+        self.add_rows(first, self.data.iloc[:1])
+        second.add(
+            self.data["fmass_1"].iloc[1:],
+            self.data["ferr_1"].iloc[1:],
+            self.data["chi2"].iloc[1:],
+            self.data["ndof"].iloc[1:],
+        )
+        result = (first + second).result()
+        self.assertEqual((first + second).nfits, 4)
+        np.testing.assert_allclose(result.mean, self.reference_value.mean, rtol=5.0e-6)
+        np.testing.assert_allclose(result.sdev, self.reference_value.sdev, rtol=5.0e-6)
+
+
+class Test_weighting_schemes(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        self.data = pd.read_csv(data_file).assign(nparams=2)
+        self.columns = weighted_average.FitColumns(
+            self.data["chi2"], self.data["ndof"], self.data["ferr_1"], self.data["nparams"]
+        )
+
+    def test_compute_weights(self):
+        weights = weighted_average.compute_weights(self.columns, ["p_value", "aic", "baic"])
+        self.assertEqual(weights.shape, (3, len(self.data)))
+        np.testing.assert_allclose(weights.sum(axis=1), 1)
+        np.testing.assert_allclose(weights[0], self.data["weight"])
+
+        aic = np.exp(-0.5 * (self.data["chi2"] + 4))
+        np.testing.assert_allclose(weights[1], aic / aic.sum())
+
+        # ndof 5, 4, 3, 2 so each fit drops one more point than the last
+        baic = np.exp(-0.5 * (self.data["chi2"] + 4 + 2 * np.arange(4)))
+        np.testing.assert_allclose(weights[2], baic / baic.sum())
+
+    def test_weighted_average_scheme(self):
+        average = weighted_average.WeightedAverage(
+            self.data,
+            value_label="fmass_1",
+            err_label="ferr_1",
+            weighting=weighted_average.AICWeighting(nparams=2),
+        )
+        average.do_average()
+        expected = weighted_average.compute_weights(self.columns, ["aic"])[0]
+        np.testing.assert_allclose(average.weights, expected)
+
+    def test_missing_nparams(self):
+        average = weighted_average.WeightedAverage(
+            self.data, value_label="fmass_1", err_label="ferr_1", weighting="aic"
+        )
+        self.assertRaises(ValueError, average.calculate_weights)
+        self.assertRaises(
+            ValueError,
+            weighted_average.WeightedAverage,
+            self.data,
+            value_label="fmass_1",
+            err_label="ferr_1",
+            weighting="unknown",
+        )
+
+    def test_jackknives_scheme(self):
+        average = weighted_average.WeightedAverage(
+            self.data, value_label="fmass_1", err_label="ferr_1", weighting="aic",
+            nparams_label="nparams",
+        )
+        average.do_average()
+        rng = np.random.default_rng(1)
+        jackknives = self.data["fmass_1"].to_numpy()[:, None] + rng.normal(0, 1e-4, (4, 10))
+        chi2_jackknives = self.data["chi2"].to_numpy()[:, None] + rng.uniform(0, 2, (4, 10))
+        result = average.average_jackknives(jackknives, chi2_jackknives)
+        for i in range(10):
+            columns = weighted_average.FitColumns(
+                chi2_jackknives[:, i], self.data["ndof"], self.data["ferr_1"], self.data["nparams"]
+            )
+            weights = weighted_average.compute_weights(columns, ["aic"])[0]
+            np.testing.assert_allclose(result.jackknives[i], weights @ jackknives[:, i])
+
+        # Central chi^2 for every jackknife reproduces the central weights
+        fixed_chi2 = np.repeat(self.data["chi2"].to_numpy()[:, None], 10, axis=1)
+        np.testing.assert_allclose(
+            average.average_jackknives(jackknives, fixed_chi2).jackknives,
+            average.weights.to_numpy() @ jackknives,
+        )
+
+    def test_grouped_scheme(self):
+        data = pd.concat(
+            [self.data.assign(particle="proton"), self.data.iloc[1:].assign(particle="neutron")],
+            ignore_index=True,
+        )
+        for weighting in ("aic", "baic"):
+            result = weighted_average.grouped_weighted_average(
+                data, "particle", value_label="fmass_1", err_label="ferr_1",
+                weighting=weighting, nparams_label="nparams",
+            )
+            for _, row in result.iterrows():
+                expected = weighted_average.WeightedAverage(
+                    data[data["particle"] == row["particle"]], value_label="fmass_1",
+                    err_label="ferr_1", weighting=weighting, nparams_label="nparams",
+                ).do_average()
+                self.assertAlmostEqual(row["value"], expected.mean)
+                self.assertAlmostEqual(row["err"], expected.sdev)
+
+    def test_accumulator_scheme(self):
+        expected = weighted_average.WeightedAverage(
+            self.data, value_label="fmass_1", err_label="ferr_1",
+            weighting=weighted_average.BAICWeighting(ndata=7), nparams_label="nparams",
+        ).do_average()
+        accumulator = weighted_average.WeightedAverageAccumulator(
+            weighted_average.BAICWeighting(ndata=7)
+        )
+        for _, row in self.data.iterrows():
+            accumulator.add(row["fmass_1"], row["ferr_1"], row["chi2"], row["ndof"], row["nparams"])
+        np.testing.assert_allclose(accumulator.result().mean, expected.mean)
+        np.testing.assert_allclose(accumulator.result().sdev, expected.sdev)
+
+        self.assertRaises(ValueError, weighted_average.WeightedAverageAccumulator, "baic")
+        self.assertRaises(
+            ValueError, accumulator.merge, weighted_average.WeightedAverageAccumulator()
+        )
@@ -1,172 +1,150 @@
+from __future__ import annotations
+import bisect
+import functools
+import json
+import os
 import re
+from collections.abc import Mapping
+from pathlib import Path
 
-runID_pattern = re.compile(r"(a|b|gM|hM|iM|jM|kM)")
+import numpy as np
 
-# Functions holding the details for each ensemble. 
-# Could really just be one dict but when I wrote it
-# a long time ago I used functions because I was dumb.
-# Now I can't be bothered fixing it
+# Ensemble and run definitions are read from this file on first access
+ensembles_file = Path(__file__).parent / "data" / "ensembles.json"
 
-# 13700
-def _k_13700():
-    """_
-    Hea_viest PACS-CS ensemble.
-    kap_pa: 13700
-    m_pi:  701 MeV
-    a:     0.1022 fm
-    """
-    return {
-        "kappa": 13700,
-        "prefixes": ("b"),
-        "m_pi": 701,
-        "m_pi_phys": 623,
-        "a": 0.1022,
-        "traj_store": 10,
-        "tau": 0.5,
-        "rho": None,
-        "N_poly": 180,
-        "replay": "on",
-    }
-
-
-# 13727
-def _k_13727():
-    """
-    Second heaviest PACS-CS ensemble.
-    kappa: 13727
-    m_pi:  570 MeV
-    a:     0.10086 fm
-    """
-    return {
-        "kappa": 13727,
-        "prefixes": ("b"),
-        "m_pi": 570,
-        "m_pi_phys": 515,
-        "a": 0.10086,
-        "traj_store": 10,
-        "tau": 0.5,
-        "rho": None,
-        "N_poly": 180,
-        "replay": "on",
-    }
-
-
-# 13754
-def _k_13754():
-    """
-    Middle PACS-CS ensemble.
-    kappa: 13754
-    m_pi:  411 MeV
-    a:     0.0961 fm
-    """
-    return {
-        "kappa": 13754,
-        "prefixes": ("a", "b"),
-        "m_pi": 411,
-        "m_pi_phys": 391,
-        "a": 0.0961,
-        "traj_store": 10,
-        "tau": 0.5,
-        "rho": None,
-        "N_poly": 180,
-        "replay": "on",
-    }
-
-
-# 13770
-def _k_13770():
-    """
-    Second lightest PACS-CS ensemble.
-    kappa: 13770
-    m_pi:  296 MeV
-    a:     0.0951 fm
-    """
-    return {
-        "kappa": 13770,
-        "prefixes": ("a", "b"),
-        "m_pi": 296,
-        "m_pi_phys": 280,
-        "a": 0.0951,
-        "traj_store": 10,
-        "tau": 0.25,
-        "rho": None,
-        "N_poly": 180,
-        "replay": "on",
-    }
-
-
-# 13781
-def _k_13781():
-    """
-    Lightest PACS-CS ensemble. 5 runs, 198 total configurations
-    kappa: 13781
-    m_pi:  156 MeV
-    a:     0.0933 fm
-    """
-    return {
-        "kappa": 13781,
-        "prefixes": ("gM", "hM", "iM", "jM", "kM", "M"),
-        "m_pi": 156,
-        "m_pi_phys": 169,
-        "a": 0.0933,
-        "traj_store": 20,
-        "tau": 0.5,
-        "rho": 0.995,
-        "N_poly": 200,
-        "replay": "off",
-    }
-
-
-# Deprecated - but still can be used in cola
-# # 12400
-# def _k_12400():
-#     """
-#     This is for free field testing, the start point and number of configurations are arbitrary as
-#     there are no configuration files here. COLA will simply generate the 'gauge field' in this case.
-#     """
-#     start = 1000
-#     ncon = 5
-#     return {"start": start, "ncon": ncon}
-
-
-def _config_details(kappa: int) -> dict:
-    """
-    Get the details of the PACS configuration.
-
-    Returns
-    -------
-    dict
-        Dictionary of configuration details.
-    """
-    switch = {
-        13700: _k_13700,
-        13727: _k_13727,
-        13754: _k_13754,
-        13770: _k_13770,
-        13781: _k_13781,
-    }
-    case = switch[kappa]
-    return case()
-
-
-startIDs_13781 = {
-    1: "gM",
-    45: "hM",
-    67: "iM",
-    111: "jM",
-    155: "kM",
-    199: "end",
-}  # Just easier to add the end point to the dict
 
 def runIDs_13781(ith_config: int) -> str:
     """Return the run ID associated with a configuration at 13781
     when all runs are chained together from 1 -> 198."""
-    starts = startIDs_13781.keys()
-    for previous_start, this_start in zip(starts[:-1], starts[1:]):
-        if this_start > ith_config:
-            return startIDs_13781[previous_start]
-    else:
-        raise ValueError("Somehow reached end of loop through 13781 IDs")
+    return get_chain(13781).get_runID(ith_config)
+
+
+class RunChain:
+    def __init__(self, kappa: int, runIDs: tuple[str]):
+        """
+        Several runs of an ensemble chained together, eg. runID 'M' at 13781.
+
+        Configurations are numbered 1 -> ncon through the runs in the order given.
+        A boundary table of the first chained icon of each run is precomputed so
+        that chained icons map to (run, local icon, ID string) and back with
+        bisect for single configs or np.searchsorted for arrays.
+
+        Parameters
+        ----------
+        kappa : int
+            Kappa value of the ensemble.
+        runIDs : tuple[str]
+            The runs in chain order.
+        """
+        self.kappa = kappa
+        self.runs = [get_run(kappa, runID) for runID in runIDs]
+        self.runIDs = np.array(runIDs)
+        self._run_index = {runID: i for i, runID in enumerate(runIDs)}
+
+        ncons = np.array([run.ncon for run in self.runs])
+        self.ncon = int(ncons.sum())
+        # First chained icon of each run, plus the end point
+        self.boundaries = np.concatenate([[1], 1 + np.cumsum(ncons)])
+        self._boundaries_list = self.boundaries.tolist()
+        self.num_ID_starts = np.array([run.start for run in self.runs])
+        self.traj_stores = np.array([run.traj_store for run in self.runs])
+
+    def _check_icons(self, icons: np.ndarray):
+        if np.any((icons < 1) | (icons > self.ncon)):
+            raise ValueError(f"Chained icons must be between 1 and {self.ncon}.")
+
+    @property
+    def starts(self) -> dict[int, str]:
+        """First chained icon of each run -> runID, with the end point as 'end'."""
+        starts = dict(zip(self._boundaries_list, self.runIDs.tolist()))
+        starts[self._boundaries_list[-1]] = "end"
+        return starts
+
+    def get_runID(self, icon: int) -> str:
+        """Run ID of a single chained icon."""
+        self._check_icons(np.asarray(icon))
+        return str(self.runIDs[bisect.bisect_right(self._boundaries_list, icon) - 1])
+
+    def locate(self, icons: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Index into runIDs and local icon within that run for each chained icon."""
+        icons = np.asarray(icons)
+        self._check_icons(icons)
+        run_indices = np.searchsorted(self.boundaries, icons, side="right") - 1
+        return run_indices, icons - self.boundaries[run_indices] + 1
+
+    def to_chained(self, runIDs: np.ndarray, local_icons: np.ndarray) -> np.ndarray:
+        """Chained icons from run IDs and icons within those runs."""
+        runIDs = np.asarray(runIDs)
+        unique_runIDs, inverse = np.unique(runIDs, return_inverse=True)
+        try:
+            run_indices = np.array([self._run_index[r] for r in unique_runIDs])[inverse]
+        except KeyError as e:
+            raise ValueError(f"runID {e} is not part of the chain.")
+        run_indices = run_indices.reshape(runIDs.shape)
+        local_icons = np.asarray(local_icons)
+        if np.any((local_icons < 1) | (local_icons >= np.diff(self.boundaries)[run_indices] + 1)):
+            raise ValueError("Local icons out of range for their run.")
+        return self.boundaries[run_indices] + local_icons - 1
+
+    def num_IDs(self, icons: np.ndarray) -> np.ndarray:
+        run_indices, local_icons = self.locate(icons)
+        return self.num_ID_starts[run_indices] + (local_icons - 1) * self.traj_stores[run_indices]
+
+    def ID_strs(self, icons: np.ndarray) -> np.ndarray:
+        run_indices, _ = self.locate(icons)
+        num_IDs = np.char.zfill(self.num_IDs(icons).astype(str), 6)
+        return np.char.add(np.char.add(np.char.add("-", self.runIDs[run_indices]), "-"), num_IDs)
+
+    def ID_strs_to_icons(self, ID_strs: np.ndarray) -> np.ndarray:
+        """Chained icons of configuration strings, eg. '-hM-001240' -> 45."""
+        runIDs, num_IDs = split_ID_strs(ID_strs)
+        run_indices = np.array([self._run_index.get(r, -1) for r in np.unique(runIDs)])
+        if np.any(run_indices < 0):
+            raise ValueError("ID strings contain runIDs which are not part of the chain.")
+        run_indices = run_indices[np.unique(runIDs, return_inverse=True)[1]].reshape(runIDs.shape)
+        local_icons, remainders = np.divmod(
+            num_IDs - self.num_ID_starts[run_indices], self.traj_stores[run_indices]
+        )
+        local_icons += 1
+        if np.any(remainders != 0):
+            raise ValueError("ID strings do not lie on their run's trajectories.")
+        return self.to_chained(self.runIDs[run_indices], local_icons)
+
+
+def split_ID_strs(ID_strs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorised split of configuration strings, '-gM-001200' -> ('gM', 1200)."""
+    parts = np.char.rpartition(np.asarray(ID_strs, dtype=str), "-")
+    runIDs = np.char.lstrip(parts[..., 0], "-")
+    return runIDs, parts[..., 2].astype(int)
+
+
+@functools.lru_cache(maxsize=None)
+def get_chain(kappa: int) -> RunChain:
+    """The chain of all runs at kappa, available as runID 'M'."""
+    runIDs = tuple(runID for runID in PACS_run_details[kappa] if runID != "M")
+    return RunChain(kappa, runIDs)
+
+
+class ChainStarts(Mapping):
+    def __init__(self, kappa: int):
+        """Read only view of RunChain.starts, only built when first accessed."""
+        self.kappa = kappa
+
+    def __getitem__(self, icon: int) -> str:
+        return get_chain(self.kappa).starts[icon]
+
+    def __iter__(self):
+        return iter(get_chain(self.kappa).starts)
+
+    def __len__(self):
+        return len(get_chain(self.kappa).starts)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+# Deprecated, use get_chain(13781). Kept as a view of the ensemble definitions.
+startIDs_13781 = ChainStarts(13781)
 
 
 class ConfigID:
@@ -199,7 +177,7 @@ class ConfigID:
             self.runID = self.get_runID(ID_str)
         else:
             self.runID = runID
-        self.ensemble = PACSRun(self.kappa, self.runID)
+        self.ensemble = get_run(self.kappa, self.runID)
 
         # Parse the ID string and verify its contents agree with the other passed info
         if ID_str is not None:
@@ -219,6 +197,34 @@ class ConfigID:
             self.icon = icon
             self.ID_str = self.ensemble.get_ID_str(self.icon)
 
+        self._key = (self.icon, self.runID, self.kappa)
+        self._hash = hash(self._key)
+
+    @classmethod
+    def get(
+        cls, kappa: int, *, ID_str: str = None, icon: int = None, runID: str = None
+    ) -> ConfigID:
+        """
+        Interned constructor. Equal ConfigIDs, however they are specified, are
+        the same object, so repeated construction is a cache lookup.
+        Arguments are as for ConfigID.
+        """
+        if ID_str is not None:
+            runID = cls.get_runID(ID_str) if runID is None else runID
+            if runID not in ID_str:
+                raise ValueError(f"{runID = } not in {ID_str = }.")
+            ID_icon = get_run(kappa, runID).get_icon(ID_str)
+            if icon not in (None, ID_icon):
+                raise ValueError(
+                    f"Mismatch between passed {icon = }, {ID_str = } and {kappa = }."
+                )
+            icon = ID_icon
+        elif None in (icon, runID):
+            raise ValueError(
+                "Cannot initialise configID. Require ID string or both of icon and runID."
+            )
+        return _interned_configID(kappa, runID, int(icon))
+
     @property
     def filename(self):
         return self.ensemble.filename(self)
@@ -234,10 +240,10 @@ class ConfigID:
 
     # Next three are required so that we can use ConfigIDs as dict keys
     def __hash__(self):
-        return hash((self.icon, self.runID, self.kappa))
+        return self._hash
 
     def __eq__(self, other):
-        return (self.icon, self.runID, self.kappa) == (
+        return self is other or self._key == (
             other.icon,
             other.runID,
             other.kappa,
@@ -248,30 +254,34 @@ class ConfigID:
 
     @staticmethod
     def get_runID(ID_str: str) -> str:
-        return runID_pattern.search(ID_str)[0]
+        match = PACS_ensembles.runID_pattern.search(ID_str)
+        if match is None:
+            raise ValueError(f"No known runID in {ID_str = }.")
+        return match[1]
 
 
 class PACSEnsemble:
-    base_filename = "RCNF2+1/RC32x64_B1900Kud0{kappa}00Ks01364000C1715/RC32x64_B1900Kud0{kappa}00Ks01364000C1715{ID_str}"
-
-    def __init__(self, kappa: int):
+    def __init__(self, kappa: int, details: dict = None):
         """
         Object for holding information about a specific PACS-CS ensemble. 
-        Direct access to specific ensemble objects should use the PACS_ensembles dictionary instead to avoid creating many idential copies of this object.
+        Direct access to specific ensemble objects should use the PACS_ensembles registry instead to avoid creating many idential copies of this object.
+
+        Details default to the definition of kappa in the ensemble registry.
+        Any entry, eg. NS, NT or base_filename, may be overridden there so
+        the class also describes non PACS-CS lattices.
 
         https://www.jldg.org/ildg-data/PACSCSconfig.html
         """
-
-        details = _config_details(kappa)
+        if details is None:
+            details = PACS_ensembles.definitions[kappa]
+        missing = {"runs", "base_filename"} - set(details)
+        if missing:
+            raise ValueError(f"Ensemble {kappa} is missing {sorted(missing)}.")
         for detail, value in details.items():
             setattr(self, detail, value)
 
         self.kappa = kappa
-        self.NS = 32
-        self.NT = 64
-        self.C_SW = 1.715
-        self.beta = 1.9
-        self.kappa_strange = 13640
+        self.prefixes = tuple(self.runs)
 
 
 class PACSRun:
@@ -297,17 +307,20 @@ class PACSRun:
         self.ensemble = PACS_ensembles[kappa]
         self.runID = runID
         self.start, self.ncon = self._get_run_details(kappa, runID)
+        self.chain = get_chain(kappa) if runID == "M" else None
 
-    # TODO: Add this for M
     def get_icon(self, ID_str: str):
         """Extract the ith configuration number from a configuration string."""
         
         if self.runID == "M":
-            raise NotImplementedError("Finding icon with runID set as M not supported.")
+            runID = ConfigID.get_runID(ID_str)
+            local_icon = get_run(self.kappa, runID).get_icon(ID_str)
+            return int(self.chain.to_chained(runID, local_icon))
         
         num_ID = int(ID_str[-4:])
-        icon = (num_ID - self.start) / self.traj_store + 1
-        if icon > self.ncon:
+        icon, remainder = divmod(num_ID - self.start, self.traj_store)
+        icon += 1
+        if remainder != 0 or not 1 <= icon <= self.ncon:
             raise ValueError(f"{ID_str = } does not exist at {self.kappa = }.")
         return icon
 
@@ -315,8 +328,8 @@ class PACSRun:
         """Form the configuration string corresponding to the ensembles ith configuration."""
         
         if self.runID == "M":
-            trueID = runIDs_13781(ith_config)
-            return PACSRun(13781, trueID).get_ID_str(ith_config)
+            run_index, local_icon = self.chain.locate(ith_config)
+            return self.chain.runs[run_index].get_ID_str(int(local_icon))
         
         num_ID = self.start + (ith_config - 1) * self.traj_store
         return f"-{self.runID}-{num_ID:06}"
@@ -325,12 +338,88 @@ class PACSRun:
         """Construct the file name corresponding to a particular config ID."""
         return self.base_filename.format(kappa=self.kappa, ID_str=configID.ID_str)
 
+    @property
+    def icons(self) -> np.ndarray:
+        """All configuration numbers of the run, 1 -> ncon."""
+        return np.arange(1, self.ncon + 1)
+
+    def icons_to_num_IDs(self, icons: np.ndarray) -> np.ndarray:
+        """Vectorised conversion of configuration numbers to numeric IDs."""
+        icons = np.asarray(icons)
+        if self.runID == "M":
+            return self.chain.num_IDs(icons)
+        if np.any((icons < 1) | (icons > self.ncon)):
+            raise ValueError(f"icons must be between 1 and {self.ncon} for {self.runID = }.")
+        return self.start + (icons - 1) * self.traj_store
+
+    def num_IDs_to_icons(self, num_IDs: np.ndarray) -> np.ndarray:
+        """Vectorised conversion of numeric IDs to configuration numbers."""
+        if self.runID == "M":
+            raise ValueError("Numeric IDs are ambiguous for runID M, use ID_strs_to_icons.")
+        icons, remainders = np.divmod(np.asarray(num_IDs) - self.start, self.traj_store)
+        icons += 1
+        if np.any((remainders != 0) | (icons < 1) | (icons > self.ncon)):
+            raise ValueError(f"num_IDs do not exist at {self.kappa = }, {self.runID = }.")
+        return icons
+
+    def ID_strs(self, icons: np.ndarray = None) -> np.ndarray:
+        """Configuration strings for icons, by default every config in the run."""
+        icons = self.icons if icons is None else icons
+        if self.runID == "M":
+            return self.chain.ID_strs(icons)
+        num_IDs = self.icons_to_num_IDs(icons).astype(str)
+        return np.char.add(f"-{self.runID}-", np.char.zfill(num_IDs, 6))
+
+    def ID_strs_to_icons(self, ID_strs: np.ndarray) -> np.ndarray:
+        """Vectorised conversion of configuration strings to configuration numbers."""
+        if self.runID == "M":
+            return self.chain.ID_strs_to_icons(ID_strs)
+        runIDs, num_IDs = split_ID_strs(ID_strs)
+        if np.any(runIDs != self.runID):
+            raise ValueError(f"ID strings do not all belong to {self.runID = }.")
+        return self.num_IDs_to_icons(num_IDs)
+
+    def filenames(self, icons: np.ndarray = None) -> np.ndarray:
+        """File names for icons, by default every config in the run."""
+        prefix = self.base_filename.format(kappa=self.kappa, ID_str="")
+        return np.char.add(prefix, self.ID_strs(icons))
+
+    def config_table(self) -> dict[str, np.ndarray]:
+        """
+        Every configuration of the run as arrays.
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            Arrays of equal length with keys icon, runID, num_ID, ID_str and filename.
+        """
+        icons = self.icons
+        if self.runID == "M":
+            runIDs = self.chain.runIDs[self.chain.locate(icons)[0]]
+        else:
+            runIDs = np.full(icons.size, self.runID)
+        return {
+            "icon": icons,
+            "runID": runIDs,
+            "num_ID": self.icons_to_num_IDs(icons),
+            "ID_str": self.ID_strs(icons),
+            "filename": self.filenames(icons),
+        }
+
+    def config_IDs(self) -> list[ConfigID]:
+        """Interned ConfigIDs of every configuration in the run."""
+        if self.runID == "M":
+            return [ConfigID.get(self.kappa, ID_str=str(ID_str)) for ID_str in self.ID_strs()]
+        return [
+            ConfigID.get(self.kappa, icon=int(icon), runID=self.runID) for icon in self.icons
+        ]
+
     @staticmethod
     def _get_run_details(kappa: int, runID: str):
         try:
             return PACS_run_details[int(kappa)][runID]
         except KeyError:
-            raise ValueError("f{kappa = }, {runID = } is an invalid combination")
+            raise ValueError(f"{kappa = }, {runID = } is an invalid combination")
         
     # If cannot find an attribute, check the ensemble
     def __getattr__(self, attr):
@@ -340,28 +429,191 @@ class PACSRun:
             raise AttributeError(f"PACSRun has no attribute {attr}")
 
 
-# Dictionary for accessing the PACS ensembles. Otherwise the objects would be
+@functools.lru_cache(maxsize=None)
+def get_run(kappa: int, runID: str) -> PACSRun:
+    """Shared PACSRun object for each kappa, runID combination."""
+    return PACSRun(kappa, runID)
+
+
+@functools.lru_cache(maxsize=None)
+def _interned_configID(kappa: int, runID: str, icon: int) -> ConfigID:
+    """
+    Shared ConfigID for each kappa, runID, icon combination, see ConfigID.get.
+    Like get_run, IDs live for the session; cache_clear releases them.
+    """
+    return ConfigID(kappa, icon=icon, runID=runID)
+
+
+class AvailabilityIndex:
+    def __init__(self, root: os.PathLike = ""):
+        """
+        Index of which gauge files exist on disk.
+
+        Each ensemble directory is scanned once with os.scandir and the
+        configuration strings of its gauge files are cached along with the
+        directory mtime. Later queries only stat the directory, rescanning
+        if it has changed, and membership of thousands of configs is tested
+        in one vectorised call rather than one stat per file.
+
+        Parameters
+        ----------
+        root : os.PathLike, optional
+            Directory which the ensemble base_filenames are relative to, by default ""
+        """
+        self.root = root
+        self._cache = {}
+
+    def _location(self, kappa: int) -> tuple[str, str]:
+        """Directory and file name prefix of the gauge files at kappa."""
+        ensemble = PACS_ensembles[kappa]
+        path = os.path.join(self.root, ensemble.base_filename.format(kappa=kappa, ID_str=""))
+        return os.path.dirname(path), os.path.basename(path)
+
+    def ID_strs(self, kappa: int) -> np.ndarray:
+        """Sorted configuration strings of every gauge file present at kappa."""
+        directory, prefix = self._location(kappa)
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            return np.array([], dtype=str)
+
+        # Ensembles may share a directory, so files are cached per prefix
+        cached = self._cache.get((directory, prefix))
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with os.scandir(directory) as entries:
+            names = [
+                entry.name
+                for entry in entries
+                if entry.name.startswith(prefix) and entry.is_file()
+            ]
+        ID_strs = np.unique(np.array(names, dtype=str))
+        ID_strs = np.char.partition(ID_strs, prefix)[..., 2] if prefix else ID_strs
+        self._cache[(directory, prefix)] = (mtime, ID_strs)
+        return ID_strs
+
+    def exists(self, configIDs: list[ConfigID]) -> np.ndarray:
+        """Whether the gauge file of each ConfigID is present, as a boolean array."""
+        kappas = np.array([configID.kappa for configID in configIDs], dtype=int)
+        ID_strs = np.array([configID.ID_str for configID in configIDs], dtype=str)
+        present = np.zeros(len(configIDs), dtype=bool)
+        for kappa in np.unique(kappas):
+            mask = kappas == kappa
+            present[mask] = np.isin(ID_strs[mask], self.ID_strs(int(kappa)))
+        return present
+
+    def missing(self, configIDs: list[ConfigID]) -> list[ConfigID]:
+        """The ConfigIDs whose gauge files are not present."""
+        present = self.exists(configIDs)
+        return [configID for configID, found in zip(configIDs, present) if not found]
+
+    def available_icons(self, run: PACSRun) -> np.ndarray:
+        """Configuration numbers of the run whose gauge files are present."""
+        return run.icons[np.isin(run.ID_strs(), self.ID_strs(run.kappa))]
+
+    def missing_icons(self, run: PACSRun) -> np.ndarray:
+        """Configuration numbers of the run whose gauge files are not present."""
+        return run.icons[~np.isin(run.ID_strs(), self.ID_strs(run.kappa))]
+
+    def clear(self):
+        self._cache.clear()
+
+
+class EnsembleRegistry(Mapping):
+    def __init__(self, paths: list[os.PathLike]):
+        """
+        Lazily loaded mapping of kappa -> PACSEnsemble.
+
+        Definitions are read from JSON files the first time anything is looked
+        up, and each PACSEnsemble is only built when it is first accessed, then
+        shared by every later lookup. Each file holds a "defaults" dict applied
+        to all of its ensembles and an "ensembles" dict keyed by kappa. Every
+        ensemble requires a "runs" entry of runID -> [start, ncon] and a
+        "base_filename", usually given in the defaults.
+
+        Parameters
+        ----------
+        paths : list[os.PathLike]
+            JSON files holding the ensemble definitions.
+        """
+        self.paths = list(paths)
+        self._ensembles = {}
+
+    @staticmethod
+    def _read(path: os.PathLike) -> dict[int, dict]:
+        with open(path) as f:
+            contents = json.load(f)
+        defaults = contents.get("defaults", {})
+        definitions = {}
+        for kappa, details in contents["ensembles"].items():
+            details = {**defaults, **details}
+            details["runs"] = {
+                runID: tuple(run) for runID, run in details["runs"].items()
+            }
+            definitions[int(kappa)] = details
+        return definitions
+
+    @functools.cached_property
+    def definitions(self) -> dict[int, dict]:
+        definitions = {}
+        for path in self.paths:
+            definitions.update(self._read(path))
+        return definitions
+
+    def load(self, path: os.PathLike):
+        """Add the ensembles defined in another file. Existing ensembles cannot be redefined."""
+        definitions = self._read(path)
+        duplicates = set(definitions) & set(self.definitions)
+        if duplicates:
+            raise ValueError(f"Ensembles {sorted(duplicates)} are already defined.")
+        self.paths.append(path)
+        self.definitions.update(definitions)
+        self.__dict__.pop("runID_pattern", None)
+
+    @functools.cached_property
+    def runID_pattern(self) -> re.Pattern:
+        """Matches the runID of a configuration string, eg. 'gM' in '-gM-001200'."""
+        runIDs = {runID for details in self.definitions.values() for runID in details["runs"]}
+        # Longest first so that eg. 'gM' is never matched as 'M'
+        runIDs = sorted(runIDs, key=len, reverse=True)
+        return re.compile(rf"-({'|'.join(map(re.escape, runIDs))})-")
+
+    def __getitem__(self, kappa: int) -> PACSEnsemble:
+        try:
+            return self._ensembles[kappa]
+        except KeyError:
+            pass
+        details = self.definitions[kappa]
+        return self._ensembles.setdefault(kappa, PACSEnsemble(kappa, details))
+
+    def __contains__(self, kappa):
+        # Avoid building the ensemble as Mapping.__contains__ would
+        return kappa in self.definitions
+
+    def __iter__(self):
+        return iter(self.definitions)
+
+    def __len__(self):
+        return len(self.definitions)
+
+
+class RunDetails(Mapping):
+    def __init__(self, registry: EnsembleRegistry):
+        """Read only view of kappa -> {runID: (start, ncon)} from an EnsembleRegistry."""
+        self.registry = registry
+
+    def __getitem__(self, kappa: int) -> dict[str, tuple[int, int]]:
+        return self.registry.definitions[kappa]["runs"]
+
+    def __iter__(self):
+        return iter(self.registry)
+
+    def __len__(self):
+        return len(self.registry)
+
+
+# Registry for accessing the PACS ensembles. Otherwise the objects would be
 # needlessly created every time a ConfigID object is created
-PACS_ensembles = {
-    13700: PACSEnsemble(13700),
-    13727: PACSEnsemble(13727),
-    13754: PACSEnsemble(13754),
-    13770: PACSEnsemble(13770),
-    13781: PACSEnsemble(13781),
-}
-
-
-PACS_run_details = {
-    13700: {"b": (2510, 400)},
-    13727: {"b": (1310, 400)},
-    13754: {"a": (2510, 200), "b": (2510, 250)},
-    13770: {"a": (1880, 400), "b": (1780, 400)},
-    13781: {
-        "gM": (1200, 44),
-        "hM": (1240, 22),
-        "iM": (870, 44),
-        "jM": (260, 44),
-        "kM": (1090, 44),
-        "M": (1200, 198),
-    },
-}
+PACS_ensembles = EnsembleRegistry([ensembles_file])
+PACS_run_details = RunDetails(PACS_ensembles)
@@ -1,10 +1,11 @@
+from __future__ import annotations
 import os
 from pathlib import Path
 import re
 
 import numpy as np
 
-from utilities import configIDs as cfg, misc
+from utilities import configIDs as cfg, misc, shifts
 
 # Regex patterns for parsing cfun_paths
 tommi_patterns = dict(
@@ -35,6 +36,26 @@ class CfunMomentum:
     def str_indices(self):
         return " ".join([str(i) for i in self.indices])
 
+    @property
+    def key(self) -> tuple[int]:
+        return tuple(self.indices)
+
+    @property
+    def equivalence_key(self) -> tuple[int]:
+        """Equal for momenta related by permutations and reflections, eg. (0, 0, 1) and (-1, 0, 0)."""
+        return tuple(sorted(abs(i) for i in self.indices))
+
+    # A momentum is identified by its indices alone, the label only names it,
+    # so momenta with equal indices but different labels are equal and are
+    # the same key of a dict or MomentumLayout.
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        if isinstance(other, CfunMomentum):
+            return self.key == other.key
+        return NotImplemented
+
     def __str__(self):
         return f"{self.label}: {self.str_indices}"
 
@@ -228,3 +249,298 @@ def AverageCorrelators(correlators: np.ndarray) -> np.ndarray:
     averageDimension = len(arrayShape) - 1  # -1 because python indexes from 0
     average = np.mean(correlators, axis=averageDimension)
     return average
+
+
+def _time_shifts(shift_values) -> np.ndarray:
+    """Temporal shifts from a ShiftArray, Shifts, shift strings or plain ints."""
+    if isinstance(shift_values, shifts.ShiftArray):
+        return shift_values.values[:, 3]
+    shift_values = list(shift_values)
+    if shift_values and isinstance(shift_values[0], str):
+        return shifts.ShiftArray.from_strings(shift_values).values[:, 3]
+    if shift_values and isinstance(shift_values[0], shifts.Shift):
+        return np.array([shift.t for shift in shift_values], dtype=int)
+    return np.asarray(shift_values, dtype=int)
+
+
+def RealignCorrelators(
+    correlators: np.ndarray, shift_values, boundary_sign: int = 1
+) -> np.ndarray:
+    """
+    Rolls the time axis of every correlator back to a common origin.
+
+    A correlator computed on a configuration shifted by t0 has its source at
+    t0 of the unshifted lattice, so the aligned correlator is
+    C'(t) = C(t + t0), wrapping around the lattice. All rows are realigned
+    with a single gather, np.take_along_axis, rather than one roll per file.
+
+    Arguments:
+    correlators   -- np.ndarray: Stack of correlators [ncorr, NT, ...].
+    shift_values  -- ShiftArray, list[Shift], list[str] or ints: The shift of
+                     each correlator. Only the t component is used.
+    boundary_sign -- int: Sign picked up by values which wrap around the time
+                     boundary, eg. -1 for baryons with antiperiodic quarks.
+
+    Returns:
+    aligned -- np.ndarray: Realigned correlators, same shape as correlators.
+    """
+    correlators = np.asarray(correlators)
+    ncorr, NT = correlators.shape[:2]
+    t_shifts = _time_shifts(shift_values)
+    if t_shifts.shape != (ncorr,):
+        raise ValueError(f"Require one shift per correlator, got {t_shifts.size} for {ncorr}.")
+
+    source_times = np.arange(NT)[None, :] + t_shifts[:, None]
+    indices = source_times % NT
+    extra_dims = (1,) * (correlators.ndim - 2)
+    aligned = np.take_along_axis(correlators, indices.reshape(indices.shape + extra_dims), axis=1)
+    if boundary_sign != 1:
+        # Sign of every wrap around the boundary, in case a shift exceeds NT
+        signs = np.where((source_times // NT) % 2 == 1, boundary_sign, 1)
+        aligned = aligned * signs.reshape(signs.shape + extra_dims)
+    return aligned
+
+
+def AverageShiftedCorrelators(
+    correlators: np.ndarray, shift_values, groups: np.ndarray = None, boundary_sign: int = 1
+) -> np.ndarray:
+    """
+    Realigns correlators and averages over their shifts.
+
+    Arguments:
+    correlators   -- np.ndarray: Stack of correlators [ncorr, NT, ...].
+    shift_values  -- As for RealignCorrelators.
+    groups        -- np.ndarray: Optional int label of each correlator, eg.
+                     its configuration number. Correlators sharing a label are
+                     averaged together. By default all correlators are averaged.
+    boundary_sign -- int: As for RealignCorrelators.
+
+    Returns:
+    average -- np.ndarray: [NT, ...] or [ngroups, NT, ...] ordered by sorted label.
+    """
+    aligned = RealignCorrelators(correlators, shift_values, boundary_sign)
+    if groups is None:
+        return aligned.mean(axis=0)
+
+    labels, inverse, counts = np.unique(groups, return_inverse=True, return_counts=True)
+    sums = np.zeros((labels.size,) + aligned.shape[1:], dtype=aligned.dtype)
+    np.add.at(sums, inverse.ravel(), aligned)
+    return sums / counts.reshape((-1,) + (1,) * (aligned.ndim - 1))
+
+
+def ProjectCorrelators(
+    correlators: np.ndarray,
+    projectors: np.ndarray | dict[str, np.ndarray],
+    NT: int = 64,
+    transpose: bool = False,
+    chunk_size: int = None,
+) -> np.ndarray:
+    """
+    Projects Dirac indexed correlators with every projector at once.
+
+    Each correlator is viewed as [NT, 4, 4] and projected as tr(P G(t)) with
+    a single einsum over all configurations, timeslices and projectors.
+    Works on arrays from LoadCorrelators or on memory mapped files, in which
+    case chunk_size limits how many correlators are read into memory at once.
+
+    Arguments:
+    correlators -- np.ndarray: Correlators [NT * 16, ncon] as returned by
+                   LoadCorrelators, or [ncon, NT * 16] with transpose=True.
+    projectors  -- np.ndarray or dict: A [4, 4] projector, a stack [nproj, 4, 4]
+                   or a dict of name: projector, eg. dirac.parity_projectors.
+    NT          -- int: Number of timeslices.
+    transpose   -- bool: Whether the correlators are indexed [ncon, ...], as for
+                   LoadCorrelators.
+    chunk_size  -- int: Number of correlators to project at a time. All by default.
+
+    Returns:
+    projected -- np.ndarray or dict: [ncon, NT] for a single projector,
+                 [ncon, nproj, NT] for a stack or a dict of [ncon, NT] arrays.
+    """
+    if isinstance(projectors, dict):
+        stacked = ProjectCorrelators(
+            correlators, np.stack(list(projectors.values())), NT, transpose, chunk_size
+        )
+        return dict(zip(projectors, np.moveaxis(stacked, 1, 0)))
+
+    projectors = np.asarray(projectors)
+    single = projectors.ndim == 2
+    projectors = projectors.reshape(-1, 4, 4)
+
+    if not transpose:
+        correlators = correlators.T
+    if correlators.ndim != 2 or correlators.shape[1] != NT * 16:
+        raise ValueError(
+            f"Correlators of shape {correlators.shape} with {transpose = } are not"
+            f" [ncon, {NT * 16}] for {NT = }."
+        )
+    ncon = correlators.shape[0]
+    chunk_size = ncon if chunk_size is None else chunk_size
+    projected = np.empty((ncon, projectors.shape[0], NT), dtype=complex)
+    for start in range(0, ncon, chunk_size):
+        chunk = np.asarray(correlators[start : start + chunk_size], dtype=complex)
+        chunk = chunk.reshape(-1, NT, 4, 4)
+        projected[start : start + chunk_size] = np.einsum(
+            "pij,ctji->cpt", projectors, chunk, optimize=True
+        )
+    return projected[:, 0] if single else projected
+
+
+def ProjectCorrelatorFiles(
+    correlatorList: list,
+    projectors: np.ndarray | dict[str, np.ndarray],
+    NT: int = 64,
+    dtype: str = ">c16",
+    chunk_size: int = 1000,
+) -> np.ndarray:
+    """
+    Streams correlator files from disk, projecting chunk_size files at a time.
+
+    Only one chunk of full correlators is held in memory. Arguments and
+    return value are as for ProjectCorrelators.
+    """
+    size = NT * 16 * np.dtype(dtype).itemsize
+    chunks = []
+    for start in range(0, len(correlatorList), chunk_size):
+        files = correlatorList[start : start + chunk_size]
+        chunk = np.empty((len(files), NT * 16), dtype=dtype)
+        for i, correlator in enumerate(files):
+            if Path(correlator).stat().st_size != size:
+                raise ValueError(f"{correlator} is not {size} bytes.")
+            chunk[i] = LoadSingleCorrelator(correlator, dtype=dtype)
+        chunks.append(ProjectCorrelators(chunk, projectors, NT, transpose=True))
+
+    if isinstance(projectors, dict):
+        return {name: np.concatenate([c[name] for c in chunks]) for name in projectors}
+    return np.concatenate(chunks)
+
+
+class MomentumLayout:
+    def __init__(
+        self,
+        momenta: list[CfunMomentum],
+        NT: int = 64,
+        ncomponents: int = 16,
+        dtype: str = ">c16",
+        momentum_major: bool = True,
+    ):
+        """
+        Layout of correlator files holding several momentum projections.
+
+        By default a file is [nmom, NT, ncomponents] with the momenta in the
+        order given, so the 262144 byte correlators are 16 momenta of 64
+        timeslices of 16 Dirac components. With momentum_major=False the file
+        is [NT, nmom, ncomponents] instead.
+
+        Parameters
+        ----------
+        momenta : list[CfunMomentum]
+            Momenta in the order they are stored.
+        NT : int, optional
+            Number of timeslices, by default 64
+        ncomponents : int, optional
+            Values per momentum and timeslice, eg. 16 Dirac components, by default 16
+        dtype : str, optional
+            Data type of the file, by default ">c16"
+        momentum_major : bool, optional
+            Whether momentum is the slowest index, by default True
+        """
+        self.momenta = list(momenta)
+        self.NT = NT
+        self.ncomponents = ncomponents
+        self.dtype = np.dtype(dtype)
+        self.momentum_major = momentum_major
+        self._slots = {}
+        for i, momentum in enumerate(self.momenta):
+            if self._slots.setdefault(momentum.key, i) != i:
+                raise ValueError(f"Momentum {momentum.key} appears more than once in the layout.")
+
+    @property
+    def shape(self) -> tuple[int]:
+        if self.momentum_major:
+            return (len(self.momenta), self.NT, self.ncomponents)
+        return (self.NT, len(self.momenta), self.ncomponents)
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+    def slots(self, momenta: list[CfunMomentum]) -> np.ndarray:
+        """Index of each momentum in the file."""
+        try:
+            return np.array([self._slots[momentum.key] for momentum in momenta], dtype=int)
+        except KeyError as e:
+            raise ValueError(f"Momentum {e} is not in the layout.")
+
+    def offsets(self, momenta: list[CfunMomentum]) -> np.ndarray:
+        """Byte offset of the first value of each momentum in the file."""
+        stride = self.ncomponents if not self.momentum_major else self.NT * self.ncomponents
+        return self.slots(momenta) * stride * self.dtype.itemsize
+
+    def read(self, filepath: os.PathLike, momenta: list[CfunMomentum]) -> np.ndarray:
+        """Read only the requested momenta of a file, [nmom, NT, ncomponents]."""
+        if Path(filepath).stat().st_size != self.nbytes:
+            raise ValueError(f"{filepath} is not {self.nbytes} bytes.")
+        mapped = np.memmap(filepath, dtype=self.dtype, mode="r", shape=self.shape)
+        slots = self.slots(momenta)
+        if self.momentum_major:
+            return np.asarray(mapped[slots])
+        return np.asarray(mapped[:, slots]).swapaxes(0, 1)
+
+
+def GroupEquivalentMomenta(momenta: list[CfunMomentum]) -> tuple[list[tuple[int]], np.ndarray]:
+    """
+    Groups momenta related by permutations and reflections.
+
+    Returns:
+    keys    -- list: equivalence_key of each group in order of first appearance.
+    inverse -- np.ndarray: Group index of each momentum.
+    """
+    keys = list(dict.fromkeys(momentum.equivalence_key for momentum in momenta))
+    group_index = {key: i for i, key in enumerate(keys)}
+    return keys, np.array([group_index[m.equivalence_key] for m in momenta], dtype=int)
+
+
+def LoadMomentumCorrelators(
+    correlatorList: list,
+    momenta: list[CfunMomentum],
+    layout: MomentumLayout,
+    average_equivalent: bool = False,
+) -> np.ndarray:
+    """
+    Reads selected momentum projections from many correlator files.
+
+    Each file is memory mapped and only the requested momenta are read.
+    Equivalent momenta may be averaged as each file is read, so the full
+    set of momenta is never held for all files.
+
+    Arguments:
+    correlatorList     -- list: Correlator files.
+    momenta            -- list[CfunMomentum]: Momenta to extract.
+    layout             -- MomentumLayout: Layout of the files.
+    average_equivalent -- bool: Average momenta with the same equivalence_key,
+                          groups ordered as returned by GroupEquivalentMomenta.
+
+    Returns:
+    correlators -- np.ndarray: [ncon, nmom, NT, ncomponents], or
+                   [ncon, ngroups, NT, ncomponents] when averaging.
+    """
+    if average_equivalent:
+        keys, inverse = GroupEquivalentMomenta(momenta)
+        weights = np.zeros((len(keys), len(momenta)))
+        weights[inverse, np.arange(len(momenta))] = 1
+        weights /= weights.sum(axis=1, keepdims=True)
+        nout = len(keys)
+    else:
+        nout = len(momenta)
+
+    correlators = np.empty(
+        (len(correlatorList), nout, layout.NT, layout.ncomponents),
+        dtype=layout.dtype.newbyteorder("="),
+    )
+    for i, correlator in enumerate(correlatorList):
+        values = layout.read(correlator, momenta)
+        if average_equivalent:
+            values = np.einsum("gm,m...->g...", weights, values)
+        correlators[i] = values
+    return correlators
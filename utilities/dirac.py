@@ -0,0 +1,58 @@
+"""
+Euclidean Dirac matrices in the Pauli-Dirac representation and the
+projectors used to reduce multi-component correlators.
+
+gamma_k = [[0, -i sigma_k], [i sigma_k, 0]], gamma_4 = diag(1, 1, -1, -1)
+and gamma_5 = gamma_1 gamma_2 gamma_3 gamma_4. All are hermitian and square
+to the identity.
+"""
+import numpy as np
+
+pauli = np.array(
+    [
+        [[0, 1], [1, 0]],
+        [[0, -1j], [1j, 0]],
+        [[1, 0], [0, -1]],
+    ],
+    dtype=complex,
+)
+
+_zero = np.zeros((2, 2))
+_identity = np.eye(2)
+
+identity = np.eye(4, dtype=complex)
+gamma_1, gamma_2, gamma_3 = (
+    np.block([[_zero, -1j * sigma], [1j * sigma, _zero]]) for sigma in pauli
+)
+gamma_4 = np.block([[_identity, _zero], [_zero, -_identity]]).astype(complex)
+gamma_5 = gamma_1 @ gamma_2 @ gamma_3 @ gamma_4
+gammas = np.stack([gamma_1, gamma_2, gamma_3, gamma_4])
+
+# Spin operators Sigma_k = diag(sigma_k, sigma_k)
+sigma_1, sigma_2, sigma_3 = (
+    -1j * gammas[i] @ gammas[j] for i, j in ((1, 2), (2, 0), (0, 1))
+)
+
+# Positive and negative parity projectors (1 +- gamma_4) / 2
+parity_projectors = {
+    "+": (identity + gamma_4) / 2,
+    "-": (identity - gamma_4) / 2,
+}
+
+
+def spin_projector(parity: str = "+", spin: str = "up", direction: int = 3) -> np.ndarray:
+    """Parity and spin projector (1 +- gamma_4) / 2 (1 +- Sigma_k) / 2."""
+    try:
+        parity_projector = parity_projectors[parity]
+    except KeyError:
+        raise ValueError("parity must be '+' or '-'.")
+    if spin not in ("up", "down"):
+        raise ValueError("spin must be 'up' or 'down'.")
+    sigma = (sigma_1, sigma_2, sigma_3)[direction - 1]
+    sign = 1 if spin == "up" else -1
+    return parity_projector @ (identity + sign * sigma) / 2
+
+
+def polarised_projector(direction: int, parity: str = "+") -> np.ndarray:
+    """(1 +- gamma_4) / 2 i gamma_5 gamma_k, as used for magnetic form factors."""
+    return parity_projectors[parity] @ (1j * gamma_5 @ gammas[direction - 1])
@@ -0,0 +1,145 @@
+"""
+Effective masses and energy shifts of jackknifed correlators.
+
+Correlators are taken as arrays [..., ncon, NT], eg. [nkd, ncon, NT] for the
+kd (BF) values of a polarisability run, and every quantity is computed for
+all kd, jackknives and timeslices at once. Results are JackknifeArrays with
+shape [..., NT, ncon], the jackknife axis last as usual, so a timeslice of
+energy shifts [nkd, ncon] may be passed straight to PolarisabilityFit or
+PolarisabilityTarget.
+
+Timeslices for which a quantity is undefined, eg. the last tau timeslices
+of a log effective mass, are set to nan so that index t always refers to
+timeslice t.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from utilities import jackknives as jack
+
+
+def _time_ordered(correlators: np.ndarray) -> np.ndarray:
+    """[..., ncon, NT] -> [..., NT, ncon]"""
+    return np.swapaxes(np.asarray(correlators, dtype=float), -1, -2)
+
+
+def _check_tau(tau: int):
+    if int(tau) != tau or tau < 1:
+        raise ValueError(f"{tau = } must be a positive integer.")
+
+
+def _log_ratio(values: np.ndarray, tau: int) -> np.ndarray:
+    """log(C(t) / C(t + tau)) / tau along the time axis of [..., NT, ncon], nan padded."""
+    result = np.full(values.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result[..., :-tau, :] = np.log(values[..., :-tau, :] / values[..., tau:, :]) / tau
+    return result
+
+
+def log_effective_mass(correlators: np.ndarray, tau: int = 1) -> jack.JackknifeArray:
+    """
+    Effective mass log(C(t) / C(t + tau)) / tau.
+
+    Parameters
+    ----------
+    correlators : np.ndarray
+        Jackknifed correlators [..., ncon, NT].
+    tau : int, optional
+        Time separation, by default 1
+
+    Returns
+    -------
+    jack.JackknifeArray
+        Effective masses [..., NT, ncon].
+    """
+    _check_tau(tau)
+    return jack.JackknifeArray(_log_ratio(_time_ordered(correlators), tau))
+
+
+def cosh_effective_mass(correlators: np.ndarray) -> jack.JackknifeArray:
+    """
+    Effective mass arccosh((C(t + 1) + C(t - 1)) / 2 C(t)) of periodic correlators.
+
+    Parameters
+    ----------
+    correlators : np.ndarray
+        Jackknifed correlators [..., ncon, NT].
+
+    Returns
+    -------
+    jack.JackknifeArray
+        Effective masses [..., NT, ncon], nan at the first and last timeslice.
+    """
+    values = _time_ordered(correlators)
+    masses = np.full(values.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        masses[..., 1:-1, :] = np.arccosh(
+            (values[..., 2:, :] + values[..., :-2, :]) / (2 * values[..., 1:-1, :])
+        )
+    return jack.JackknifeArray(masses)
+
+
+def ratio_correlators(
+    correlators: np.ndarray, kds: np.ndarray
+) -> tuple[np.ndarray, jack.JackknifeArray]:
+    """
+    Ratios C(kd, t) / C(0, t) for every non-zero kd.
+
+    Parameters
+    ----------
+    correlators : np.ndarray
+        Jackknifed correlators [nkd, ncon, NT].
+    kds : np.ndarray
+        kd of each row of correlators. Must include 0.
+
+    Returns
+    -------
+    tuple[np.ndarray, jack.JackknifeArray]
+        The non-zero kds and their ratio correlators [nkd - 1, NT, ncon].
+    """
+    kds = np.asarray(kds)
+    values = _time_ordered(correlators)
+    if kds.shape != values.shape[:1]:
+        raise ValueError(f"Require one kd per correlator, got {kds.size} for {values.shape[0]}.")
+    zero = np.flatnonzero(kds == 0)
+    if zero.size != 1:
+        raise ValueError("kds must contain 0 exactly once.")
+    nonzero = kds != 0
+    return kds[nonzero], jack.JackknifeArray(values[nonzero] / values[zero])
+
+
+def energy_shifts(
+    correlators: np.ndarray, kds: np.ndarray, tau: int = 1, sign_average: bool = True
+) -> tuple[np.ndarray, jack.JackknifeArray]:
+    """
+    Energy shifts, the effective masses of the ratio correlators C(kd) / C(0).
+
+    Parameters
+    ----------
+    correlators : np.ndarray
+        Jackknifed correlators [nkd, ncon, NT].
+    kds : np.ndarray
+        kd of each row of correlators. Must include 0.
+    tau : int, optional
+        Time separation of the effective mass, by default 1
+    sign_average : bool, optional
+        Average the shifts of +kd and -kd, by default True. A kd without its
+        partner is kept as is.
+
+    Returns
+    -------
+    tuple[np.ndarray, jack.JackknifeArray]
+        The kds (|kd| in increasing order when sign averaged) and their energy
+        shifts [nkd, NT, ncon].
+    """
+    _check_tau(tau)
+    kds, ratios = ratio_correlators(correlators, kds)
+    shifts = _log_ratio(ratios.jackknives, tau)
+    if not sign_average:
+        return kds, jack.JackknifeArray(shifts)
+
+    abs_kds, inverse, counts = np.unique(np.abs(kds), return_inverse=True, return_counts=True)
+    averaged = np.zeros((abs_kds.size,) + shifts.shape[1:])
+    np.add.at(averaged, inverse, shifts)
+    return abs_kds, jack.JackknifeArray(averaged / counts[:, None, None])
@@ -7,11 +7,12 @@ import lsqfit as lsq
 import natpy as nat
 import numpy as np
 
-from utilities import jackknives, structure, particles, configIDs
+from utilities import jackknives, structure, particles, configIDs, models, least_squares
 
 
 
 JackknifeEnsemble = jackknives.JackknifeEnsemble
+JackknifeArray = jackknives.JackknifeArray
 Structure = structure.Structure
 
 
@@ -20,22 +21,66 @@ logging.Formatter(fmt="%(name)s(%(lineno)d)::%(levelname)-8s: %(message)s")
 
 
 class Fit_1d:
+    # lsqfit returns full gvar fit objects. The array backend minimises the
+    # correlated chi^2 on plain ndarrays which is much faster for large numbers
+    # of fits but does not support priors.
+    backends = ("lsqfit", "array")
+
     def __init__(
         self,
-        fcn: callable,
-        nparams: int,
+        fcn: callable | models.Model,
+        nparams: int | None,
         x: np.ndarray,
         y,
         y_err: np.ndarray = None,
-        jackknives: list[JackknifeEnsemble] = None,
+        jackknives: list[JackknifeEnsemble] | JackknifeArray = None,
         initial_guess: list[float] = None,
         prior: dict[str,gv.gvar] = None,
         calculate_naive_chi_sq: bool = False,
         fit_jackknives: bool = False,
+        backend: str = "lsqfit",
     ):
+        # Built-in models carry analytic Jacobians which lsqfit uses
+        # directly rather than differentiating fcn through gvar.
         self.fcn = fcn
+        if isinstance(fcn, models.Model):
+            if nparams not in (None, fcn.nparams):
+                raise ValueError(
+                    f"{nparams = } does not match the {fcn.nparams} parameters of {fcn}."
+                )
+            nparams = fcn.nparams
+            # Models take their parameters as a single array
+            if isinstance(prior, dict):
+                raise ValueError(
+                    f"{fcn} takes an array of parameters, pass prior as an array of"
+                    f" {nparams} gvars rather than a dict."
+                )
+        elif nparams is None:
+            raise ValueError("nparams must be specified unless fcn is a models.Model.")
         self.nparams = nparams
         self.x = x
+
+        if backend not in self.backends:
+            raise ValueError(f"backend must be one of {self.backends}.")
+        if backend == "array" and prior is not None:
+            raise ValueError("Priors are only supported by the lsqfit backend.")
+        self.backend = backend
+
+        # A JackknifeArray y is both the data, as its ensemble average, and
+        # the jackknives, so its cached gvars are shared by every fit of it.
+        if isinstance(y, JackknifeArray):
+            if jackknives is not None and jackknives is not y:
+                raise ValueError(
+                    "jackknives must not be passed separately when y is a JackknifeArray."
+                )
+            jackknives = y
+            y = y.ensemble_average
+
+        # Held as a single array so that the covariance matrix and per config
+        # uncertainties are computed once for all observables and cached.
+        if jackknives is not None:
+            jackknives = JackknifeArray.from_ensembles(jackknives)
+
         if isinstance(y[0], gv.GVar):
             if y_err is not None:
                 logging.warning(
@@ -52,27 +97,41 @@ class Fit_1d:
 
             # In case gvar were passed as a list
             self.y = gv.gvar(y)
+            self.y_mean = gv.mean(self.y)
+            self.y_covariance = gv.evalcov(self.y)
 
         elif isinstance(y[0], (float, np.floating)):
             if y_err is jackknives is None:
                 raise ValueError(
                     "y is array of floats so either y_err or jackknives must be non-None."
                 )
+            self.y_mean = np.asarray(y, dtype=float)
             if y_err is None:
                 logger.info(
                     "Setting uncertainties using covariance matrix from jackknives."
                 )
-                self.covariance_matrix = covariance_matrix(jackknives)
+                self.covariance_matrix = jackknives.covariance_matrix
                 logger.debug(f"Covariance matrix:\n{self.covariance_matrix}")
-                self.y = gv.gvar(y, self.covariance_matrix)
-            elif jackknives is None:
-                self.y = gv.gvar(y, y_err)
+                self.y_covariance = self.covariance_matrix
+            else:
+                self.y_covariance = np.diag(np.asarray(y_err, dtype=float) ** 2)
+
+            # Constructing correlated gvars is the expensive step so it is
+            # skipped entirely when lsqfit is not used, and when y is the
+            # ensemble average the jackknives' cached gvars are reused.
+            if self.backend != "lsqfit":
+                self.y = None
+            elif y_err is None and np.array_equal(self.y_mean, jackknives.ensemble_average):
+                self.y = jackknives.gvars
+            else:
+                self.y = gv.gvar(self.y_mean, self.y_covariance)
         else:
             raise ValueError("y must be array of gvars or floats.")
 
         if initial_guess is None and prior is None:
             logger.info("Taking initial guess to be zero for all fit parameters.")
             self.initial_guess = [0] * self.nparams
+            self.prior = None
         elif initial_guess is not None and prior is not None:
             raise ValueError("Cannot have non-None prior and initial guess.")
         else:
@@ -86,6 +145,12 @@ class Fit_1d:
         self.fit_jackknives = fit_jackknives
 
     def do_fit(self):
+        if self.backend == "array":
+            self._do_fit_array()
+        else:
+            self._do_fit_lsqfit()
+
+    def _do_fit_lsqfit(self):
         self.average_fit = lsq.nonlinear_fit(
             data=(self.x, self.y), fcn=self.fcn, p0=self.initial_guess, prior=self.prior,
         )
@@ -94,7 +159,7 @@ class Fit_1d:
             if self.prior is not None:
                 guess_args = {"prior": self.prior}
             else:
-                guess_args = {"p0": [gv.mean(self.average_fit.p)]}
+                guess_args = {"p0": gv.mean(self.average_fit.p)}
 
         if self.calculate_naive_chi_sq:
             diagonal_covariance_mat = gv.evalcov(self.y) * np.eye(self.y.size)
@@ -105,38 +170,68 @@ class Fit_1d:
 
         if self.fit_jackknives:
             self.jackknife_fits = []
-            ncon = self.jackknives[0].ncon
-            self.jackknife_fits_values = np.zeros(ncon)
+            ncon = self.jackknives.ncon
+            self.jackknife_fits_values = np.zeros((ncon, self.nparams))
+            y_data = self.jackknives.jackknives
+            y_err = self.jackknives.uncertainties
             for icon in range(ncon):
-                y_data = [
-                    jackknife_ensemble.jackknives[icon]
-                    for jackknife_ensemble in self.jackknives
-                ]
-                y_err = [
-                    jackknife_ensemble.uncertainties[icon]
-                    for jackknife_ensemble in self.jackknives
-                ]
-
                 self.jackknife_fits.append(
                     lsq.nonlinear_fit(
-                        data=(self.x, y_data, y_err),
+                        data=(self.x, y_data[:, icon], y_err[:, icon]),
                         fcn=self.fcn,
                         **guess_args,
                     )
                 )
                 self.jackknife_fits_values[icon] = self.jackknife_fits[icon].pmean
-            self.jackknife_fits_values = JackknifeEnsemble(self.jackknife_fits_values)
+            self.jackknife_fits_values = self._to_jackknife_ensembles(
+                self.jackknife_fits_values
+            )
 
+    def _do_fit_array(self):
+        """
+        As _do_fit_lsqfit but using least_squares. Fit objects are LeastSquaresResults
+        and the jackknife fits are done as a single batched fit.
+        """
+        model = models.as_model(self.fcn, self.nparams)
+        x = np.asarray(self.x, dtype=float)
+        self.whitener = least_squares.Whitener(covariance=self.y_covariance)
+        self.average_fit = least_squares.levenberg_marquardt(
+            model, x, self.y_mean, self.whitener, self.initial_guess
+        )
+        p0 = self.average_fit.pmean
 
-def covariance_matrix(jackknife_ensembles: list[JackknifeEnsemble]) -> np.ndarray:
-    ensemble_averages = np.asarray(
-        [ensemble.ensemble_average for ensemble in jackknife_ensembles]
-    )
-    product_of_average = ensemble_averages[:, None] * ensemble_averages[:, None].T
-    jackknives = np.asarray([ensemble.jackknives for ensemble in jackknife_ensembles])
-    ncon = jackknives.shape[1]
-    average_of_product = np.matmul(jackknives, jackknives.T) / ncon
-    return (ncon - 1) * (average_of_product - product_of_average)
+        if self.calculate_naive_chi_sq:
+            naive_whitener = least_squares.Whitener(
+                errors=np.sqrt(np.diag(self.y_covariance))
+            )
+            self.naive_fit = least_squares.levenberg_marquardt(
+                model, x, self.y_mean, naive_whitener, p0
+            )
+
+        if self.fit_jackknives:
+            # [ncon, ny] arrays so that each config is one fit in the batch
+            y_data = self.jackknives.jackknives.T
+            y_err = self.jackknives.uncertainties.T
+            self.jackknife_fits = least_squares.levenberg_marquardt(
+                model, x, y_data, least_squares.Whitener(errors=y_err), p0
+            )
+            self.jackknife_fits_values = self._to_jackknife_ensembles(
+                self.jackknife_fits.pmean
+            )
+
+    def _to_jackknife_ensembles(
+        self, values: np.ndarray
+    ) -> JackknifeEnsemble | list[JackknifeEnsemble]:
+        """Wrap [ncon, nparams] fit values, a single ensemble for one parameter fits."""
+        if self.nparams == 1:
+            return JackknifeEnsemble(values[:, 0])
+        return [JackknifeEnsemble(values[:, i]) for i in range(self.nparams)]
+
+
+def covariance_matrix(
+    jackknife_ensembles: list[JackknifeEnsemble] | JackknifeArray,
+) -> np.ndarray:
+    return JackknifeArray.from_ensembles(jackknife_ensembles).covariance_matrix
 
 
 class PolarisabilityFit(Fit_1d):
@@ -152,6 +247,7 @@ class PolarisabilityFit(Fit_1d):
         initial_guess: float = 0,
         calculate_naive_chi_sq: bool = True,
         fit_jackknives: bool = False,
+        backend: str = "lsqfit",
     ):
         self.particle = particle
         self.structure = structure
@@ -188,7 +284,7 @@ class PolarisabilityFit(Fit_1d):
             jackknives = None
 
         super().__init__(
-            fcn=self._quadfit,
+            fcn=models.quadratic,
             nparams=1,
             x=x,
             y=y,
@@ -196,6 +292,7 @@ class PolarisabilityFit(Fit_1d):
             initial_guess=[initial_guess],
             calculate_naive_chi_sq=calculate_naive_chi_sq,
             fit_jackknives=fit_jackknives,
+            backend=backend,
         )
 
     @staticmethod
@@ -211,28 +308,30 @@ class PolarisabilityFit(Fit_1d):
             / HBARC
         )
 
-    @staticmethod
-    def _quadfit(x, a0):
-        return x**2 * a0
-
     @staticmethod
     def calculate_landau(
         mass: float | np.ndarray, particle: str, structure: Structure, spacing: float
     ) -> float | np.ndarray:
 
         particle_charge = particles.get_particle_charge(particle, structure)
+        landau = PolarisabilityFit.landau_coefficient(particle_charge, spacing) / mass
+        return landau
+
+    @staticmethod
+    def landau_coefficient(
+        particle_charge: float | np.ndarray, spacing: float | np.ndarray
+    ) -> float | np.ndarray:
+        """Landau term multiplied by the mass. Vectorised over charge and spacing."""
         q_d = -1 / 3
         Nx = Ny = 32
         HBARC = 0.1973269718  # GeV fm
-        landau = (
-            abs(particle_charge / (q_d))
+        return (
+            np.abs(particle_charge / (q_d))
             * np.pi
             / Nx
             / Ny
             * (HBARC / spacing) ** 2
-            / mass
         )
-        return landau
 
 
 class PolarisabilityDiffFit(PolarisabilityFit):
@@ -250,6 +349,7 @@ class PolarisabilityDiffFit(PolarisabilityFit):
         initial_guess: float = 0,
         calculate_naive_chi_sq: bool = True,
         fit_jackknives: bool = False,
+        backend: str = "lsqfit",
     ):
         self.particle_1 = particle_1
         self.particle_2 = particle_2
@@ -304,7 +404,7 @@ class PolarisabilityDiffFit(PolarisabilityFit):
             jackknives = None
 
         super(PolarisabilityFit, self).__init__(
-            fcn=self._quadfit,
+            fcn=models.quadratic,
             nparams=1,
             x=x,
             y=y,
@@ -312,6 +412,358 @@ class PolarisabilityDiffFit(PolarisabilityFit):
             initial_guess=[initial_guess],
             calculate_naive_chi_sq=calculate_naive_chi_sq,
             fit_jackknives=fit_jackknives,
+            backend=backend,
+        )
+
+
+class PolarisabilityTarget:
+    def __init__(
+        self,
+        particle: str | particles.Particle,
+        structure: Structure,
+        ensemble: configIDs.PACSEnsemble,
+        mass_jackknives: JackknifeEnsemble | np.ndarray,
+        energy_shift_jackknives: list[JackknifeEnsemble] | JackknifeArray | np.ndarray,
+        particle_2: str | particles.Particle = None,
+        structure_2: Structure = None,
+        mass_2_jackknives: JackknifeEnsemble | np.ndarray = None,
+    ):
+        """
+        Holds the jackknives for one polarisability fit in a BatchedPolarisabilityFit.
+
+        Specifying particle_2, structure_2 and mass_2_jackknives makes this the
+        equivalent of a PolarisabilityDiffFit where the energy shift is the
+        difference of the two particles' energy shifts.
+
+        Parameters
+        ----------
+        particle : str | particles.Particle
+            Particle (name) whose charge determines the Landau term.
+        structure : Structure
+            Structure of the particle.
+        ensemble : configIDs.PACSEnsemble
+            Ensemble the jackknives were computed on.
+        mass_jackknives : JackknifeEnsemble | np.ndarray
+            Jackknives of the particle mass, [ncon].
+        energy_shift_jackknives : list[JackknifeEnsemble] | np.ndarray
+            Jackknives of the energy shift for kd = 1, 2, ..., [nkd, ncon].
+        particle_2, structure_2, mass_2_jackknives : optional
+            As above for the subtracted particle of a difference fit.
+        """
+        self.particle = particle
+        self.structure = Structure(structure)
+        self.ensemble = ensemble
+        self.mass_jackknives = self._as_array(mass_jackknives)
+        self.energy_shift_jackknives = self._as_array(energy_shift_jackknives)
+        self.num_kd, self.ncon = self.energy_shift_jackknives.shape
+
+        diff_args = (particle_2, structure_2, mass_2_jackknives)
+        if all(arg is not None for arg in diff_args):
+            self.particle_2 = particle_2
+            self.structure_2 = Structure(structure_2)
+            self.mass_2_jackknives = self._as_array(mass_2_jackknives)
+            self.is_diff = True
+        elif any(arg is not None for arg in diff_args):
+            raise ValueError(
+                "particle_2, structure_2 and mass_2_jackknives must all be specified for a difference fit."
+            )
+        else:
+            self.is_diff = False
+
+    @staticmethod
+    def _as_array(jackknives) -> np.ndarray:
+        if isinstance(jackknives, (JackknifeEnsemble, JackknifeArray)):
+            return jackknives.jackknives
+        return np.asarray(
+            [
+                ensemble.jackknives if isinstance(ensemble, JackknifeEnsemble) else ensemble
+                for ensemble in jackknives
+            ],
+            dtype=float,
+        )
+
+
+class BatchedPolarisabilityFit:
+    def __init__(self, targets: list[PolarisabilityTarget]):
+        """
+        Simultaneous polarisability fits for many particles, structures and ensembles.
+
+        Equivalent to a PolarisabilityFit (or PolarisabilityDiffFit) with
+        fit_jackknives=True for every target, but the Landau subtraction and the
+        quadratic fits are done as array operations over all targets at once.
+        Targets are grouped by their number of configurations and number of kd
+        values, each group being solved as a single batched problem. As the
+        quadratic fit is linear in its parameter it is solved exactly.
+
+        As in PolarisabilityFit, the central values are fit to the average
+        energy shifts minus the Landau term of the average mass, with the
+        covariance matrix from the Landau subtracted jackknives. The jackknife
+        level fits are uncorrelated using the per config uncertainties as in
+        Fit_1d.
+
+        Parameters
+        ----------
+        targets : list[PolarisabilityTarget]
+            The fits to perform.
+        """
+        self.targets = targets
+        self.ntargets = len(targets)
+        self.charges = self._lookup_charges(
+            [target.particle for target in targets],
+            [target.structure for target in targets],
+        )
+        # Non difference fits have no second Landau term, given zero charge
+        diffs = [i for i, target in enumerate(targets) if target.is_diff]
+        self.charges_2 = np.zeros(self.ntargets)
+        self.charges_2[diffs] = self._lookup_charges(
+            [targets[i].particle_2 for i in diffs],
+            [targets[i].structure_2 for i in diffs],
+        )
+
+    @staticmethod
+    def _lookup_charges(
+        particle_list: list[str | particles.Particle], structures: list[Structure]
+    ) -> np.ndarray:
+        """Charges from the dense registry table, falling back for unregistered particles."""
+        registry = particles.particle_registry
+        if all(particle in registry for particle in particle_list):
+            return registry.charges_of(particle_list, structures)
+        return np.array(
+            [
+                particles.get_particle_charge(particle, structure)
+                for particle, structure in zip(particle_list, structures)
+            ],
+            dtype=float,
+        )
+
+    def _groups(self) -> dict[tuple[int, int], list[int]]:
+        groups = {}
+        for i, target in enumerate(self.targets):
+            groups.setdefault((target.num_kd, target.ncon), []).append(i)
+        return groups
+
+    def do_fit(self):
+        self.pmean = np.zeros(self.ntargets)
+        self.psdev = np.zeros(self.ntargets)
+        self.chi2 = np.zeros(self.ntargets)
+        self.naive_chi2 = np.zeros(self.ntargets)
+        self.dof = np.zeros(self.ntargets, dtype=int)
+        self.landau_jackknives = [None] * self.ntargets
+        self.jackknife_fits_values = [None] * self.ntargets
+
+        for (num_kd, ncon), indices in self._groups().items():
+            targets = [self.targets[i] for i in indices]
+            x = np.arange(1, num_kd + 1)
+            x_squared = x**2
+
+            # Landau terms [ntargets, ncon]. Non difference fits have no second term.
+            spacing = np.array([t.ensemble.a for t in targets])[:, None]
+            mass_1 = np.stack([t.mass_jackknives for t in targets])
+            mass_2 = np.stack(
+                [t.mass_2_jackknives if t.is_diff else np.ones(ncon) for t in targets]
+            )
+            coefficient_1 = PolarisabilityFit.landau_coefficient(
+                self.charges[indices, None], spacing
+            )
+            coefficient_2 = PolarisabilityFit.landau_coefficient(
+                self.charges_2[indices, None], spacing
+            )
+            landau = coefficient_1 / mass_1 - coefficient_2 / mass_2
+            # Landau term of the average masses, [ntargets]
+            landau_mean = (
+                coefficient_1 / mass_1.mean(axis=-1, keepdims=True)
+                - coefficient_2 / mass_2.mean(axis=-1, keepdims=True)
+            )[:, 0]
+
+            # [ntargets, nkd, ncon]
+            energy_shifts = np.stack([t.energy_shift_jackknives for t in targets])
+            y_jackknives = energy_shifts - landau[:, None, :] * x[None, :, None]
+            y = energy_shifts.mean(axis=-1) - landau_mean[:, None] * x
+
+            # Same covariance as covariance_matrix, batched over targets
+            deviations = y_jackknives - y_jackknives.mean(axis=-1, keepdims=True)
+            covariance = (
+                (ncon - 1) / ncon * np.einsum("bic,bjc->bij", deviations, deviations)
+            )
+            inverse_covariance = np.linalg.inv(covariance)
+            curvature = np.einsum("i,bij,j->b", x_squared, inverse_covariance, x_squared)
+            pmean = np.einsum("i,bij,bj->b", x_squared, inverse_covariance, y) / curvature
+            residuals = y - pmean[:, None] * x_squared
+            chi2 = np.einsum("bi,bij,bj->b", residuals, inverse_covariance, residuals)
+
+            variances = np.diagonal(covariance, axis1=-2, axis2=-1)
+            naive_pmean = (x_squared * y / variances).sum(axis=-1) / (
+                x_squared**2 / variances
+            ).sum(axis=-1)
+            naive_residuals = y - naive_pmean[:, None] * x_squared
+            naive_chi2 = (naive_residuals**2 / variances).sum(axis=-1)
+
+            # Jackknife level fits, uncorrelated with per config uncertainties
+            weights = jackknives.jackknife_uncertainties(y_jackknives) ** -2
+            jackknife_values = (
+                x_squared[None, :, None] * y_jackknives * weights
+            ).sum(axis=1) / (x_squared[None, :, None] ** 2 * weights).sum(axis=1)
+
+            self.pmean[indices] = pmean
+            self.psdev[indices] = curvature**-0.5
+            self.chi2[indices] = chi2
+            self.naive_chi2[indices] = naive_chi2
+            self.dof[indices] = num_kd - 1
+            for j, i in enumerate(indices):
+                self.landau_jackknives[i] = landau[j]
+                self.jackknife_fits_values[i] = JackknifeEnsemble(jackknife_values[j])
+
+    @property
+    def p(self) -> np.ndarray:
+        """Fit parameter of every target as gvars."""
+        return gv.gvar(self.pmean, self.psdev)
+
+    def convert_fits(self) -> np.ndarray:
+        """Polarisability of every target in physical units."""
+        spacing = np.array([target.ensemble.a for target in self.targets])
+        return PolarisabilityFit.convert_fit(self.p, spacing)
+
+
+class GlobalFit:
+    def __init__(
+        self,
+        datasets: list[Fit_1d],
+        keys: list = None,
+        initial_guess: list[float] = None,
+        prior: dict[str, gv.gvar] = None,
+        backend: str = "lsqfit",
+    ):
+        """
+        Fit several datasets simultaneously with one shared set of parameters.
+
+        Each dataset is a Fit_1d whose fcn takes the full shared parameter
+        vector, eg. a chiral extrapolation evaluated at that ensemble's pion
+        mass. Datasets are grouped into independent blocks by their key (eg.
+        the kappa value of the ensemble). Datasets sharing a key are treated as
+        correlated, with their cross covariance taken from their jackknives if
+        all of them have jackknives. Datasets with different keys are
+        uncorrelated, so the covariance is block diagonal and each block is
+        inverted and whitened on its own. The cost of the fit then scales
+        linearly with the number of ensembles.
+
+        Parameters
+        ----------
+        datasets : list[Fit_1d]
+            The datasets. All fcns must take the same number of parameters.
+        keys : list, optional
+            Independence key for each dataset, by default every dataset is independent.
+        initial_guess : list[float], optional
+            Starting parameters, by default zero.
+        prior : dict[str, gv.gvar], optional
+            Prior for the lsqfit backend. Cannot be used with initial_guess.
+        backend : str, optional
+            'lsqfit' or 'array', as for Fit_1d, by default "lsqfit"
+        """
+        nparams = {dataset.nparams for dataset in datasets}
+        if len(nparams) != 1:
+            raise ValueError("All datasets must share the same parameters.")
+        self.nparams = nparams.pop()
+        self.datasets = datasets
+
+        if keys is None:
+            keys = list(range(len(datasets)))
+        elif len(keys) != len(datasets):
+            raise ValueError("Length mismatch between keys and datasets.")
+        self.keys = keys
+        self.blocks = {}
+        for i, key in enumerate(keys):
+            self.blocks.setdefault(key, []).append(i)
+
+        if backend not in Fit_1d.backends:
+            raise ValueError(f"backend must be one of {Fit_1d.backends}.")
+        if backend == "array" and prior is not None:
+            raise ValueError("Priors are only supported by the lsqfit backend.")
+        self.backend = backend
+
+        if initial_guess is not None and prior is not None:
+            raise ValueError("Cannot have non-None prior and initial guess.")
+        elif initial_guess is None and prior is None:
+            logger.info("Taking initial guess to be zero for all fit parameters.")
+            initial_guess = [0] * self.nparams
+        self.initial_guess = initial_guess
+        self.prior = prior
+
+        self.block_covariances = {
+            key: self._block_covariance([datasets[i] for i in indices])
+            for key, indices in self.blocks.items()
+        }
+
+    @staticmethod
+    def _block_covariance(datasets: list[Fit_1d]) -> np.ndarray:
+        """Covariance of the concatenated y data of correlated datasets."""
+        if len(datasets) == 1:
+            return datasets[0].y_covariance
+
+        ensembles = [dataset.jackknives for dataset in datasets]
+        if None not in ensembles and len({e.ncon for e in ensembles}) == 1:
+            return JackknifeArray(
+                np.concatenate([e.jackknives for e in ensembles])
+            ).covariance_matrix
+
+        logger.warning(
+            "Correlated datasets without compatible jackknives, ignoring their cross covariance."
+        )
+        sizes = [dataset.y_mean.size for dataset in datasets]
+        covariance = np.zeros((sum(sizes), sum(sizes)))
+        start = 0
+        for size, dataset in zip(sizes, datasets):
+            covariance[start : start + size, start : start + size] = dataset.y_covariance
+            start += size
+        return covariance
+
+    def do_fit(self):
+        if self.backend == "array":
+            self._do_fit_array()
+        else:
+            self._do_fit_lsqfit()
+
+    def _do_fit_lsqfit(self):
+        # gvars created independently for each block are uncorrelated, which
+        # lsqfit recognises so the covariance is never treated as dense.
+        self.y = {}
+        for key, indices in self.blocks.items():
+            y_block = gv.gvar(
+                np.concatenate([self.datasets[i].y_mean for i in indices]),
+                self.block_covariances[key],
+            )
+            start = 0
+            for i in indices:
+                size = self.datasets[i].y_mean.size
+                self.y[i] = y_block[start : start + size]
+                start += size
+
+        def fcn(p):
+            return {i: dataset.fcn(dataset.x, p) for i, dataset in enumerate(self.datasets)}
+
+        self.average_fit = lsq.nonlinear_fit(
+            data=self.y, fcn=fcn, p0=self.initial_guess, prior=self.prior
+        )
+
+    def _do_fit_array(self):
+        # Datasets are reordered block by block to match the BlockWhitener
+        order = [i for indices in self.blocks.values() for i in indices]
+        datasets = [self.datasets[i] for i in order]
+        model = models.ConcatenatedModel(
+            [models.as_model(dataset.fcn, self.nparams) for dataset in datasets],
+            [dataset.y_mean.size for dataset in datasets],
+        )
+        self.whitener = least_squares.BlockWhitener(
+            [
+                least_squares.Whitener(covariance=covariance)
+                for covariance in self.block_covariances.values()
+            ]
+        )
+        self.average_fit = least_squares.levenberg_marquardt(
+            model,
+            np.concatenate([np.asarray(dataset.x, dtype=float) for dataset in datasets]),
+            np.concatenate([dataset.y_mean for dataset in datasets]),
+            self.whitener,
+            self.initial_guess,
         )
 
 
@@ -0,0 +1,297 @@
+"""
+Reader for gauge field configurations, eg. the PACS-CS ensembles in configIDs.
+
+Configurations are memory mapped rather than read, so opening one costs
+nothing and links are only paged in from disk as they are used. The link
+variables are exposed as a read only complex view with shape
+
+    [NT, NS, NS, NS, 4, 3, 3] = [t, z, y, x, mu, colour, colour]
+
+in the ILDG site ordering, x fastest, with directions mu = x, y, z, t.
+ILDG files are LIME archives; the binary record is located by scanning the
+LIME record headers, and its precision and byte order are taken into account
+by the view's dtype so no copy or byteswap of the file is ever made.
+
+The plaquette and Polyakov loop kernels stream over timeslices, converting
+at most two timeslices at a time to native complex128, and serve as a cheap
+validation of a configuration.
+"""
+from __future__ import annotations
+import logging
+import os
+import re
+
+import numpy as np
+
+from utilities import configIDs as cfg
+
+logger = logging.getLogger(__name__)
+logging.Formatter(fmt="%(name)s(%(lineno)d)::%(levelname)-8s: %(message)s")
+
+lime_magic = 0x456789AB
+lime_header_size = 144
+lime_header_dtype = np.dtype(
+    [("magic", ">u4"), ("version", ">u2"), ("flags", ">u2"), ("nbytes", ">u8"), ("type", "S128")]
+)
+ildg_binary_record = "ildg-binary-data"
+ildg_format_record = "ildg-format"
+
+# Lattice directions in link order, and the corresponding lattice axis of
+# an array indexed [t, z, y, x]
+directions = ("x", "y", "z", "t")
+direction_axes = (3, 2, 1, 0)
+
+
+class LimeRecord:
+    def __init__(self, record_type: str, offset: int, nbytes: int):
+        """
+        Location of one record in a LIME file.
+
+        Parameters
+        ----------
+        record_type : str
+            LIME record type, eg. 'ildg-binary-data'.
+        offset : int
+            Byte offset of the start of the record's data.
+        nbytes : int
+            Length of the record's data in bytes, excluding padding.
+        """
+        self.type = record_type
+        self.offset = offset
+        self.nbytes = nbytes
+
+    def read(self, filepath: os.PathLike) -> bytes:
+        with open(filepath, "rb") as f:
+            f.seek(self.offset)
+            return f.read(self.nbytes)
+
+    def __repr__(self):
+        return f"LimeRecord({self.type!r}, offset={self.offset}, nbytes={self.nbytes})"
+
+
+def scan_lime_records(filepath: os.PathLike) -> list[LimeRecord]:
+    """
+    Locate every record of a LIME file by reading only the record headers.
+
+    Returns an empty list if the file is not a LIME file, ie. a raw binary
+    configuration.
+    """
+    records = []
+    size = os.path.getsize(filepath)
+    with open(filepath, "rb") as f:
+        offset = 0
+        while offset + lime_header_size <= size:
+            f.seek(offset)
+            header = np.frombuffer(f.read(lime_header_size), dtype=lime_header_dtype)[0]
+            if header["magic"] != lime_magic:
+                if offset == 0:
+                    return []
+                raise ValueError(f"Corrupt LIME header at byte {offset} of {filepath}.")
+            nbytes = int(header["nbytes"])
+            data_offset = offset + lime_header_size
+            records.append(
+                LimeRecord(header["type"].decode().rstrip("\x00"), data_offset, nbytes)
+            )
+            # Records are padded to a multiple of 8 bytes
+            offset = data_offset + nbytes + (-nbytes) % 8
+    return records
+
+
+def _ildg_format(filepath: os.PathLike, records: list[LimeRecord]) -> dict[str, int]:
+    """Precision and lattice extents from the ildg-format record, if present."""
+    for record in records:
+        if record.type == ildg_format_record:
+            xml = record.read(filepath).decode(errors="ignore")
+            return {
+                field: int(match[1])
+                for field in ("precision", "lx", "ly", "lz", "lt")
+                if (match := re.search(rf"<{field}>\s*(\d+)\s*</{field}>", xml))
+            }
+    return {}
+
+
+def gauge_dtype(precision: int = 64, byteorder: str = ">") -> np.dtype:
+    """Complex dtype of links stored with real and imaginary parts of precision bits."""
+    if precision not in (32, 64):
+        raise ValueError(f"{precision = } must be 32 or 64.")
+    return np.dtype(f"{byteorder}c{precision // 4}")
+
+
+def load_gauge_field(
+    filepath: os.PathLike,
+    NS: int = 32,
+    NT: int = 64,
+    precision: int = None,
+    byteorder: str = ">",
+) -> np.memmap:
+    """
+    Memory map a gauge field configuration.
+
+    Parameters
+    ----------
+    filepath : os.PathLike
+        LIME/ILDG file, or a raw binary file holding only the links.
+    NS : int, optional
+        Spatial extent, by default 32
+    NT : int, optional
+        Temporal extent, by default 64
+    precision : int, optional
+        32 or 64 bit floats. By default taken from the ildg-format record or
+        otherwise inferred from the file size.
+    byteorder : str, optional
+        Byte order of the file, by default '>' as required by ILDG.
+
+    Returns
+    -------
+    np.memmap
+        Read only links [NT, NS, NS, NS, 4, 3, 3].
+    """
+    shape = (NT, NS, NS, NS, len(directions), 3, 3)
+    nlinks = int(np.prod(shape))
+
+    records = scan_lime_records(filepath)
+    if records:
+        try:
+            binary = next(r for r in records if r.type == ildg_binary_record)
+        except StopIteration:
+            raise ValueError(f"No {ildg_binary_record} record in {filepath}.")
+        offset, nbytes = binary.offset, binary.nbytes
+        ildg_format = _ildg_format(filepath, records)
+        extents = tuple(ildg_format.get(field) for field in ("lx", "ly", "lz", "lt"))
+        if None not in extents and extents != (NS, NS, NS, NT):
+            raise ValueError(f"{filepath} has extents {extents}, expected {(NS, NS, NS, NT)}.")
+        precision = ildg_format.get("precision", precision)
+    else:
+        offset, nbytes = 0, os.path.getsize(filepath)
+
+    if precision is None:
+        precision = 8 * nbytes // (2 * nlinks)
+    dtype = gauge_dtype(precision, byteorder)
+    if nbytes != nlinks * dtype.itemsize:
+        raise ValueError(
+            f"{filepath} holds {nbytes} bytes of links, expected {nlinks * dtype.itemsize}"
+            f" for {NS = }, {NT = }, {precision = }."
+        )
+    return np.memmap(filepath, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+
+def load_config(configID: cfg.ConfigID, root: os.PathLike = "", **kwargs) -> np.memmap:
+    """Memory map the configuration of a ConfigID with NS, NT from its ensemble."""
+    ensemble = configID.ensemble
+    filepath = os.path.join(root, configID.filename)
+    return load_gauge_field(filepath, NS=ensemble.NS, NT=ensemble.NT, **kwargs)
+
+
+def write_gauge_field(
+    filepath: os.PathLike, links: np.ndarray, precision: int = 64, lime: bool = True
+):
+    """
+    Write links [NT, NS, NS, NS, 4, 3, 3] in ILDG byte order.
+
+    With lime=True the links are wrapped in a minimal LIME file holding
+    ildg-format and ildg-binary-data records, otherwise raw binary is written.
+    """
+    NT, NS = links.shape[:2]
+    data = np.ascontiguousarray(links, dtype=gauge_dtype(precision)).tobytes()
+    if not lime:
+        with open(filepath, "wb") as f:
+            f.write(data)
+        return
+
+    ildg_format = (
+        f'<?xml version="1.0" encoding="UTF-8"?><ildgFormat><version>1.0</version>'
+        f"<field>su3gauge</field><precision>{precision}</precision>"
+        f"<lx>{NS}</lx><ly>{NS}</ly><lz>{NS}</lz><lt>{NT}</lt></ildgFormat>"
+    ).encode()
+    with open(filepath, "wb") as f:
+        for i, (record_type, payload) in enumerate(
+            ((ildg_format_record, ildg_format), (ildg_binary_record, data))
+        ):
+            header = np.zeros(1, dtype=lime_header_dtype)
+            # Message begin flag on the first record, message end on the last
+            header[0] = (lime_magic, 1, 0x8000 if i == 0 else 0x4000, len(payload), record_type.encode())
+            f.write(header.tobytes())
+            f.write(payload)
+            f.write(b"\x00" * ((-len(payload)) % 8))
+
+
+def _dagger(matrices: np.ndarray) -> np.ndarray:
+    return np.conj(np.swapaxes(matrices, -1, -2))
+
+
+def _timeslice(links: np.ndarray, t: int) -> np.ndarray:
+    """Native complex128 copy of one timeslice [NS, NS, NS, 4, 3, 3]."""
+    return np.asarray(links[t % links.shape[0]], dtype=np.complex128)
+
+
+def plaquette(links: np.ndarray) -> np.ndarray:
+    """
+    Average plaquette Re tr(U_mu(x) U_nu(x+mu) U_mu^+(x+nu) U_nu^+(x)) / 3
+    over the six planes for the sites of each timeslice.
+
+    Parameters
+    ----------
+    links : np.ndarray
+        Links [NT, NS, NS, NS, 4, 3, 3], eg. from load_gauge_field.
+
+    Returns
+    -------
+    np.ndarray
+        Plaquette of each timeslice [NT]. Its mean is the average plaquette,
+        which is 1 for the free field.
+    """
+    NT = links.shape[0]
+    planes = [(mu, nu) for nu in range(4) for mu in range(nu)]
+    plaquettes = np.empty(NT)
+    current = _timeslice(links, 0)
+    for t in range(NT):
+        following = _timeslice(links, t + 1)
+        total = 0.0
+        for mu, nu in planes:
+            U_mu = current[..., mu, :, :]
+            U_nu = current[..., nu, :, :]
+            total += np.einsum(
+                "...ij,...jk,...lk,...il->",
+                U_mu,
+                _shifted(current, following, nu, mu),
+                np.conj(_shifted(current, following, mu, nu)),
+                np.conj(U_nu),
+                optimize=True,
+            ).real
+        plaquettes[t] = total / (3 * len(planes) * np.prod(current.shape[:3]))
+        current = following
+    return plaquettes
+
+
+def _shifted(
+    current: np.ndarray, following: np.ndarray, direction: int, shift: int
+) -> np.ndarray:
+    """U_direction(x + shift) for the sites x of the current timeslice."""
+    if direction_axes[shift] == 0:
+        return following[..., direction, :, :]
+    # Timeslice arrays are indexed [z, y, x] so lattice axis a is array axis a - 1
+    return np.roll(current[..., direction, :, :], -1, axis=direction_axes[shift] - 1)
+
+
+def polyakov_loop(links: np.ndarray, average: bool = True) -> complex | np.ndarray:
+    """
+    Polyakov loop tr(prod_t U_t(t, x)) / 3, accumulated one timeslice at a time.
+
+    Parameters
+    ----------
+    links : np.ndarray
+        Links [NT, NS, NS, NS, 4, 3, 3], eg. from load_gauge_field.
+    average : bool, optional
+        Return the spatial average rather than the loop at every site, by default True
+
+    Returns
+    -------
+    complex | np.ndarray
+        Spatially averaged Polyakov loop, or its value at each site [NS, NS, NS].
+    """
+    t_direction = directions.index("t")
+    loop = _timeslice(links, 0)[..., t_direction, :, :]
+    for t in range(1, links.shape[0]):
+        loop = loop @ _timeslice(links, t)[..., t_direction, :, :]
+    loop = np.trace(loop, axis1=-2, axis2=-1) / 3
+    return loop.mean() if average else loop
@@ -0,0 +1,221 @@
+"""
+Variational analysis of correlation matrices over jackknives.
+
+Correlation matrices C(t) [ncon, NT, N, N] are built from the correlators
+of every source/sink operator pair, eg. proton_1 and proton_2 with their
+bars, and the generalised eigenvalue problem
+
+    C(t) v = lambda(t) C(t0) v
+
+is solved for every jackknife and timeslice at once. C(t0) is Cholesky
+factorised, C(t0) = L L^T, reducing the problem to the symmetric eigenvalue
+problem of L^-1 C(t) L^-T which is solved with a single batched eigh.
+
+Eigenvectors are normalised as v^T C(t0) v = 1 and each jackknife's
+eigenvectors are matched, in order and sign, to those of the ensemble
+average so that state n refers to the same state in every sample.
+"""
+from __future__ import annotations
+import functools
+import itertools
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+logging.Formatter(fmt="%(name)s(%(lineno)d)::%(levelname)-8s: %(message)s")
+
+# Largest basis for which every ordering of the eigenvectors is tried when
+# matching samples to the average. Larger bases keep eigenvalue ordering.
+max_permutation_size = 6
+
+
+def correlation_matrix(
+    correlators: dict,
+    chis: list[str],
+    chibars: list[str] = None,
+    symmetrise: bool = True,
+) -> np.ndarray:
+    """
+    Assemble correlation matrices from the correlators of operator pairs.
+
+    Parameters
+    ----------
+    correlators : dict
+        Correlators [ncon, NT] keyed by (chi, chibar) or by the concatenated
+        operator string as in CfunMetadata.operator, eg. 'proton_1proton_2bar'.
+    chis : list[str]
+        Sink operators, eg. ['proton_1', 'proton_2'].
+    chibars : list[str], optional
+        Source operators, by default chi + 'bar' for each chi.
+    symmetrise : bool, optional
+        Replace C by (C + C^T) / 2, by default True
+
+    Returns
+    -------
+    np.ndarray
+        Correlation matrices [ncon, NT, N, N], element [i, j] from (chis[i], chibars[j]).
+    """
+    chibars = [f"{chi}bar" for chi in chis] if chibars is None else chibars
+    if len(chibars) != len(chis):
+        raise ValueError("Require the same number of chis and chibars.")
+
+    def lookup(chi, chibar):
+        for key in ((chi, chibar), chi + chibar):
+            if key in correlators:
+                return np.asarray(correlators[key])
+        raise KeyError(f"No correlator for {chi = }, {chibar = }.")
+
+    matrices = np.stack(
+        [np.stack([lookup(chi, chibar) for chibar in chibars], axis=-1) for chi in chis],
+        axis=-2,
+    )
+    if symmetrise:
+        matrices = (matrices + np.swapaxes(matrices, -1, -2)) / 2
+    return matrices
+
+
+def solve_gevp(
+    matrices: np.ndarray, reference: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Batched solution of C v = lambda C_ref v for symmetric C and positive definite C_ref.
+
+    Parameters
+    ----------
+    matrices : np.ndarray
+        Matrices C [..., N, N].
+    reference : np.ndarray
+        Matrices C_ref broadcastable against matrices, eg. C(t0).
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Eigenvalues [..., N] in decreasing order and eigenvectors [..., N, N],
+        one per column, normalised as v^T C_ref v = 1.
+    """
+    cholesky = np.linalg.cholesky(reference)
+    inverse = np.linalg.inv(cholesky)
+    reduced = inverse @ matrices @ np.swapaxes(inverse, -1, -2)
+    # Guard against asymmetry from rounding before eigh, which reads one triangle
+    reduced = (reduced + np.swapaxes(reduced, -1, -2)) / 2
+    eigenvalues, reduced_vectors = np.linalg.eigh(reduced)
+    eigenvectors = np.swapaxes(inverse, -1, -2) @ reduced_vectors
+    return eigenvalues[..., ::-1], eigenvectors[..., ::-1]
+
+
+def match_eigenvectors(
+    eigenvectors: np.ndarray, reference_vectors: np.ndarray, metric: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Order and signs which best match eigenvectors to reference eigenvectors.
+
+    The overlap of eigenvector a with reference b is v_b^T metric v_a. For
+    bases up to max_permutation_size every ordering is scored at once and the
+    one with the largest total |overlap| kept, otherwise the order is kept.
+
+    Parameters
+    ----------
+    eigenvectors : np.ndarray
+        Eigenvectors to match [..., N, N], one per column.
+    reference_vectors : np.ndarray
+        Reference eigenvectors broadcastable against eigenvectors.
+    metric : np.ndarray
+        Metric of the overlaps, eg. C(t0), broadcastable against eigenvectors.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Column order [..., N] such that eigenvectors[..., order] matches the
+        reference, and the signs [..., N] to apply after reordering.
+    """
+    overlaps = np.swapaxes(reference_vectors, -1, -2) @ metric @ eigenvectors
+    N = overlaps.shape[-1]
+    if N <= max_permutation_size:
+        permutations = np.array(list(itertools.permutations(range(N))))
+        # Score of each permutation p is sum_b |overlap[b, p[b]]|
+        scores = np.abs(overlaps[..., np.arange(N), permutations]).sum(axis=-1)
+        order = permutations[np.argmax(scores, axis=-1)]
+    else:
+        logger.warning(f"Basis of {N} operators is too large to reorder, keeping eigenvalue order.")
+        order = np.broadcast_to(np.arange(N), overlaps.shape[:-1]).copy()
+    matched = np.take_along_axis(overlaps, order[..., None, :], axis=-1)
+    signs = np.where(np.diagonal(matched, axis1=-2, axis2=-1) < 0, -1, 1)
+    return order, signs
+
+
+class GEVP:
+    def __init__(self, matrices: np.ndarray, t0: int):
+        """
+        Generalised eigenvalue problem for every jackknife and timeslice.
+
+        Parameters
+        ----------
+        matrices : np.ndarray
+            Jackknifed correlation matrices [ncon, NT, N, N], eg. from correlation_matrix.
+        t0 : int
+            Reference timeslice.
+        """
+        self.matrices = np.asarray(matrices, dtype=float)
+        if self.matrices.ndim != 4 or self.matrices.shape[-1] != self.matrices.shape[-2]:
+            raise ValueError("matrices must have shape [ncon, NT, N, N].")
+        self.ncon, self.NT, self.N = self.matrices.shape[:3]
+        self.t0 = t0
+
+    @functools.cached_property
+    def average_matrices(self) -> np.ndarray:
+        return self.matrices.mean(axis=0)
+
+    def solve(self):
+        """
+        Solve at every timeslice except t0 for the average and every jackknife.
+
+        Sets average_eigenvalues [NT, N], average_eigenvectors [NT, N, N],
+        eigenvalues [ncon, NT, N] and eigenvectors [ncon, NT, N, N]. The
+        average is ordered by eigenvalue and each jackknife is matched to it.
+        Timeslice t0 is left as nan.
+        """
+        timeslices = np.delete(np.arange(self.NT), self.t0)
+        average_t0 = self.average_matrices[self.t0]
+        samples_t0 = self.matrices[:, self.t0, None]
+
+        self.average_eigenvalues = np.full((self.NT, self.N), np.nan)
+        self.average_eigenvectors = np.full((self.NT, self.N, self.N), np.nan)
+        self.eigenvalues = np.full((self.ncon, self.NT, self.N), np.nan)
+        self.eigenvectors = np.full((self.ncon, self.NT, self.N, self.N), np.nan)
+
+        values, vectors = solve_gevp(self.average_matrices[timeslices], average_t0)
+        self.average_eigenvalues[timeslices] = values
+        self.average_eigenvectors[timeslices] = vectors
+
+        values, vectors = solve_gevp(self.matrices[:, timeslices], samples_t0)
+        order, signs = match_eigenvectors(
+            vectors, self.average_eigenvectors[timeslices], samples_t0
+        )
+        self.eigenvalues[:, timeslices] = np.take_along_axis(values, order, axis=-1)
+        self.eigenvectors[:, timeslices] = (
+            np.take_along_axis(vectors, order[..., None, :], axis=-1) * signs[..., None, :]
+        )
+        return self
+
+    def projected_correlators(self, t: int) -> np.ndarray:
+        """
+        Correlators v_n^T C(t') v_n projected with the eigenvectors found at t.
+
+        Parameters
+        ----------
+        t : int
+            Timeslice of the eigenvectors, eg. t0 + dt.
+
+        Returns
+        -------
+        np.ndarray
+            Projected correlators [N, ncon, NT], the layout taken by
+            effective_mass so states can be analysed like kd values.
+        """
+        if t == self.t0:
+            raise ValueError("Eigenvectors are not defined at t0.")
+        if not hasattr(self, "eigenvectors"):
+            self.solve()
+        vectors = self.eigenvectors[:, t]
+        return np.einsum("cin,ctij,cjn->nct", vectors, self.matrices, vectors, optimize=True)
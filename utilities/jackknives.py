@@ -1,11 +1,30 @@
 import functools
 import os
 
+import gvar as gv
 import numpy as np
 
 # TODO: Update to allow 2nd order jackknives and also to allow multi-dim arrays
 
 
+def jackknife_uncertainties(jackknives: np.ndarray) -> np.ndarray:
+    """
+    Uncertainty of each jackknife as used for fits on a jackknife level.
+
+    Vectorised version of JackknifeEnsemble.uncertainties for arrays of any
+    shape where the last axis indexes the jackknives.
+    """
+    jackknives = np.asarray(jackknives)
+    ncon = jackknives.shape[-1]
+    total = jackknives.sum(axis=-1, keepdims=True)
+    sum_of_squares = (jackknives**2).sum(axis=-1, keepdims=True)
+
+    sum_of_squares_term = sum_of_squares - jackknives**2
+    squared_sum_term = (total - jackknives) ** 2 / (ncon - 1)
+    variances = (ncon - 2) / (ncon - 1) * (sum_of_squares_term - squared_sum_term)
+    return np.sqrt(variances)
+
+
 class JackknifeEnsemble:
     def __init__(
         self, jackknives: np.ndarray, ensemble_average=None, jackknife_error=None
@@ -176,3 +195,128 @@ class JackknifeEnsemble:
         else:
             jackknives = base.jackknives**self.jackknives
         return JackknifeEnsemble(jackknives)
+
+
+class JackknifeArray:
+    def __init__(self, jackknives: np.ndarray):
+        """
+        Array of jackknife ensembles held as a single ndarray.
+
+        The last axis indexes the jackknives, so a collection of nobs
+        observables has shape [nobs, ncon]. Derived quantities are computed
+        for every observable at once and cached, so repeated construction
+        of correlated gvars or per config uncertainties for the same data
+        costs nothing after the first call.
+
+        Indexing a one dimensional collection returns JackknifeEnsembles so a
+        JackknifeArray may be used where a list of JackknifeEnsembles is expected.
+
+        Parameters
+        ----------
+        jackknives : np.ndarray
+            Jackknives with shape [..., ncon].
+        """
+        self.jackknives = np.asarray(jackknives, dtype=float)
+        if self.jackknives.ndim < 2:
+            raise ValueError("jackknives must have at least two dimensions, use JackknifeEnsemble.")
+        self.ncon = self.jackknives.shape[-1]
+
+    @classmethod
+    def from_ensembles(cls, ensembles: list[JackknifeEnsemble]):
+        """Stack a list of JackknifeEnsembles of equal ncon."""
+        if isinstance(ensembles, cls):
+            return ensembles
+        return cls(np.stack([ensemble.jackknives for ensemble in ensembles]))
+
+    @property
+    def shape(self) -> tuple[int]:
+        """Shape of the observables, excluding the jackknife axis."""
+        return self.jackknives.shape[:-1]
+
+    @functools.cached_property
+    def ensemble_average(self) -> np.ndarray:
+        return self.jackknives.mean(axis=-1)
+
+    @functools.cached_property
+    def jackknife_error(self) -> np.ndarray:
+        return np.sqrt(
+            ((self.jackknives - self.ensemble_average[..., None]) ** 2).sum(axis=-1)
+            * self.ncon
+            / (self.ncon - 1)
+        )
+
+    @functools.cached_property
+    def uncertainties(self) -> np.ndarray:
+        """Per config uncertainties [..., ncon]. See JackknifeEnsemble.uncertainties."""
+        return jackknife_uncertainties(self.jackknives)
+
+    @functools.cached_property
+    def covariance_matrix(self) -> np.ndarray:
+        """Covariance matrix of the flattened observables."""
+        flat = self.jackknives.reshape(-1, self.ncon)
+        deviations = flat - flat.mean(axis=-1, keepdims=True)
+        return (self.ncon - 1) / self.ncon * (deviations @ deviations.T)
+
+    @functools.cached_property
+    def gvars(self) -> np.ndarray:
+        """Correlated gvars of the ensemble averages with the jackknife covariance."""
+        return gv.gvar(self.ensemble_average.ravel(), self.covariance_matrix).reshape(
+            self.shape
+        )
+
+    def to_ensembles(self) -> list[JackknifeEnsemble]:
+        return list(self)
+
+    def __len__(self):
+        return self.jackknives.shape[0]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, index):
+        jackknives = self.jackknives[index]
+        if jackknives.ndim == 1:
+            return JackknifeEnsemble(jackknives)
+        return JackknifeArray(jackknives)
+
+    def _operand(self, other):
+        """Jackknives of other broadcastable against self.jackknives."""
+        if isinstance(other, (JackknifeArray, JackknifeEnsemble)):
+            return other.jackknives
+        # Plain values are one per observable, the same for every jackknife
+        return np.asarray(other)[..., None]
+
+    def __add__(self, other):
+        return JackknifeArray(self.jackknives + self._operand(other))
+
+    def __radd__(self, other):
+        return self + other
+
+    def __sub__(self, other):
+        return JackknifeArray(self.jackknives - self._operand(other))
+
+    def __rsub__(self, other):
+        return JackknifeArray(self._operand(other) - self.jackknives)
+
+    def __mul__(self, other):
+        return JackknifeArray(self.jackknives * self._operand(other))
+
+    def __rmul__(self, other):
+        return self * other
+
+    def __truediv__(self, denom):
+        return JackknifeArray(self.jackknives / self._operand(denom))
+
+    def __rtruediv__(self, numer):
+        return JackknifeArray(self._operand(numer) / self.jackknives)
+
+    def __pow__(self, pow):
+        return JackknifeArray(self.jackknives ** self._operand(pow))
+
+    def __neg__(self):
+        return JackknifeArray(-self.jackknives)
+
+    def apply(self, fcn: callable, *args, **kwargs):
+        """Apply an elementwise function, eg. np.log, to every jackknife."""
+        return JackknifeArray(fcn(self.jackknives, *args, **kwargs))
@@ -0,0 +1,262 @@
+"""
+Array-native correlated least-squares fitting.
+
+An alternative to lsqfit for fits where speed matters more than the
+richness of gvar objects, eg. thousands of jackknife fits in a window scan.
+All quantities are plain ndarrays. Residuals are whitened with a Cholesky
+factor of the covariance matrix which is computed once per Whitener and
+reused for every iteration and every fit sharing the covariance.
+
+Fits are batched: p0 and y may carry leading batch dimensions and every
+fit in the batch is minimised simultaneously with Levenberg-Marquardt.
+"""
+from __future__ import annotations
+import functools
+import logging
+
+import gvar as gv
+import numpy as np
+from scipy.special import gammaincc
+
+from utilities import models
+
+logger = logging.getLogger(__name__)
+logging.Formatter(fmt="%(name)s(%(lineno)d)::%(levelname)-8s: %(message)s")
+
+
+class Whitener:
+    def __init__(self, covariance: np.ndarray = None, errors: np.ndarray = None):
+        """
+        Maps residuals r to L^-1 r where C = L L^T so that chi^2 = |L^-1 r|^2.
+
+        Exactly one of covariance or errors should be given. Errors correspond
+        to a diagonal covariance matrix and whitening is then a division.
+
+        Parameters
+        ----------
+        covariance : np.ndarray, optional
+            Covariance matrix [..., ny, ny]. Leading dimensions are batch dimensions.
+        errors : np.ndarray, optional
+            Uncertainties [..., ny] for uncorrelated data.
+        """
+        if (covariance is None) == (errors is None):
+            raise ValueError("Exactly one of covariance or errors must be specified.")
+        if covariance is not None:
+            self.cholesky = np.linalg.cholesky(np.asarray(covariance, dtype=float))
+            self.errors = None
+        else:
+            self.cholesky = None
+            self.errors = np.asarray(errors, dtype=float)
+
+    @property
+    def ny(self) -> int:
+        if self.cholesky is not None:
+            return self.cholesky.shape[-1]
+        return self.errors.shape[-1]
+
+    @functools.cached_property
+    def inverse_cholesky(self) -> np.ndarray:
+        return np.linalg.inv(self.cholesky)
+
+    def whiten(self, residuals: np.ndarray) -> np.ndarray:
+        """Whiten residuals [..., ny]."""
+        if self.errors is not None:
+            return residuals / self.errors
+        return np.einsum("...ij,...j->...i", self.inverse_cholesky, residuals)
+
+    def whiten_jacobian(self, jacobian: np.ndarray) -> np.ndarray:
+        """Whiten a Jacobian [..., ny, nparams]."""
+        if self.errors is not None:
+            return jacobian / self.errors[..., None]
+        return np.einsum("...ij,...jk->...ik", self.inverse_cholesky, jacobian)
+
+
+class BlockWhitener:
+    def __init__(self, whiteners: list[Whitener]):
+        """
+        Whitener for a block diagonal covariance matrix.
+
+        Each block is whitened with its own Cholesky factor so the cost scales
+        with the sum of the cubes of the block sizes rather than the cube of
+        the total size. Residuals are ordered block by block.
+        """
+        self.whiteners = whiteners
+        self.sizes = [whitener.ny for whitener in whiteners]
+        self.splits = np.cumsum(self.sizes)[:-1]
+
+    @property
+    def ny(self) -> int:
+        return sum(self.sizes)
+
+    def whiten(self, residuals: np.ndarray) -> np.ndarray:
+        return np.concatenate(
+            [
+                whitener.whiten(block)
+                for whitener, block in zip(
+                    self.whiteners, np.split(residuals, self.splits, axis=-1)
+                )
+            ],
+            axis=-1,
+        )
+
+    def whiten_jacobian(self, jacobian: np.ndarray) -> np.ndarray:
+        return np.concatenate(
+            [
+                whitener.whiten_jacobian(block)
+                for whitener, block in zip(
+                    self.whiteners, np.split(jacobian, self.splits, axis=-2)
+                )
+            ],
+            axis=-2,
+        )
+
+
+class LeastSquaresResult:
+    def __init__(
+        self,
+        pmean: np.ndarray,
+        cov: np.ndarray,
+        chi2: np.ndarray,
+        dof: int,
+        converged: np.ndarray,
+        nit: int,
+    ):
+        """
+        Summary of an array-native fit, mirroring the commonly used attributes
+        of lsqfit.nonlinear_fit. For batched fits every attribute carries the
+        batch dimensions.
+        """
+        self.pmean = pmean
+        self.cov = cov
+        self.chi2 = chi2
+        self.dof = dof
+        self.converged = converged
+        self.nit = nit
+
+    @property
+    def psdev(self) -> np.ndarray:
+        return np.sqrt(np.diagonal(self.cov, axis1=-2, axis2=-1))
+
+    @property
+    def Q(self) -> np.ndarray:
+        """p-value of the fit's chi^2."""
+        return gammaincc(self.dof / 2, self.chi2 / 2)
+
+    @functools.cached_property
+    def p(self) -> np.ndarray:
+        """Best fit parameters as correlated gvars. Unbatched fits only."""
+        if self.pmean.ndim != 1:
+            raise ValueError("p is only available for unbatched fits, use pmean and cov.")
+        return gv.gvar(self.pmean, self.cov)
+
+    def __repr__(self):
+        return f"LeastSquaresResult(pmean={self.pmean}, chi2={self.chi2}, dof={self.dof})"
+
+
+def _solve(matrix: np.ndarray, vector: np.ndarray) -> np.ndarray:
+    return np.linalg.solve(matrix, vector[..., None])[..., 0]
+
+
+def levenberg_marquardt(
+    model: models.Model,
+    x: np.ndarray,
+    y: np.ndarray,
+    whitener: Whitener | BlockWhitener,
+    p0: np.ndarray,
+    maxiter: int = 100,
+    tol: float = 1e-10,
+    lam: float = 1e-3,
+) -> LeastSquaresResult:
+    """
+    Minimise the correlated chi^2 of every fit in the batch with Levenberg-Marquardt.
+
+    Parameters
+    ----------
+    model : models.Model
+        Model providing evaluate and jacobian.
+    x : np.ndarray
+        Fit variable [ny].
+    y : np.ndarray
+        Data [..., ny]. Leading dimensions are batch dimensions.
+    whitener : Whitener | BlockWhitener
+        Whitener holding the (possibly batched) covariance of y.
+    p0 : np.ndarray
+        Starting parameters [nparams] or [..., nparams].
+    maxiter : int, optional
+        Maximum number of iterations, by default 100
+    tol : float, optional
+        Relative chi^2 change at which a fit is considered converged, by default 1e-10
+    lam : float, optional
+        Initial damping parameter, by default 1e-3
+
+    Returns
+    -------
+    LeastSquaresResult
+        Parameter means, covariance and chi^2 for every fit in the batch.
+    """
+    y = np.asarray(y, dtype=float)
+    batch_shape = np.broadcast_shapes(y.shape[:-1], np.shape(p0)[:-1])
+    p = np.broadcast_to(np.asarray(p0, dtype=float), batch_shape + (model.nparams,)).copy()
+    lam = np.full(batch_shape, lam)
+    converged = np.zeros(batch_shape, dtype=bool)
+
+    def whitened_residuals(p):
+        return whitener.whiten(y - model.evaluate(x, p))
+
+    residuals = whitened_residuals(p)
+    chi2 = (residuals**2).sum(axis=-1)
+    for nit in range(1, maxiter + 1):
+        jacobian = whitener.whiten_jacobian(model.jacobian(x, p))
+        alpha = np.einsum("...ki,...kj->...ij", jacobian, jacobian)
+        beta = np.einsum("...ki,...k->...i", jacobian, residuals)
+        damping = lam[..., None] * np.diagonal(alpha, axis1=-2, axis2=-1)
+        step = _solve(alpha + damping[..., None] * np.eye(model.nparams), beta)
+
+        trial_p = p + step
+        trial_residuals = whitened_residuals(trial_p)
+        trial_chi2 = (trial_residuals**2).sum(axis=-1)
+
+        accept = (trial_chi2 <= chi2) & ~converged
+        newly_converged = accept & (chi2 - trial_chi2 <= tol * (1 + trial_chi2))
+        p = np.where(accept[..., None], trial_p, p)
+        residuals = np.where(accept[..., None], trial_residuals, residuals)
+        chi2 = np.where(accept, trial_chi2, chi2)
+        lam = np.where(accept, lam / 10, lam * 10)
+        converged |= newly_converged
+        if converged.all():
+            break
+    else:
+        logger.warning(
+            f"{np.count_nonzero(~converged)} fits did not converge in {maxiter} iterations."
+        )
+
+    jacobian = whitener.whiten_jacobian(model.jacobian(x, p))
+    alpha = np.einsum("...ki,...kj->...ij", jacobian, jacobian)
+    return LeastSquaresResult(
+        pmean=p,
+        cov=np.linalg.inv(alpha),
+        chi2=chi2,
+        dof=whitener.ny - model.nparams,
+        converged=converged,
+        nit=nit,
+    )
+
+
+def fit(
+    fcn: callable | models.Model,
+    x: np.ndarray,
+    y: np.ndarray,
+    p0: np.ndarray,
+    covariance: np.ndarray = None,
+    errors: np.ndarray = None,
+    nparams: int = None,
+    **kwargs,
+) -> LeastSquaresResult:
+    """
+    Convenience wrapper around levenberg_marquardt. Plain callables are wrapped
+    in a models.CallableModel with a finite difference Jacobian. kwargs are
+    passed to levenberg_marquardt.
+    """
+    model = models.as_model(fcn, nparams=np.shape(p0)[-1] if nparams is None else nparams)
+    whitener = Whitener(covariance=covariance, errors=errors)
+    return levenberg_marquardt(model, np.asarray(x), y, whitener, p0, **kwargs)
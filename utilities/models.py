@@ -0,0 +1,274 @@
+"""
+Module of analytic fit models for correlator and polarisability fits.
+
+Each model is vectorised over the fit variable x and over batches of
+parameters. Parameters are always held in the last axis, so p may have
+shape [nparams] or [..., nparams] and the model evaluates to shape
+[..., nx]. Every model also supplies its analytic Jacobian with shape
+[..., nx, nparams].
+
+Model instances are callable with the fcn(x, p) signature expected by
+lsqfit and Fit_1d. When p is an array of gvar variables, the value is
+evaluated at the parameter means and the resulting gvars are built
+directly from the analytic Jacobian with gv.gvar_function. This avoids
+lsqfit differentiating the model with gvar automatic differentiation
+on every iteration.
+"""
+from __future__ import annotations
+
+import gvar as gv
+import numpy as np
+
+
+class Model:
+    """Base class for fit models with analytic Jacobians."""
+
+    nparams: int = None
+    param_names: tuple[str] = ()
+
+    def evaluate(self, x: np.ndarray, p: np.ndarray) -> np.ndarray:
+        """Evaluate the model. p has shape [..., nparams], returns [..., nx]."""
+        raise NotImplementedError
+
+    def jacobian(self, x: np.ndarray, p: np.ndarray) -> np.ndarray:
+        """Derivatives of the model with respect to the parameters, [..., nx, nparams]."""
+        raise NotImplementedError
+
+    def __call__(self, x, p):
+        x = np.asarray(x)
+        p = np.asarray(p)
+        if p.dtype != object:
+            return self.evaluate(x, p)
+
+        p_mean = gv.mean(p)
+        values = self.evaluate(x, p_mean)
+        derivatives = self.jacobian(x, p_mean)
+        return np.array(
+            [
+                gv.gvar_function(p, value, derivative)
+                for value, derivative in zip(values, derivatives)
+            ]
+        )
+
+    def _check_params(self, p: np.ndarray):
+        if p.shape[-1] != self.nparams:
+            raise ValueError(
+                f"{type(self).__name__} expects {self.nparams} parameters, got {p.shape[-1]}."
+            )
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(self.param_names)})"
+
+
+class Constant(Model):
+    """Constant plateau, f(x) = c."""
+
+    nparams = 1
+    param_names = ("c",)
+
+    def evaluate(self, x, p):
+        p = np.asarray(p, dtype=float)
+        self._check_params(p)
+        return p[..., :1] * np.ones_like(x, dtype=float)
+
+    def jacobian(self, x, p):
+        p = np.asarray(p, dtype=float)
+        self._check_params(p)
+        return np.ones(p.shape[:-1] + np.shape(x) + (1,))
+
+
+class Quadratic(Model):
+    """Polarisability quadratic, f(x) = a0 x^2."""
+
+    nparams = 1
+    param_names = ("a0",)
+
+    def evaluate(self, x, p):
+        p = np.asarray(p, dtype=float)
+        self._check_params(p)
+        return p[..., :1] * x**2
+
+    def jacobian(self, x, p):
+        p = np.asarray(p, dtype=float)
+        self._check_params(p)
+        return np.broadcast_to(
+            (x**2)[..., None], p.shape[:-1] + np.shape(x) + (1,)
+        ).astype(float)
+
+
+class MultiExponential(Model):
+    """
+    Sum of decaying exponentials, f(x) = sum_i A_i exp(-E_i x).
+
+    Parameters are ordered (A_0, E_0, A_1, E_1, ...).
+    """
+
+    def __init__(self, nstates: int = 1):
+        if nstates < 1:
+            raise ValueError("nstates must be at least 1.")
+        self.nstates = nstates
+        self.nparams = 2 * nstates
+        self.param_names = tuple(
+            name for i in range(nstates) for name in (f"A_{i}", f"E_{i}")
+        )
+
+    def _terms(self, x, p):
+        """Amplitudes, energies and exp(-E x) with shape [..., nstates, nx]."""
+        p = np.asarray(p, dtype=float)
+        self._check_params(p)
+        amplitudes = p[..., 0::2, None]
+        energies = p[..., 1::2, None]
+        return amplitudes, energies, np.exp(-energies * x)
+
+    def evaluate(self, x, p):
+        amplitudes, _, exponentials = self._terms(x, p)
+        return (amplitudes * exponentials).sum(axis=-2)
+
+    def jacobian(self, x, p):
+        amplitudes, _, exponentials = self._terms(x, p)
+        jacobian = np.empty(exponentials.shape[:-2] + np.shape(x) + (self.nparams,))
+        jacobian[..., 0::2] = np.swapaxes(exponentials, -1, -2)
+        jacobian[..., 1::2] = np.swapaxes(-x * amplitudes * exponentials, -1, -2)
+        return jacobian
+
+
+class Exponential(MultiExponential):
+    """Single exponential, f(x) = A exp(-E x)."""
+
+    def __init__(self):
+        super().__init__(nstates=1)
+        self.param_names = ("A", "E")
+
+
+class Cosh(Model):
+    """
+    Periodic correlator, f(x) = A (exp(-E x) + exp(-E (NT - x))).
+
+    Parameters
+    ----------
+    NT : int
+        Temporal extent of the lattice, by default 64.
+    """
+
+    nparams = 2
+    param_names = ("A", "E")
+
+    def __init__(self, NT: int = 64):
+        self.NT = NT
+
+    def _terms(self, x, p):
+        p = np.asarray(p, dtype=float)
+        self._check_params(p)
+        amplitude = p[..., :1]
+        energy = p[..., 1:2]
+        forward = np.exp(-energy * x)
+        backward = np.exp(-energy * (self.NT - x))
+        return amplitude, forward, backward
+
+    def evaluate(self, x, p):
+        amplitude, forward, backward = self._terms(x, p)
+        return amplitude * (forward + backward)
+
+    def jacobian(self, x, p):
+        amplitude, forward, backward = self._terms(x, p)
+        return np.stack(
+            [
+                forward + backward,
+                -amplitude * (x * forward + (self.NT - x) * backward),
+            ],
+            axis=-1,
+        )
+
+
+class CallableModel(Model):
+    """
+    Wraps an arbitrary fcn(x, p) so it may be used where a Model is expected.
+
+    fcn only needs to accept a single parameter vector. Batches are evaluated
+    in a loop and the Jacobian is obtained by central finite differences, so
+    prefer one of the analytic models where possible.
+    """
+
+    def __init__(self, fcn: callable, nparams: int, step: float = 1e-7):
+        self.fcn = fcn
+        self.nparams = nparams
+        self.step = step
+        self.param_names = tuple(f"p_{i}" for i in range(nparams))
+
+    def evaluate(self, x, p):
+        p = np.asarray(p, dtype=float)
+        self._check_params(p)
+        flat_p = p.reshape(-1, self.nparams)
+        values = np.array([np.asarray(self.fcn(x, p_i), dtype=float) for p_i in flat_p])
+        return values.reshape(p.shape[:-1] + values.shape[1:])
+
+    def jacobian(self, x, p):
+        p = np.asarray(p, dtype=float)
+        steps = self.step * np.maximum(np.abs(p), 1)
+        columns = []
+        for i in range(self.nparams):
+            dp = np.zeros_like(p)
+            dp[..., i] = steps[..., i]
+            columns.append(
+                (self.evaluate(x, p + dp) - self.evaluate(x, p - dp))
+                / (2 * steps[..., i, None])
+            )
+        return np.stack(columns, axis=-1)
+
+    def __call__(self, x, p):
+        return self.fcn(x, p)
+
+
+class ConcatenatedModel(Model):
+    """
+    Several models sharing one parameter vector, evaluated on concatenated x.
+
+    Used for global fits where each dataset has its own model of the same
+    parameters. x is split according to sizes and the outputs and Jacobians
+    of the individual models are concatenated in the same order.
+    """
+
+    def __init__(self, models: list[Model], sizes: list[int]):
+        if len(models) != len(sizes):
+            raise ValueError("Length mismatch between models and sizes.")
+        nparams = {model.nparams for model in models}
+        if len(nparams) != 1:
+            raise ValueError("All models must share the same parameters.")
+        self.models = models
+        self.sizes = sizes
+        self.splits = np.cumsum(sizes)[:-1]
+        self.nparams = nparams.pop()
+        self.param_names = models[0].param_names
+
+    def evaluate(self, x, p):
+        return np.concatenate(
+            [
+                model.evaluate(x_i, p)
+                for model, x_i in zip(self.models, np.split(x, self.splits))
+            ],
+            axis=-1,
+        )
+
+    def jacobian(self, x, p):
+        return np.concatenate(
+            [
+                model.jacobian(x_i, p)
+                for model, x_i in zip(self.models, np.split(x, self.splits))
+            ],
+            axis=-2,
+        )
+
+
+def as_model(fcn: callable | Model, nparams: int = None) -> Model:
+    """Return fcn if it is already a Model, otherwise wrap it in a CallableModel."""
+    if isinstance(fcn, Model):
+        return fcn
+    if nparams is None:
+        raise ValueError("nparams is required to wrap a plain callable.")
+    return CallableModel(fcn, nparams)
+
+
+# Shared instances for models without configuration
+constant = Constant()
+quadratic = Quadratic()
+exponential = Exponential()
@@ -10,6 +10,11 @@ QuarkCharge, HadronicCharge
 
 """
 from __future__ import annotations
+import functools
+import itertools
+
+import numpy as np
+
 from utilities import structure
 
 Structure = structure.Structure
@@ -354,20 +359,24 @@ quark_charge = {
 }
 
 
+# Flavours of the quark slots of a Structure, in order
+flavours = ("u", "d", "s")
+
+
 def get_particle_charge(particle: str | Particle, structure: Structure = None):
     if structure is None:
         structure = Structure("uds")
 
-    if isinstance(particle, Particle):
-        composition = particle.composition
-    elif isinstance(particle, str):
-        composition = globals()[particle].composition
-    else:
+    if not isinstance(particle, (str, Particle)):
         raise TypeError("particle must be str or Particle object.")
+    if particle in particle_registry:
+        return particle_registry.charge(particle, structure)
+    if isinstance(particle, str):
+        raise KeyError(f"Unknown particle {particle!r}.")
 
-    struct_dict = structure.as_dict()
+    struct_dict = Structure(structure).as_dict()
     charge = 0
-    for quark in composition:
+    for quark in particle.composition:
         if quark[0] == "A":
             sign = -1
             quark = quark[1:]
@@ -377,6 +386,171 @@ def get_particle_charge(particle: str | Particle, structure: Structure = None):
     return charge
 
 
+class ParticleRegistry:
+    def __init__(self, particles: dict[str, Particle]):
+        """
+        Index of named particles with dense composition and charge tables.
+
+        Every particle is given a row and every valid Structure, ie. every
+        combination of three quarks in quark_charge, a column. The signed quark
+        content of each (particle, structure) pair and hence its charge are
+        computed once for all pairs, so batched code can look up charges of
+        many pairs with a single fancy indexing operation.
+
+        Parameters
+        ----------
+        particles : dict[str, Particle]
+            Particles keyed by name.
+        """
+        self.particles = particles
+        self.names = tuple(particles)
+        self._name_index = {name: i for i, name in enumerate(self.names)}
+        self._id_index = {id(particle): i for i, particle in enumerate(particles.values())}
+
+        self.quarks = tuple(quark_charge)
+        self.structures = tuple(
+            Structure(combination) for combination in itertools.product(self.quarks, repeat=3)
+        )
+        self._structure_index = {str(s): j for j, s in enumerate(self.structures)}
+
+    def __contains__(self, particle: str | Particle) -> bool:
+        if isinstance(particle, str):
+            return particle in self._name_index
+        return id(particle) in self._id_index
+
+    def __len__(self):
+        return len(self.names)
+
+    def index(self, particle: str | Particle) -> int:
+        """Row of a particle, given by name or as one of the registered objects."""
+        try:
+            if isinstance(particle, str):
+                return self._name_index[particle]
+            return self._id_index[id(particle)]
+        except KeyError:
+            raise KeyError(f"{particle = } is not a registered particle.")
+
+    def structure_index(self, structure: str | Structure) -> int:
+        """Column of a structure."""
+        key = structure if isinstance(structure, str) else str(structure)
+        try:
+            return self._structure_index[key]
+        except KeyError:
+            # Structure strings may be given in a different form, eg. as a list
+            return self._structure_index[str(Structure(structure))]
+
+    @functools.cached_property
+    def flavour_counts(self) -> np.ndarray:
+        """Signed count of each flavour slot in each particle [nparticles, 3]. Antiquarks count -1."""
+        counts = np.zeros((len(self), len(flavours)), dtype=int)
+        for i, particle in enumerate(self.particles.values()):
+            for quark in particle.composition:
+                sign = -1 if quark[0] == "A" else 1
+                counts[i, flavours.index(quark.lstrip("A"))] += sign
+        return counts
+
+    @functools.cached_property
+    def quark_content(self) -> np.ndarray:
+        """Signed count of each quark in quarks for every pair [nparticles, nstructures, nquarks]."""
+        slots = np.zeros((len(self.structures), len(flavours), len(self.quarks)), dtype=int)
+        quark_index = {quark: k for k, quark in enumerate(self.quarks)}
+        for j, s in enumerate(self.structures):
+            for f, quark in enumerate(s):
+                slots[j, f, quark_index[quark]] = 1
+        return np.einsum("pf,sfq->psq", self.flavour_counts, slots)
+
+    @functools.cached_property
+    def charges(self) -> np.ndarray:
+        """Charge of every pair [nparticles, nstructures]."""
+        # Sum charges in units of e/3 so that results are exact multiples of 1/3
+        thirds = np.rint(3 * np.array([quark_charge[q] for q in self.quarks])).astype(int)
+        return (self.quark_content @ thirds) / 3
+
+    def charge(self, particle: str | Particle, structure: str | Structure) -> float:
+        return float(self.charges[self.index(particle), self.structure_index(structure)])
+
+    def lookup(
+        self, particles: list[str | Particle], structures: list[str | Structure]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Row and column indices of pairs of particles and structures."""
+        return (
+            np.array([self.index(particle) for particle in particles], dtype=int),
+            np.array([self.structure_index(s) for s in structures], dtype=int),
+        )
+
+    def charges_of(
+        self, particles: list[str | Particle], structures: list[str | Structure]
+    ) -> np.ndarray:
+        """Charges of many (particle, structure) pairs in one indexing operation."""
+        return self.charges[self.lookup(particles, structures)]
+
+
+# Particles which when combined in any source/sink operator combination produce 0
+# with isospin symmetry should be placed here. Each inner list will test all
+# permutations of that list. Separate inner lists will not be compared.
+# ie. [[a,b,c],[d,e]] would check all permutations of ab,ac,ba... and de...
+# but not ad,ae... Assumes aa would not vanish.
+vanishing_particles = [["lambda0", "sigma0"]]
+
+vanishing_pairs = frozenset(
+    (p1, p2)
+    for particle_set in vanishing_particles
+    for p1 in particle_set
+    for p2 in particle_set
+    if p1 != p2
+)
+
+
+@functools.lru_cache(maxsize=None)
+def canonical_particle(name: str) -> str:
+    """Particle name without interpolator number or bar, eg. lambda0_1bar -> lambda0."""
+    return name.removesuffix("bar").split("_")[0]
+
+
+def is_vanishing(chi: str, chibar: str) -> bool:
+    """Whether the chi, chibar combination vanishes under isospin symmetry."""
+    return (canonical_particle(chi), canonical_particle(chibar)) in vanishing_pairs
+
+
+def interpolator_basis(particle: str) -> list[str]:
+    """Every registered interpolating field of a particle, eg. proton -> [proton_1, proton_2]."""
+    particle = canonical_particle(particle)
+    return [
+        name
+        for name in particle_registry.names
+        if not name.endswith("bar") and canonical_particle(name) == particle
+    ]
+
+
+def operator_combinations(
+    detailSet: dict, isospin_sym: bool = True, chi_key: str = "chi", chibar_key: str = "chibar"
+):
+    """
+    Lazily generate the combinations of misc.GetCombinations, skipping vanishing operators.
+
+    Combinations are yielded in the same order as misc.GetCombinations. The
+    vanishing chi, chibar pairs of detailSet are found once, so each
+    combination is then filtered with a single set lookup.
+
+    Arguments:
+    detailSet   -- dict: Dictionary whose values are lists. Must hold chi_key and chibar_key.
+    isospin_sym -- bool: Whether isospin symmetry is true. If False nothing is removed.
+
+    Yields:
+    combination -- dict: All keys of detailSet with singular values.
+    """
+    vanishing = {
+        (chi, chibar)
+        for chi, chibar in itertools.product(detailSet[chi_key], detailSet[chibar_key])
+        if isospin_sym and is_vanishing(chi, chibar)
+    }
+    keys = list(detailSet)
+    for values in itertools.product(*detailSet.values()):
+        combination = dict(zip(keys, values))
+        if (combination[chi_key], combination[chibar_key]) not in vanishing:
+            yield combination
+
+
 def CheckForVanishingFields(
     isospin_sym, particleList=None, chi=None, chibar=None, *args, **kwargs
 ):
@@ -404,34 +578,11 @@ def CheckForVanishingFields(
 
         particleList = [[chi, chibar]]
 
-    # Particles which when combined in any source/sink operator combination produce 0
-    # with isospin symmetry should be placed here. Each inner list will test all
-    # permutations of that list. Separate inner lists will not be compared.
-    # ie. [[a,b,c],[d,e]] would check all permutations of ab,ac,ba... and de...
-    # but not ad,ae...
-    badParticles = [["lambda0", "sigma0"]]
-
-    badCombinations = []
-    # Getting the combinations which vanish. Assumes aa would not vanish
-    for particleSet in badParticles:
-        badCombinations.append(
-            [[p1, p2] for p1 in particleSet for p2 in particleSet if p1 != p2]
-        )
-    # Un-nests the list so that we can just use 1 loop
-    badCombinations = [comb for sublist in badCombinations for comb in sublist]
-
-    # Looping through particles and bad combinations
-    badList = []
-    for chi, chibar in particleList:
-        for pair in badCombinations:
-            # Checking if the particles match
-            if pair[0] in chi and pair[1] in chibar:
-                badList.append([chi, chibar])
-
     # Don't want to modify the original list
-    updatedList = particleList.copy()
-    # Removing vanishing combinations
-    for chi, chibar in badList:
-        updatedList.remove([chi, chibar])
+    return [pair for pair in particleList if not is_vanishing(*pair)]
 
-    return updatedList
+
+# Every particle defined in this module
+particle_registry = ParticleRegistry(
+    {name: value for name, value in globals().items() if isinstance(value, Particle)}
+)
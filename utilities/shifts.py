@@ -1,56 +1,114 @@
+from __future__ import annotations
+import functools
+import os
 import re
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from utilities import configIDs as cfg
 
 shift_regex = re.compile(r"([xyzt]\d{2})")
 
+# Each coordinate is packed into 8 bits of a single int
+_bits_per_coord = 8
+_coord_mask = (1 << _bits_per_coord) - 1
+
+# Live Shifts keyed by their packed value and string so that shifts built from
+# the same string or coordinates are the same object
+_shift_cache = weakref.WeakValueDictionary()
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_shift_str(shift_str: str) -> tuple[int, int, int, int]:
+    """Coordinates (x, y, z, t) of a shift string, missing directions are zero."""
+    coords = dict.fromkeys(Shift.coords, 0)
+    for group in re.findall(shift_regex, shift_str):
+        coords[group[0]] = int(group[1:])
+    return tuple(coords.values())
+
 
 class Shift:
     coords = ("x", "y", "z", "t")
+    # Shifts are immutable and interned, see Shift.__new__
+    __slots__ = ("x", "y", "z", "t", "shift_str", "_packed", "__weakref__")
 
-    def __init__(
-        self,
+    def __new__(
+        cls,
         shift_str: str = None,
         x: int = None,
         y: int = None,
         z: int = None,
         t: int = None,
     ):
-        if not any((shift_str, x, y, z, t)):
+        xyzt = (x, y, z, t)
+        if shift_str is None and all(val is None for val in xyzt):
             raise ValueError("One of shift_str, x, y, z, t must be non-None")
 
         if shift_str is None:
-            self._init_from_xyzt(x, y, z, t)
-        elif any((x, y, z, t)):
-            self._init_from_str(shift_str)
-            if (self.x, self.y, self.z, self.t) != (x, y, z, t):
-                raise ValueError(f"{shift_str=} and {(x,y,z,t)=} do not agree.")
+            values = tuple(0 if val is None else int(val) for val in xyzt)
+            # Only the directions given appear in the string, eg. 't05' for t=5
+            shift_str = cls.format_shift(*xyzt)
         else:
-            self._init_from_str(shift_str)
+            values = _parse_shift_str(shift_str)
+            if any(val is not None for val in xyzt) and values != tuple(
+                0 if val is None else int(val) for val in xyzt
+            ):
+                raise ValueError(f"{shift_str=} and {(x,y,z,t)=} do not agree.")
+        return cls._get(values, shift_str)
+
+    @classmethod
+    def _get(cls, values: tuple[int, int, int, int], shift_str: str = None) -> Shift:
+        """
+        The interned Shift of values. shift_str is kept as given, by default
+        every direction is formatted, eg. 'x00y00z00t05'.
+        """
+        packed = cls.pack_values(values)
+        if shift_str is None:
+            shift_str = cls.format_shift(*values)
+        key = (packed, shift_str)
+        self = _shift_cache.get(key)
+        if self is None:
+            self = super().__new__(cls)
+            for name, value in zip(cls.coords, values):
+                object.__setattr__(self, name, value)
+            object.__setattr__(self, "shift_str", shift_str)
+            object.__setattr__(self, "_packed", packed)
+            self = _shift_cache.setdefault(key, self)
+        return self
 
-    def _init_from_str(self, shift_str: str):
-        """Initialise from specified shift string"""
-        groups = re.findall(shift_regex, shift_str)
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Shift is immutable, cannot set {name}.")
 
-        for group in groups:
-            setattr(self, group[0], int(group[1:]))
-        self.shift_str = shift_str
-        self._check_missing()
+    def __delattr__(self, name):
+        raise AttributeError(f"Shift is immutable, cannot delete {name}.")
 
-    def _init_from_xyzt(
-        self, x: int = None, y: int = None, z: int = None, t: int = None
-    ):
-        """Initialise from specified coordinates"""
-        if not any(x, y, z, t):
-            raise ValueError(f"One of x,y,z,t must be non-None.")
-        for coord, val in zip(self.coords, (x, y, z, t)):
-            if val is not None:
-                setattr(self, coord, int(val))
-        self._check_missing()
+    @staticmethod
+    def pack_values(values: tuple[int, int, int, int]) -> int:
+        """Pack coordinates (x, y, z, t), each 0 <= coord < 256, into a single int."""
+        packed = 0
+        for i, val in enumerate(values):
+            if not 0 <= val <= _coord_mask:
+                raise ValueError(f"Shift coordinates must be between 0 and {_coord_mask}.")
+            packed |= val << (_bits_per_coord * i)
+        return packed
 
-    def _check_missing(self):
-        """Set any missing shift directions to zero."""
-        for coord in self.coords:
-            if not hasattr(self, coord):
-                setattr(self, coord, 0)
+    @staticmethod
+    def unpack_values(packed: int) -> tuple[int, int, int, int]:
+        return tuple(
+            (packed >> (_bits_per_coord * i)) & _coord_mask for i in range(len(Shift.coords))
+        )
+
+    @classmethod
+    def from_int(cls, packed: int) -> Shift:
+        """Inverse of int(shift), with every direction in its shift_str."""
+        if not 0 <= packed < 1 << (_bits_per_coord * len(cls.coords)):
+            raise ValueError(f"{packed = } is not a packed shift.")
+        return cls._get(cls.unpack_values(packed))
+
+    def __int__(self):
+        return self._packed
 
     # Allows iteration through shift and casting to tuple
     def __iter__(self):
@@ -58,14 +116,19 @@ class Shift:
             yield val
 
     def __hash__(self):
-        return hash(tuple(self))
+        return hash(self._packed)
 
     def __eq__(self, other):
+        if isinstance(other, Shift):
+            return self._packed == other._packed
         return tuple(self) == tuple(other)
 
     def __neq__(self, other):
         return not (self == other)
 
+    def __reduce__(self):
+        return (Shift, (self.shift_str,))
+
     def __str__(self):
         return self.shift_str
 
@@ -80,15 +143,16 @@ class Shift:
     def values(self):
         return tuple(self)
 
-    @property
+    @staticmethod
     def format_shift(x: int = None, y: int = None, z: int = None, t: int = None) -> str:
         string = ""
-        for coord, val in zip(Shift.coords, (x,y,z,t)):
+        for coord, val in zip(Shift.coords, (x, y, z, t)):
             if val is not None:
                 string += f"{coord}{val:02}"
         if string == "":
             return "t00"
-        
+        return string
+
     def format_for_cola(self, shift_type: str):
         if shift_type == "full":
             return f"{self.x} {self.y} {self.z} {self.t}"
@@ -97,4 +161,152 @@ class Shift:
         elif shift_type == "lpsink":
             return f"0 0 0 {self.t}"
         else:
-            raise ValueError("shift_type must be 'full', 'emode', or 'lpsink'")
\ No newline at end of file
+            raise ValueError("shift_type must be 'full', 'emode', or 'lpsink'")
+
+
+# Columns of each direction which are kept for each COLA shift type
+_cola_masks = {
+    "full": np.array([1, 1, 1, 1]),
+    "emode": np.array([1, 1, 1, 0]),
+    "lpsink": np.array([0, 0, 0, 1]),
+}
+
+
+class ShiftArray:
+    def __init__(self, values: np.ndarray):
+        """
+        Many shifts held as a single [N, 4] int array of (x, y, z, t).
+
+        Vectorised counterpart of Shift for parsing, generating and
+        formatting the gauge shifts of thousands of configurations at once.
+        Indexing with an int returns the corresponding interned Shift. Only
+        coordinates are held, so its shift_str has every direction, eg.
+        'x00y00z00t05', whatever string the shift was parsed from.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Shift coordinates [N, 4].
+        """
+        self.values = np.asarray(values, dtype=int).reshape(-1, len(Shift.coords))
+        if np.any((self.values < 0) | (self.values > _coord_mask)):
+            raise ValueError(f"Shift coordinates must be between 0 and {_coord_mask}.")
+
+    @classmethod
+    def from_strings(cls, shift_strs: list[str]) -> ShiftArray:
+        """
+        Vectorised parse of shift strings such as 'x23y08z26t00'.
+
+        Parsed with shift_regex exactly as Shift is, so strings may be embedded
+        in paths or prefixed, eg. 'BFx3y1/shx23y08z26t00', the last match of
+        each direction is kept and missing directions are zero.
+        """
+        shift_strs = pd.Series(list(shift_strs), dtype=object)
+        matches = shift_strs.str.extractall(shift_regex)[0]
+        matches = pd.DataFrame(
+            {
+                "row": matches.index.get_level_values(0),
+                "coord": matches.str[0].map({c: i for i, c in enumerate(Shift.coords)}),
+                "value": matches.str[1:].astype(int),
+            }
+        ).drop_duplicates(["row", "coord"], keep="last")
+
+        values = np.zeros((len(shift_strs), len(Shift.coords)), dtype=int)
+        values[matches["row"].to_numpy(dtype=int), matches["coord"].to_numpy(dtype=int)] = matches[
+            "value"
+        ].to_numpy()
+        return cls(values)
+
+    @classmethod
+    def from_shifts(cls, shift_list: list[Shift]) -> ShiftArray:
+        return cls([tuple(shift) for shift in shift_list])
+
+    @classmethod
+    def from_packed(cls, packed: np.ndarray) -> ShiftArray:
+        """Inverse of ShiftArray.packed."""
+        shifts = _bits_per_coord * np.arange(len(Shift.coords))
+        return cls((np.asarray(packed, dtype=np.int64)[:, None] >> shifts) & _coord_mask)
+
+    @classmethod
+    def random(
+        cls, n: int, NS: int = 32, NT: int = 64, seed: int = None, unique: bool = True
+    ) -> ShiftArray:
+        """
+        Random shifts within the lattice bounds, 0 <= x, y, z < NS and 0 <= t < NT.
+
+        The same seed always gives the same shifts. With unique=True the n
+        shifts are distinct.
+        """
+        if unique and n > NS**3 * NT:
+            raise ValueError(f"Cannot generate {n} unique shifts on a {NS}^3 x {NT} lattice.")
+        rng = np.random.default_rng(seed)
+        upper = np.array([NS, NS, NS, NT])
+        shifts = cls(rng.integers(0, upper, size=(n, len(upper))))
+        while unique and len(shifts := shifts.unique()) < n:
+            extra = rng.integers(0, upper, size=(n - len(shifts), len(upper)))
+            shifts = cls(np.concatenate([shifts.values, extra]))
+        return shifts
+
+    @classmethod
+    def random_for_ensemble(cls, n: int, ensemble, seed: int = None, **kwargs) -> ShiftArray:
+        """Random shifts within the bounds of a PACSEnsemble, or its kappa."""
+        if isinstance(ensemble, int):
+            ensemble = cfg.PACS_ensembles[ensemble]
+        return cls.random(n, NS=ensemble.NS, NT=ensemble.NT, seed=seed, **kwargs)
+
+    def packed(self) -> np.ndarray:
+        """Every shift packed into an int as in int(Shift)."""
+        shifts = _bits_per_coord * np.arange(len(Shift.coords))
+        return (self.values.astype(np.int64) << shifts).sum(axis=1)
+
+    def unique(self) -> ShiftArray:
+        """Distinct shifts, in order of first appearance."""
+        _, first = np.unique(self.packed(), return_index=True)
+        return ShiftArray(self.values[np.sort(first)])
+
+    def strings(self) -> np.ndarray:
+        """Shift strings, eg. 'x23y08z26t00', for every shift."""
+        strings = np.full(len(self), "", dtype=str)
+        for coord, column in zip(Shift.coords, self.values.T):
+            strings = np.char.add(
+                np.char.add(strings, coord), np.char.zfill(column.astype(str), 2)
+            )
+        return strings
+
+    def _cola_values(self, shift_type: str) -> np.ndarray:
+        try:
+            return self.values * _cola_masks[shift_type]
+        except KeyError:
+            raise ValueError("shift_type must be 'full', 'emode', or 'lpsink'")
+
+    def format_for_cola(self, shift_type: str) -> np.ndarray:
+        """Vectorised Shift.format_for_cola."""
+        strings = self._cola_values(shift_type).astype(str)
+        lines = strings[:, 0]
+        for column in strings.T[1:]:
+            lines = np.char.add(np.char.add(lines, " "), column)
+        return lines
+
+    def write_cola(self, file: os.PathLike, shift_type: str, **kwargs):
+        """Write the COLA formatted shifts, one per line, directly to a file or open file object."""
+        np.savetxt(file, self._cola_values(shift_type), fmt="%d", delimiter=" ", **kwargs)
+
+    def __len__(self):
+        return self.values.shape[0]
+
+    def __iter__(self):
+        for values in self.values:
+            yield Shift._get(tuple(int(val) for val in values))
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return Shift._get(tuple(int(val) for val in self.values[index]))
+        return ShiftArray(self.values[index])
+
+    def __eq__(self, other):
+        if isinstance(other, ShiftArray):
+            return np.array_equal(self.values, other.values)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"ShiftArray({self.strings().tolist()})"
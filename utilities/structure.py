@@ -1,5 +1,6 @@
 from __future__ import annotations
 from collections.abc import Sequence
+import functools
 
 # Doubles as mapping to quark mass
 _quarks = {
@@ -12,23 +13,53 @@ _quarks = {
     "h":"h",
 }
 
+# Interned Structures keyed by their quarks. There are only 7^3 possible values.
+_structure_cache = {}
+
 
 class Structure(Sequence):
-    def __init__(self, structure: str | list):
+    # Structures are immutable and interned so equal structures are the same object
+    __slots__ = ("_structure_list", "u", "d", "s", "_structure_str", "_hash")
+
+    def __new__(cls, structure: str | list):
         if type(structure) is Structure:
-            quark_1, quark_2, quark_3 = structure
+            return structure
         elif isinstance(structure, str):
-            quark_1, quark_2, quark_3 = self.parse_structure_string(structure)
+            quarks = cls.parse_structure_string(structure)
         elif isinstance(structure, (tuple, list)):
-            quark_1, quark_2, quark_3 = structure
+            quarks = tuple(structure)
         else:
             raise TypeError("structure must be str, list or tuple")
-        
-        self._structure_list = [quark_1, quark_2, quark_3]
-        self.u, self.d, self.s = self._structure_list
-        self._structure_str = quark_1 + quark_2 + quark_3
+
+        try:
+            return _structure_cache[quarks]
+        except KeyError:
+            pass
+        except TypeError:
+            raise TypeError(f"Could not convert {structure = } to Structure.")
+
+        quark_1, quark_2, quark_3 = quarks
+        self = super().__new__(cls)
+        fields = {
+            "_structure_list": quarks,
+            "u": quark_1,
+            "d": quark_2,
+            "s": quark_3,
+            "_structure_str": quark_1 + quark_2 + quark_3,
+            "_hash": hash(quarks),
+        }
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+        return _structure_cache.setdefault(quarks, self)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Structure is immutable, cannot set {name}.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Structure is immutable, cannot delete {name}.")
 
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def parse_structure_string(structure_string):
         str_iter = iter(structure_string)
         quark = ""
@@ -42,7 +73,7 @@ class Structure(Sequence):
         except StopIteration:
             if len(struct) != 3 or "".join(struct) != structure_string:
                 raise ValueError(f"Failed to parse structure string.")
-            return struct
+            return tuple(struct)
 
     def __str__(self):
         return self._structure_str
@@ -51,7 +82,19 @@ class Structure(Sequence):
         return str(list(self))
 
     def __list__(self):
-        return self._structure_list
+        return list(self._structure_list)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, Structure):
+            return self is other
+        return NotImplemented
+
+    def __reduce__(self):
+        # Unpickled structures are interned too
+        return (Structure, (self._structure_str,))
 
     def as_dict(self):
         return dict(zip(("u", "d", "s"), list(self)))
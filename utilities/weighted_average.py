@@ -1,3 +1,6 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+import functools
 import logging
 
 import gvar as gv
@@ -5,6 +8,9 @@ import numpy as np
 import pandas as pd
 from scipy.stats import gamma as gamma_dist
 from scipy.special import gamma as gamma_fun
+from scipy.special import gammaln, logsumexp, xlogy
+
+from utilities import jackknives as jack
 
 logger = logging.getLogger(__name__)
 logging.Formatter(fmt="%(name)s(%(lineno)d)::%(levelname)-8s: %(message)s")
@@ -16,6 +22,167 @@ logging.Formatter(fmt="%(name)s(%(lineno)d)::%(levelname)-8s: %(message)s")
 #       recommend just starting dumping the multifit version in its own file with a 
 #       working version of the parent class so that it doesn't get broken by changes.
 
+def log_p_value(ndof: np.ndarray, chi_square: np.ndarray) -> np.ndarray:
+    """
+    Vectorised log of WeightedAverage.p_value.
+
+    Working in log space means large chi square values do not underflow
+    before the weights are normalised.
+    """
+    # log of gamma_dist.pdf(ndof / 2, chi_square / 2) / gamma_fun(ndof / 2)
+    x = np.asarray(ndof, dtype=float) / 2
+    a = np.asarray(chi_square, dtype=float) / 2
+    return xlogy(a - 1, x) - x - gammaln(a) - gammaln(x)
+
+
+def log_weights(log_p_values: np.ndarray, err: np.ndarray) -> np.ndarray:
+    """Unnormalised log weights, log(p_value * err^-2)."""
+    return log_p_values - 2 * np.log(err)
+
+
+def normalise_log_weights(log_weights: np.ndarray, axis: int = 0) -> np.ndarray:
+    """Exponentiate log weights such that the weights sum to one along axis."""
+    return np.exp(log_weights - logsumexp(log_weights, axis=axis, keepdims=True))
+
+
+class FitColumns:
+    def __init__(
+        self,
+        chi2: np.ndarray,
+        ndof: np.ndarray,
+        err: np.ndarray,
+        nparams: np.ndarray = None,
+    ):
+        """
+        The columns of a set of fits needed by the weighting schemes.
+
+        Converted to arrays once and shared between schemes so that several
+        schemes may be evaluated on the same fits without repeating any work.
+        """
+        self.chi2 = np.asarray(chi2, dtype=float)
+        self.ndof = np.asarray(ndof, dtype=float)
+        self.err = np.asarray(err, dtype=float)
+        self.nparams = None if nparams is None else np.asarray(nparams, dtype=float)
+
+    @classmethod
+    def from_dataframe(cls, data: pd.DataFrame, labels: Labels):
+        nparams_label = getattr(labels, "nparams", None)
+        return cls(
+            chi2=data[labels.chi2].to_numpy(dtype=float),
+            ndof=data[labels.ndof].to_numpy(dtype=float),
+            err=data[labels.err].to_numpy(dtype=float),
+            nparams=None if nparams_label is None else data[nparams_label].to_numpy(),
+        )
+
+    @functools.cached_property
+    def log_p_values(self) -> np.ndarray:
+        return log_p_value(self.ndof, self.chi2)
+
+
+class WeightingScheme:
+    """Base class for weighting schemes. Subclasses implement log_weights."""
+
+    name: str = None
+
+    def log_weights(self, columns: FitColumns) -> np.ndarray:
+        """Unnormalised log weights of each fit."""
+        raise NotImplementedError
+
+    def weights(self, columns: FitColumns) -> np.ndarray:
+        return normalise_log_weights(self.log_weights(columns))
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class PValueWeighting(WeightingScheme):
+    """p-value times err^-2 weights of arxiv.org/abs/2003.12130. The default."""
+
+    name = "p_value"
+
+    def log_weights(self, columns: FitColumns) -> np.ndarray:
+        return log_weights(columns.log_p_values, columns.err)
+
+
+class AICWeighting(WeightingScheme):
+    name = "aic"
+
+    def __init__(self, nparams: int = None):
+        """
+        Akaike information criterion weights, w ~ exp(-(chi^2 + 2 k) / 2).
+
+        The number of fit parameters k is taken from the nparams column if
+        available, otherwise the nparams passed here is used for every fit.
+        """
+        self.nparams = nparams
+
+    def _nparams(self, columns: FitColumns) -> np.ndarray:
+        if columns.nparams is not None:
+            return columns.nparams
+        if self.nparams is None:
+            raise ValueError(f"{self.name} weighting requires nparams.")
+        return np.full(columns.chi2.shape, self.nparams, dtype=float)
+
+    def log_weights(self, columns: FitColumns) -> np.ndarray:
+        return -0.5 * (columns.chi2 + 2 * self._nparams(columns))
+
+    def __repr__(self):
+        return f"{type(self).__name__}(nparams={self.nparams})"
+
+
+class BAICWeighting(AICWeighting):
+    name = "baic"
+
+    def __init__(self, nparams: int = None, ndata: int = None):
+        """
+        AIC weights with a penalty for data dropped from the fit,
+        w ~ exp(-(chi^2 + 2 k + 2 N_cut) / 2). See arxiv.org/abs/2208.14983.
+
+        The number of points in each fit is ndof + k and N_cut is the number
+        of points dropped relative to ndata, by default the largest fit.
+        """
+        super().__init__(nparams)
+        self.ndata = ndata
+
+    def log_weights(self, columns: FitColumns) -> np.ndarray:
+        nparams = self._nparams(columns)
+        ndata_fit = columns.ndof + nparams
+        ndata = ndata_fit.max() if self.ndata is None else self.ndata
+        return -0.5 * (columns.chi2 + 2 * nparams + 2 * (ndata - ndata_fit))
+
+    def __repr__(self):
+        return f"{type(self).__name__}(nparams={self.nparams}, ndata={self.ndata})"
+
+
+weighting_schemes = {
+    scheme.name: scheme for scheme in (PValueWeighting(), AICWeighting(), BAICWeighting())
+}
+
+
+def get_weighting_scheme(scheme: str | WeightingScheme) -> WeightingScheme:
+    if isinstance(scheme, WeightingScheme):
+        return scheme
+    try:
+        return weighting_schemes[scheme]
+    except KeyError:
+        raise ValueError(f"Unknown weighting scheme {scheme}, use one of {list(weighting_schemes)}.")
+
+
+def compute_weights(
+    columns: FitColumns, schemes: list[str | WeightingScheme]
+) -> np.ndarray:
+    """
+    Normalised weights of several schemes evaluated on the same fits.
+
+    Returns
+    -------
+    np.ndarray
+        Weights with shape [nschemes, nfits].
+    """
+    log_w = np.stack([get_weighting_scheme(scheme).log_weights(columns) for scheme in schemes])
+    return normalise_log_weights(log_w, axis=1)
+
+
 class WeightedAverage:
     def __init__(
         self,
@@ -24,6 +191,8 @@ class WeightedAverage:
         err_label: str,
         chi2_label: str = "chi2",
         ndof_label: str = "ndof",
+        weighting: str | WeightingScheme = "p_value",
+        nparams_label: str = None,
     ):
         """
         Class to determine the weighted average of some data given the values, uncertainties, chi 
@@ -50,6 +219,12 @@ class WeightedAverage:
             Column label for column holding chi square values. Note: not reduced chi square, by default "chi2"
         ndof_label : str, optional
             Column label for column holding degrees of freedom values, by default "ndof"
+        weighting : str | WeightingScheme, optional
+            Weighting scheme, one of "p_value", "aic", "baic" or a WeightingScheme 
+            instance, by default "p_value" as described above.
+        nparams_label : str, optional
+            Column label for the number of fit parameters, required by the
+            information criterion schemes unless given to the scheme, by default None
 
         """
         self.data = data
@@ -59,7 +234,9 @@ class WeightedAverage:
             ndof=ndof_label,
             err=err_label,
             value=value_label,
+            nparams=nparams_label,
         )
+        self.weighting = get_weighting_scheme(weighting)
 
     def do_average(self, recalculate_weights: bool = False) -> gv.GVar:
         """
@@ -133,14 +310,69 @@ class WeightedAverage:
         """
 
         logger.debug("Calculating weights")
-        self.working_df["p_value"] = self.data.apply(self.df_p_value, axis=1)
-        self.working_df["err"] = self.data[self.labels.err]
-        normalisation = (self.working_df["err"] ** (-2) * self.working_df["p_value"]).sum()
+        self.fit_columns = FitColumns.from_dataframe(self.data, self.labels)
+        weights = self.weighting.weights(self.fit_columns)
 
-        self.working_df["weight"] = self.working_df.apply(
-            self.df_weight, axis=1, normalisation=normalisation
+        index = self.data.index
+        self.working_df["p_value"] = pd.Series(np.exp(self.fit_columns.log_p_values), index=index)
+        self.working_df["err"] = pd.Series(self.fit_columns.err, index=index)
+        self.working_df["weight"] = pd.Series(weights, index=index)
+        return weights
+
+    def average_jackknives(
+        self,
+        jackknives: np.ndarray | jack.JackknifeArray,
+        chi2_jackknives: np.ndarray = None,
+        err_jackknives: np.ndarray = None,
+    ) -> jack.JackknifeEnsemble:
+        """
+        Apply the weighted average to the jackknives of each fit.
+
+        By default the weights of the central fits are applied to every
+        jackknife in a single matrix product. If chi2_jackknives are passed,
+        the weights are instead recalculated for each jackknife from its own
+        chi^2 (and uncertainty if err_jackknives are passed) with the same
+        weighting scheme as the central average.
+
+        Parameters
+        ----------
+        jackknives : np.ndarray | jack.JackknifeArray
+            Jackknives of the fit values, [nfits, ncon], rows matching the rows of data.
+        chi2_jackknives : np.ndarray, optional
+            Chi^2 of each jackknife fit, [nfits, ncon], by default None
+        err_jackknives : np.ndarray, optional
+            Uncertainty of each jackknife fit, [nfits, ncon]. Only used when
+            chi2_jackknives are passed, by default the err column is used.
+
+        Returns
+        -------
+        jack.JackknifeEnsemble
+            Jackknives of the weighted average.
+        """
+        if isinstance(jackknives, jack.JackknifeArray):
+            jackknives = jackknives.jackknives
+        jackknives = np.asarray(jackknives, dtype=float)
+        if jackknives.shape[0] != len(self.data):
+            raise ValueError("jackknives must have one row per row of data.")
+
+        if chi2_jackknives is None:
+            if "weight" not in self.working_df.columns:
+                self.calculate_weights()
+            weights = self.working_df["weight"].to_numpy(dtype=float)
+            return jack.JackknifeEnsemble(weights @ jackknives)
+
+        columns = FitColumns.from_dataframe(self.data, self.labels)
+        chi2_jackknives = np.asarray(chi2_jackknives, dtype=float)
+        if err_jackknives is None:
+            err_jackknives = columns.err[:, None]
+        jackknife_columns = FitColumns(
+            chi2=chi2_jackknives,
+            ndof=np.broadcast_to(columns.ndof[:, None], chi2_jackknives.shape),
+            err=np.broadcast_to(err_jackknives, chi2_jackknives.shape),
+            nparams=None if columns.nparams is None else columns.nparams[:, None],
         )
-        return self.working_df["weight"].to_numpy()
+        weights = self.weighting.weights(jackknife_columns)
+        return jack.JackknifeEnsemble((weights * jackknives).sum(axis=0))
 
     @staticmethod
     def p_value(Ndof: int, chi_square: float) -> float:
@@ -192,6 +424,8 @@ class WeightedAverage_multifit(WeightedAverage):
         err_label: str,
         chi2_label: str = "chi2",
         ndof_label: str = "ndof",
+        weighting: str | WeightingScheme = "p_value",
+        nparams_label: str = None,
     ):
         """
         Generalisation of WeightedAverage class to allow pseudo fitting of multiple datasets 
@@ -230,6 +464,10 @@ class WeightedAverage_multifit(WeightedAverage):
             Column label for column holding chi square values. Note: not reduced chi square, by default "chi2"
         ndof_label : str, optional
             Column label for column holding degrees of freedom values, by default "ndof"
+        weighting : str | WeightingScheme, optional
+            Weighting scheme, see WeightedAverage, by default "p_value"
+        nparams_label : str, optional
+            Column label for the number of fit parameters, see WeightedAverage, by default None
 
         Raises
         ------
@@ -248,20 +486,38 @@ class WeightedAverage_multifit(WeightedAverage):
             err=err_label,
             value_cols=value_col_labels,
             error_cols=error_col_labels,
+            nparams=nparams_label,
         )
+        self.weighting = get_weighting_scheme(weighting)
 
-    def do_average(self, recalculate_weights: bool = False) -> list[gv.GVar]:
+    def do_average(
+        self,
+        recalculate_weights: bool = False,
+        array_backed: bool = False,
+        store_columns: bool = False,
+    ) -> list[gv.GVar] | np.ndarray:
         """
         Calculate the weighted average. A list of gvar variables is returned.
 
+        With array_backed=True the value and error columns are treated as
+        [nfits, ncols] matrices and all averages and systematics are computed
+        with a few matrix-vector products. No per dataset columns are added to
+        the working DataFrame unless store_columns=True, and an array of gvar
+        variables is returned.
+
         Parameters
         ----------
         recalculate_weights : bool, optional
             Whether the weights should be re-calculated if they are already calculated, by default False
+        array_backed : bool, optional
+            Whether to use the array backed implementation, by default False
+        store_columns : bool, optional
+            For array_backed only, whether to add the intermediate columns to the
+            working DataFrame for debugging, by default False
 
         Returns
         -------
-        list[gv.GVar]
+        list[gv.GVar] | np.ndarray
             The weighted average for each (value,variance) column pair.
         """
 
@@ -273,6 +529,9 @@ class WeightedAverage_multifit(WeightedAverage):
             self.calculate_weights()
 
         logger.debug("Weights calculated, determining weighted average")
+        if array_backed:
+            return self._do_average_array(store_columns)
+
         values = []
         self.labels.variance_cols = []
         for i, err_col in enumerate(self.labels.error_cols):
@@ -286,6 +545,35 @@ class WeightedAverage_multifit(WeightedAverage):
             values.append(result)
         return values
 
+    def _do_average_array(self, store_columns: bool = False) -> np.ndarray:
+        """As _do_average but for all (value, error) column pairs at once."""
+        weights = self.working_df["weight"].to_numpy(dtype=float)
+        values = self.data[self.labels.value_cols].to_numpy(dtype=float)
+        variances = self.data[self.labels.error_cols].to_numpy(dtype=float) ** 2
+
+        weighted_average = weights @ values
+        squared_deviations = (values - weighted_average) ** 2
+        stat_var = weights @ variances
+        sys_var = weights @ squared_deviations
+        result = gv.gvar(weighted_average, np.sqrt(stat_var + sys_var))
+        logger.debug(f"{result = }")
+
+        if store_columns:
+            self.labels.variance_cols = [f"{err_col}^2" for err_col in self.labels.error_cols]
+            columns = {}
+            for i, (val_col, var_col) in enumerate(
+                zip(self.labels.value_cols, self.labels.variance_cols)
+            ):
+                columns[var_col] = variances[:, i]
+                columns[f"{val_col}*w"] = values[:, i] * weights
+                columns[f"{var_col}*w"] = variances[:, i] * weights
+                columns[f"{var_col}_sys"] = squared_deviations[:, i] * weights
+            self.working_df = pd.concat(
+                [self.working_df, pd.DataFrame(columns, index=self.working_df.index)],
+                axis=1,
+            )
+        return result
+
 
 
 class Labels:
@@ -297,9 +585,11 @@ class Labels:
         value: str = None,
         value_cols: list[str] = None,
         error_cols: list[str] = None,
+        nparams: str = None,
     ):
         """Simple class to hold labels for the weighted averaging classes"""
         self.chi2 = chi2
+        self.nparams = nparams
         self.ndof = ndof
         self.err = err
         self.val = value
@@ -314,3 +604,217 @@ class Labels:
             f"{label}:{getattr(self, label)}" for label in dir(self) if label[0] != "_"
         ]
         return _str + "\n".join(labels)
+
+
+def grouped_weighted_average(
+    data: pd.DataFrame,
+    by: str | list[str],
+    value_label: str,
+    err_label: str,
+    chi2_label: str = "chi2",
+    ndof_label: str = "ndof",
+    n_jobs: int = None,
+    weighting: str | WeightingScheme = "p_value",
+    nparams_label: str = None,
+) -> pd.DataFrame:
+    """
+    Weighted average of every group of a long format DataFrame in one pass.
+
+    Equivalent to constructing a WeightedAverage and calling do_average for
+    each group of data.groupby(by), but weights, averages and uncertainties
+    are computed for all groups at once with segment reductions and no
+    per group copies of the data are made.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        Long format DataFrame holding the fits of every group.
+    by : str | list[str]
+        Column label(s) to group by, eg. ["particle", "structure", "kd"]. Rows
+        with a missing (NaN) key are dropped, as by DataFrame.groupby.
+    value_label, err_label, chi2_label, ndof_label : str
+        Column labels as for WeightedAverage.
+    n_jobs : int, optional
+        Number of processes to split the groups between, by default None
+        which processes all groups in this process.
+    weighting : str | WeightingScheme, optional
+        Weighting scheme as for WeightedAverage, by default "p_value"
+    nparams_label : str, optional
+        Column label for the number of fit parameters, as for WeightedAverage.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per group with the group keys and columns value, stat_err,
+        sys_err, err (stat and sys in quadrature) and nfits.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    labels = Labels(
+        chi2=chi2_label, ndof=ndof_label, err=err_label, value=value_label, nparams=nparams_label
+    )
+    weighting = get_weighting_scheme(weighting)
+    columns = by + [labels.val, labels.err, labels.chi2, labels.ndof]
+    if nparams_label is not None:
+        columns.append(nparams_label)
+    data = data[columns]
+    missing_keys = data[by].isna().any(axis=1).to_numpy()
+    if missing_keys.any():
+        logger.warning(f"Dropping {missing_keys.sum()} rows with missing group keys.")
+        data = data[~missing_keys]
+
+    if n_jobs is None or n_jobs <= 1:
+        return _grouped_weighted_average(data, by, labels, weighting)
+
+    # Assign whole groups to each job so no group is split between processes
+    group_codes = data.groupby(by, sort=True).ngroup().to_numpy()
+    job_codes = np.array_split(np.arange(group_codes.max() + 1), n_jobs)
+    chunks = [data[np.isin(group_codes, codes)] for codes in job_codes if codes.size]
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        results = executor.map(
+            _grouped_weighted_average,
+            chunks,
+            [by] * len(chunks),
+            [labels] * len(chunks),
+            [weighting] * len(chunks),
+        )
+        return pd.concat(list(results), ignore_index=True)
+
+
+def _grouped_weighted_average(
+    data: pd.DataFrame, by: list[str], labels: Labels, weighting: WeightingScheme
+) -> pd.DataFrame:
+    grouped = data.groupby(by, sort=True)
+    codes = grouped.ngroup().to_numpy()
+    result = grouped.size().rename("nfits").reset_index()
+    ngroups = len(result)
+
+    values = data[labels.val].to_numpy(dtype=float)
+    fit_columns = FitColumns.from_dataframe(data, labels)
+    err = fit_columns.err
+    # Any offset common to all fits, eg. the BAIC ndata, cancels within each group
+    log_w = weighting.log_weights(fit_columns)
+
+    # Normalise within each group, subtracting each group's maximum for stability
+    group_max = np.full(ngroups, -np.inf)
+    np.maximum.at(group_max, codes, log_w)
+    weights = np.exp(log_w - group_max[codes])
+    weights /= np.bincount(codes, weights=weights, minlength=ngroups)[codes]
+
+    average = np.bincount(codes, weights=weights * values, minlength=ngroups)
+    stat_var = np.bincount(codes, weights=weights * err**2, minlength=ngroups)
+    sys_var = np.bincount(
+        codes, weights=weights * (values - average[codes]) ** 2, minlength=ngroups
+    )
+
+    result["value"] = average
+    result["stat_err"] = np.sqrt(stat_var)
+    result["sys_err"] = np.sqrt(sys_var)
+    result["err"] = np.sqrt(stat_var + sys_var)
+    return result[by + ["value", "stat_err", "sys_err", "err", "nfits"]]
+
+
+class WeightedAverageAccumulator:
+    def __init__(self, weighting: str | WeightingScheme = "p_value"):
+        """
+        Streaming version of WeightedAverage which does not store the fits.
+
+        Fit results may be added one at a time or in batches, in any order,
+        and accumulators filled by different workers or processes may be
+        merged. The result agrees with WeightedAverage.do_average on the same
+        fits while only a handful of running sums are kept in memory.
+
+        The sums are stored relative to the largest log weight seen so far so
+        that weights are never exponentiated outside of floating point range,
+        and the systematic spread is accumulated with a weighted form of
+        Welford's algorithm rather than as a difference of large sums.
+
+        Any weighting scheme may be used provided its weight of a fit does
+        not depend on the other fits, so BAICWeighting requires ndata.
+        """
+        self.weighting = get_weighting_scheme(weighting)
+        if isinstance(self.weighting, BAICWeighting) and self.weighting.ndata is None:
+            raise ValueError("Streaming BAIC weights require ndata to be set.")
+        self.nfits = 0
+        self.log_scale = -np.inf
+        self.weight_sum = 0.0
+        self.mean = 0.0
+        self.sys_sum = 0.0
+        self.stat_sum = 0.0
+
+    def add(
+        self,
+        value: float | np.ndarray,
+        err: float | np.ndarray,
+        chi2: float | np.ndarray,
+        ndof: int | np.ndarray,
+        nparams: int | np.ndarray = None,
+    ):
+        """Add one or more fit results."""
+        value = np.atleast_1d(np.asarray(value, dtype=float))
+        err = np.broadcast_to(np.asarray(err, dtype=float), value.shape)
+        columns = FitColumns(
+            chi2=np.broadcast_to(np.asarray(chi2, dtype=float), value.shape),
+            ndof=np.broadcast_to(np.asarray(ndof, dtype=float), value.shape),
+            err=err,
+            nparams=None if nparams is None else np.broadcast_to(nparams, value.shape),
+        )
+        log_w = self.weighting.log_weights(columns)
+
+        batch = WeightedAverageAccumulator(self.weighting)
+        batch.nfits = value.size
+        batch.log_scale = log_w.max()
+        weights = np.exp(log_w - batch.log_scale)
+        batch.weight_sum = weights.sum()
+        batch.mean = (weights * value).sum() / batch.weight_sum
+        batch.sys_sum = (weights * (value - batch.mean) ** 2).sum()
+        batch.stat_sum = (weights * err**2).sum()
+        self.merge(batch)
+
+    def merge(self, other: WeightedAverageAccumulator):
+        """Merge the fits of another accumulator into this one in place."""
+        if repr(other.weighting) != repr(self.weighting):
+            raise ValueError(f"Cannot merge {other.weighting} weights into {self.weighting} weights.")
+        if other.nfits == 0:
+            return
+        if self.nfits == 0:
+            self.__dict__.update(other.__dict__)
+            return
+
+        log_scale = max(self.log_scale, other.log_scale)
+        self_rescale = np.exp(self.log_scale - log_scale)
+        other_rescale = np.exp(other.log_scale - log_scale)
+        self_weight = self.weight_sum * self_rescale
+        other_weight = other.weight_sum * other_rescale
+        weight_sum = self_weight + other_weight
+
+        delta = other.mean - self.mean
+        self.mean += delta * other_weight / weight_sum
+        self.sys_sum = (
+            self.sys_sum * self_rescale
+            + other.sys_sum * other_rescale
+            + delta**2 * self_weight * other_weight / weight_sum
+        )
+        self.stat_sum = self.stat_sum * self_rescale + other.stat_sum * other_rescale
+        self.weight_sum = weight_sum
+        self.log_scale = log_scale
+        self.nfits += other.nfits
+
+    def __add__(self, other: WeightedAverageAccumulator) -> WeightedAverageAccumulator:
+        merged = WeightedAverageAccumulator(self.weighting)
+        merged.merge(self)
+        merged.merge(other)
+        return merged
+
+    @property
+    def stat_err(self) -> float:
+        return np.sqrt(self.stat_sum / self.weight_sum)
+
+    @property
+    def sys_err(self) -> float:
+        return np.sqrt(self.sys_sum / self.weight_sum)
+
+    def result(self) -> gv.GVar:
+        """The weighted average with statistical and systematic uncertainty."""
+        if self.nfits == 0:
+            raise ValueError("No fits have been added.")
+        return gv.gvar(self.mean, np.sqrt((self.stat_sum + self.sys_sum) / self.weight_sum))